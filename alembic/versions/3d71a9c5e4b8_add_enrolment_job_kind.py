@@ -0,0 +1,35 @@
+"""add enrolment job kind
+
+Revision ID: 3d71a9c5e4b8
+Revises: 9b4f6e2c7d15
+Create Date: 2026-10-18 15:12:08.314257
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d71a9c5e4b8'
+down_revision: Union[str, None] = '9b4f6e2c7d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ADD VALUE cannot run inside a transaction block on older PostgreSQL versions
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE job_kind ADD VALUE IF NOT EXISTS 'ENROLMENT'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # PostgreSQL cannot drop a value from an enum type, so the type is rebuilt without it
+    op.execute("DELETE FROM processing_jobs WHERE kind = 'ENROLMENT'")
+    op.execute("ALTER TYPE job_kind RENAME TO job_kind_old")
+    op.execute("CREATE TYPE job_kind AS ENUM ('TRANSCRIPTION')")
+    op.execute("ALTER TABLE processing_jobs ALTER COLUMN kind TYPE job_kind USING kind::text::job_kind")
+    op.execute("DROP TYPE job_kind_old")
@@ -0,0 +1,62 @@
+"""add transcription profiles
+
+Revision ID: 5b8e3f1c9a27
+Revises: e6a4d1f83c2b
+Create Date: 2026-10-18 19:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e3f1c9a27'
+down_revision: Union[str, None] = 'e6a4d1f83c2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    profiles = op.create_table(
+        'transcription_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('model_name', sa.String(length=64), nullable=False),
+        sa.Column('language', sa.String(length=16), nullable=True),
+        sa.Column('beam_size', sa.Integer(), nullable=True),
+        sa.Column('compute_type', sa.String(length=16), nullable=False, server_default='fp32'),
+        sa.Column('vad_skip', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_transcription_profiles_group_id', 'transcription_profiles', ['group_id'])
+    op.create_index(
+        'ix_transcription_profiles_group_id_name', 'transcription_profiles', ['group_id', 'name'], unique=True
+    )
+    op.add_column('groups', sa.Column('default_transcription_profile_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'groups_default_transcription_profile_id_fkey', 'groups', 'transcription_profiles',
+        ['default_transcription_profile_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Shared profiles every group can pick: a fast draft and a slower, more accurate final pass
+    op.bulk_insert(profiles, [
+        {'name': 'draft', 'model_name': 'base.en', 'language': 'en', 'beam_size': None,
+         'compute_type': 'int8', 'vad_skip': True},
+        {'name': 'final', 'model_name': 'medium.en', 'language': 'en', 'beam_size': 5,
+         'compute_type': 'fp16', 'vad_skip': False},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('groups_default_transcription_profile_id_fkey', 'groups', type_='foreignkey')
+    op.drop_column('groups', 'default_transcription_profile_id')
+    op.drop_index('ix_transcription_profiles_group_id_name', table_name='transcription_profiles')
+    op.drop_index('ix_transcription_profiles_group_id', table_name='transcription_profiles')
+    op.drop_table('transcription_profiles')
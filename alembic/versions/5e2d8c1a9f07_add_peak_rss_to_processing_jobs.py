@@ -0,0 +1,28 @@
+"""add peak rss to processing jobs
+
+Revision ID: 5e2d8c1a9f07
+Revises: c7a91e0d4b32
+Create Date: 2026-10-18 13:27:55.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2d8c1a9f07'
+down_revision: Union[str, None] = 'c7a91e0d4b32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('processing_jobs', sa.Column('peak_rss_mb', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('processing_jobs', 'peak_rss_mb')
@@ -0,0 +1,57 @@
+"""add member voice samples
+
+Revision ID: 8c2f5b7e1a63
+Revises: 3d71a9c5e4b8
+Create Date: 2026-10-18 15:48:22.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2f5b7e1a63'
+down_revision: Union[str, None] = '3d71a9c5e4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'member_voice_samples',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=32), nullable=False),
+        sa.Column('audio_path', sa.String(length=255), nullable=True),
+        sa.Column('meeting_id', sa.Integer(), nullable=True),
+        sa.Column('embedding', sa.JSON(), nullable=True),
+        sa.Column('embedding_model', sa.String(length=255), nullable=True),
+        sa.Column('created', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['member_id'], ['group_members.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['meeting_id'], ['meetings.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_member_voice_samples_member_id', 'member_voice_samples', ['member_id'])
+    op.add_column('group_members', sa.Column('embedding_spread', sa.Float(), nullable=True))
+    op.add_column('group_members', sa.Column('embedding_sample_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Each existing single-file enrolment becomes that member's first sample
+    op.execute(
+        "INSERT INTO member_voice_samples (member_id, source, audio_path, embedding, embedding_model) "
+        "SELECT id, 'upload', embedding_audio_path, embedding, embedding_model FROM group_members "
+        "WHERE embedding IS NOT NULL OR embedding_audio_path IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE group_members SET embedding_sample_count = 1, embedding_spread = 0 WHERE embedding IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('group_members', 'embedding_sample_count')
+    op.drop_column('group_members', 'embedding_spread')
+    op.drop_index('ix_member_voice_samples_member_id', table_name='member_voice_samples')
+    op.drop_table('member_voice_samples')
@@ -0,0 +1,28 @@
+"""add estimated seconds to processing jobs
+
+Revision ID: 9b4f6e2c7d15
+Revises: 5e2d8c1a9f07
+Create Date: 2026-10-18 14:05:31.642980
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f6e2c7d15'
+down_revision: Union[str, None] = '5e2d8c1a9f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('processing_jobs', sa.Column('estimated_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('processing_jobs', 'estimated_seconds')
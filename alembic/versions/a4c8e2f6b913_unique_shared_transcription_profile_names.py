@@ -0,0 +1,33 @@
+"""unique shared transcription profile names
+
+Revision ID: a4c8e2f6b913
+Revises: 5b8e3f1c9a27
+Create Date: 2026-10-18 21:40:12.604511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b913'
+down_revision: Union[str, None] = '5b8e3f1c9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ix_transcription_profiles_group_id_name treats every NULL group_id as distinct,
+    # so shared profiles (no group) get a partial index of their own
+    op.create_index(
+        'ix_transcription_profiles_shared_name', 'transcription_profiles', ['name'], unique=True,
+        postgresql_where=sa.text('group_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcription_profiles_shared_name', table_name='transcription_profiles')
@@ -0,0 +1,30 @@
+"""add embedding model to group members
+
+Revision ID: c7a91e0d4b32
+Revises: f24cdfaa875b
+Create Date: 2026-10-18 11:02:17.904316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a91e0d4b32'
+down_revision: Union[str, None] = 'f24cdfaa875b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('group_members', sa.Column('embedding_model', sa.String(length=255), nullable=True))
+    # Every embedding enrolled so far came from the standalone pyannote/embedding model
+    op.execute("UPDATE group_members SET embedding_model = 'pyannote/embedding' WHERE embedding IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('group_members', 'embedding_model')
@@ -0,0 +1,54 @@
+"""store embeddings as pgvector
+
+Revision ID: e6a4d1f83c2b
+Revises: 8c2f5b7e1a63
+Create Date: 2026-10-18 16:20:47.551820
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a4d1f83c2b'
+down_revision: Union[str, None] = '8c2f5b7e1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Embeddings enrolled before now all came from pyannote/embedding (512 dimensions); indexes
+# for other models are created when members are first enrolled with them
+# (backend/processing/member_search.py, which names them the same way).
+LEGACY_MODEL = 'pyannote/embedding'
+LEGACY_INDEX = 'ix_group_members_embedding_' + hashlib.sha1(LEGACY_MODEL.encode('utf-8')).hexdigest()[:12]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # A JSON list's text form ("[0.1, 0.2, ...]") is also valid pgvector input
+    for table in ('group_members', 'member_voice_samples'):
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector USING embedding::text::vector"
+        )
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS {LEGACY_INDEX} ON group_members "
+        f"USING hnsw ((embedding::vector(512)) vector_cosine_ops) "
+        f"WHERE embedding_model = '{LEGACY_MODEL}'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DO $$ DECLARE ix record; BEGIN "
+        "FOR ix IN SELECT indexname FROM pg_indexes "
+        "WHERE tablename = 'group_members' AND indexname LIKE 'ix_group_members_embedding_%' "
+        "LOOP EXECUTE 'DROP INDEX ' || quote_ident(ix.indexname); END LOOP; END $$"
+    )
+    for table in ('group_members', 'member_voice_samples'):
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN embedding TYPE json USING embedding::text::json"
+        )
@@ -0,0 +1,59 @@
+"""add processing jobs
+
+Revision ID: f24cdfaa875b
+Revises: b3cdbaa22a65
+Create Date: 2026-10-18 09:12:41.310527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+job_kind_enum = postgresql.ENUM('TRANSCRIPTION', name='job_kind')
+job_status_enum = postgresql.ENUM('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', name='job_status')
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f24cdfaa875b'
+down_revision: Union[str, None] = 'b3cdbaa22a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    job_kind_enum.create(op.get_bind(), checkfirst=True)
+    job_status_enum.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        'processing_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', postgresql.ENUM(name='job_kind', create_type=False), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='job_status', create_type=False), nullable=False),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('groups.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('run_after', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('device', sa.String(length=32), nullable=True),
+        sa.Column('worker_id', sa.String(length=255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started', sa.DateTime(), nullable=True),
+        sa.Column('finished', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    )
+    # The worker's claim query filters on these two columns on every poll
+    op.create_index('ix_processing_jobs_status_run_after', 'processing_jobs', ['status', 'run_after'])
+    op.create_index('ix_processing_jobs_meeting_id', 'processing_jobs', ['meeting_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_processing_jobs_meeting_id', table_name='processing_jobs')
+    op.drop_index('ix_processing_jobs_status_run_after', table_name='processing_jobs')
+    op.drop_table('processing_jobs')
+    job_status_enum.drop(op.get_bind(), checkfirst=True)
+    job_kind_enum.drop(op.get_bind(), checkfirst=True)
@@ -15,6 +15,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import PrivateAttr
 from pathlib import Path
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
@@ -37,6 +38,144 @@ class Settings(BaseSettings):
     TRANSCRIPT_CHROMA_DIR: Path = Path("/backend/transcript_chroma")
     TRANSCRIPT_EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
     TRANSCRIPT_EMBEDDING_DEVICE: str = "cpu"
+    # Chunk/query embeddings are cached on disk by (model, text hash) in a SQLite file in the
+    # Chroma dir (backend/transcript_rag/embedding_cache.py), least recently used evicted past
+    # this size. 0 turns the cache off.
+    TRANSCRIPT_EMBEDDING_CACHE_MB: int = 512
+    # `python -m backend.transcript_rag.reindex` rebuilds every group's collection: chunking
+    # runs in this many processes (0 = one per CPU) and chunks are embedded and written
+    # this many at a time, across meetings.
+    TRANSCRIPT_REINDEX_PROCESSES: int = 0
+    TRANSCRIPT_REINDEX_BATCH_SIZE: int = 1024
+
+    # Speech models held by backend/processing/model_registry.py. Each is loaded once per
+    # process; MODEL_CACHE_MAX_MB caps the estimated weight memory kept resident (0 = no cap),
+    # evicting the least recently used model first.
+    DIARISATION_PIPELINE_NAME: str = "pyannote/speaker-diarization"
+    SPEAKER_EMBEDDING_MODEL_NAME: str = "pyannote/embedding"
+    SNR_MODEL_NAME: str = "pyannote/brouhaha"
+    MODEL_CACHE_MAX_MB: int = 0
+    # Diarisation, SNR/embedding and Whisper outputs cached per recording under
+    # UPLOAD_DIR/diarisation_cache (backend/processing/diarisation_cache.py); the least
+    # recently used recordings are evicted past this size. 0 = no cap.
+    DIARISATION_CACHE_MAX_MB: int = 4096
+
+    # Where speaker embeddings for member matching come from: "segments" runs
+    # SPEAKER_EMBEDDING_MODEL_NAME over each speaker's reference segments, "pipeline" reuses the
+    # diarisation pipeline's own centroids (backend/processing/speaker_embedding.py). Changing
+    # this means members need re-enrolling, since the two models embed differently.
+    SPEAKER_EMBEDDING_SOURCE: str = "segments"
+
+    # Member voice prints (backend/processing/voice_prints.py). A member's embedding is the
+    # centroid of their samples; with VOICE_PRINT_TRIM_MIN_SAMPLES or more, samples over
+    # VOICE_PRINT_OUTLIER_SIGMAS standard deviations less similar to it than the rest are left
+    # out. A confirmed attendee matched at VOICE_PRINT_MEETING_MIN_SIMILARITY or better gains a
+    # sample from that meeting, keeping the latest VOICE_PRINT_MAX_MEETING_SAMPLES.
+    VOICE_PRINT_TRIM_MIN_SAMPLES: int = 4
+    VOICE_PRINT_OUTLIER_SIGMAS: float = 2.0
+    VOICE_PRINT_SAMPLES_FROM_MEETINGS: bool = True
+    VOICE_PRINT_MEETING_MIN_SIMILARITY: float = 0.8
+    VOICE_PRINT_MAX_MEETING_SAMPLES: int = 10
+
+    # Whisper checkpoint used for transcription when neither the request nor the group picks a
+    # transcription profile (see backend/processing/transcription_profiles.py and
+    # https://github.com/openai/whisper?tab=readme-ov-file#available-models-and-languages)
+    WHISPER_MODEL_NAME: str = "medium.en"
+    # Checkpoint names a transcription profile may use, kept here so the API can validate them
+    # without importing whisper (whisper.available_models() as of openai-whisper 20240930)
+    WHISPER_MODEL_NAMES: list[str] = [
+        "tiny.en", "tiny", "base.en", "base", "small.en", "small", "medium.en", "medium",
+        "large-v1", "large-v2", "large-v3", "large", "large-v3-turbo", "turbo",
+    ]
+    # A profile with vad_skip drops windows whose no-speech probability exceeds this
+    WHISPER_NO_SPEECH_THRESHOLD: float = 0.6
+
+    # Health checks (backend/routes/status.py) read model availability from a snapshot of the
+    # model registry and the download caches, refreshed in the background at this interval.
+    # With READINESS_REQUIRES_MODELS, /status/ready also fails until every model is available.
+    MODEL_STATUS_TTL_SECONDS: float = 300.0
+    READINESS_REQUIRES_MODELS: bool = False
+
+    # With WARMUP_MODELS the worker loads every model and runs a WARMUP_CLIP_SECONDS synthetic clip
+    # through it before claiming jobs (backend/processing/warmup.py), then creates WORKER_READY_FILE
+    # (if set) for container health checks; the file is removed when the worker stops.
+    WARMUP_MODELS: bool = False
+    WARMUP_CLIP_SECONDS: float = 5.0
+    # Whisper is warmed for the built-in default and the groups' default transcription profiles,
+    # up to this many (checkpoint, compute type) pairs - each stays resident, subject to
+    # MODEL_CACHE_MAX_MB. Profiles only named per request still load on first use.
+    WARMUP_WHISPER_MAX_VARIANTS: int = 3
+    WORKER_READY_FILE: Optional[Path] = None
+
+    # Number of packed 30-second windows decoded together per Whisper batch
+    # (backend/processing/batched_transcription.py).
+    WHISPER_BATCH_SIZE: int = 8
+
+    # Speech-activity gating before Whisper (backend/processing/speech_activity.py): brouhaha's
+    # frame-level VAD trims each diarised turn to its speech, pieces closer than
+    # SPEECH_ACTIVITY_MERGE_GAP_SECONDS are merged and pieces shorter than SPEECH_ACTIVITY_MIN_SECONDS
+    # are dropped, so silence and stray fragments are never decoded.
+    SPEECH_ACTIVITY_GATING: bool = True
+    SPEECH_ACTIVITY_THRESHOLD: float = 0.5
+    SPEECH_ACTIVITY_PADDING_SECONDS: float = 0.2
+    SPEECH_ACTIVITY_MERGE_GAP_SECONDS: float = 0.5
+    SPEECH_ACTIVITY_MIN_SECONDS: float = 0.3
+    SPEECH_ACTIVITY_BATCH_SIZE: int = 32
+
+    # Recordings longer than this are decoded to a memory-mapped .npy next to the upload
+    # rather than held in RAM (backend/processing/audio_loading.py).
+    AUDIO_MMAP_MIN_SECONDS: float = 1800.0
+
+    # Recordings at least LONG_FORM_MIN_SECONDS long are diarised in overlapping windows and
+    # speakers stitched across windows by embedding similarity (backend/processing/long_form.py),
+    # so diarisation memory is bounded by the window length rather than the recording length.
+    LONG_FORM_MIN_SECONDS: float = 5400.0
+    LONG_FORM_WINDOW_SECONDS: float = 1200.0
+    LONG_FORM_OVERLAP_SECONDS: float = 60.0
+    LONG_FORM_STITCH_THRESHOLD: float = 0.6
+
+    # Reference segments scored for SNR and embedded per padded mini-batch
+    # (backend/processing/reference_extraction.py), capped at REFERENCE_BATCH_MAX_SECONDS of
+    # padded audio per batch so a few very long turns cannot exhaust memory. A batch's longest
+    # clip is at most REFERENCE_BATCH_MAX_PADDING longer than its shortest, since the models'
+    # SincNet front end normalises over the padding too.
+    REFERENCE_BATCH_SIZE_CPU: int = 8
+    REFERENCE_BATCH_SIZE_CUDA: int = 32
+    REFERENCE_BATCH_MAX_SECONDS: float = 600.0
+    REFERENCE_BATCH_MAX_PADDING: float = 0.1
+
+    # Device admission (backend/processing/device_management.py): work is estimated at its input
+    # tensor size (one batch of windows, for models that window their input) x
+    # DEVICE_ACTIVATION_FACTOR and waits up to DEVICE_ADMISSION_WAIT_SECONDS for that much free
+    # VRAM (keeping DEVICE_MEMORY_HEADROOM_MB spare) before running on the CPU instead.
+    DEVICE_ACTIVATION_FACTOR: int = 40
+    DEVICE_MEMORY_HEADROOM_MB: int = 512
+    DEVICE_ADMISSION_WAIT_SECONDS: float = 60.0
+
+    # Job queue (backend/worker.py). A RUNNING job with no heartbeat for
+    # TRANSCRIPTION_JOB_STALE_SECONDS is assumed orphaned and requeued; failed jobs are retried
+    # after TRANSCRIPTION_RETRY_BASE_SECONDS * 2^(attempt-1) up to TRANSCRIPTION_MAX_ATTEMPTS.
+    WORKER_POLL_SECONDS: float = 2.0
+    WORKER_CONCURRENCY_CPU: int = 1
+    WORKER_CONCURRENCY_CUDA: int = 1
+    # >1 runs jobs in that many processes, each pinned to its own slice of CPU cores
+    # (backend/worker_pool.py); suits large CPU-only hosts.
+    WORKER_PROCESSES: int = 1
+    # WORKER_PIPELINE runs transcription as a stage pipeline (backend/processing/stage_pipeline.py):
+    # threads per stage, and how many meetings may wait between consecutive stages. Stage
+    # metrics are logged and published for /status/pipeline every WORKER_METRICS_SECONDS.
+    WORKER_PIPELINE: bool = False
+    PIPELINE_STAGE_WORKERS: dict[str, int] = {
+        "prepare": 1, "diarise": 1, "identify": 1, "speech": 1, "transcribe": 1, "publish": 1,
+    }
+    PIPELINE_QUEUE_SIZE: int = 1
+    WORKER_METRICS_SECONDS: float = 30.0
+    TRANSCRIPTION_MAX_ATTEMPTS: int = 3
+    TRANSCRIPTION_RETRY_BASE_SECONDS: int = 30
+    TRANSCRIPTION_JOB_STALE_SECONDS: int = 300
+
+    # How often GET .../transcription/stream checks the partial transcript for new cues
+    TRANSCRIPT_STREAM_POLL_SECONDS: float = 1.0
 
 
     # Sub-paths built from the base path, built on initialisation
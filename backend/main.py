@@ -40,6 +40,17 @@ backend.add_middleware(
     allow_headers=["*"],
 )
 
+@backend.on_event("startup")
+def start_model_availability_checks():
+    # Model availability for /status is checked once now and refreshed in the background
+    from backend.processing.model_availability import model_availability
+    model_availability.start()
+
+@backend.on_event("shutdown")
+def stop_model_availability_checks():
+    from backend.processing.model_availability import model_availability
+    model_availability.stop()
+
 #create default landing page for quick checks.
 @backend.get("/")
 def root():
@@ -25,9 +25,10 @@ from backend.config import settings
 from enum import Enum
 
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, JSON, func, Enum as SQLEnum
+    Column, Integer, Float, String, Text, DateTime, Boolean, ForeignKey, Table, JSON, Index, func, Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship
+from pgvector.sqlalchemy import Vector
 from backend.db import Base
 
 # Association Tables
@@ -73,11 +74,45 @@ class Group(Base):
     # maintained separately.
     github_repo_url = Column(String(512), nullable=True)
     trello_board_id = Column(String(24), nullable=True)
+    # Profile used when a transcription request names none; None means the built-in default
+    default_transcription_profile_id = Column(
+        Integer, ForeignKey("transcription_profiles.id", ondelete="SET NULL", use_alter=True), nullable=True
+    )
     created = Column(DateTime, nullable=False, default=func.now())
 
     users = relationship("User", secondary=users_groups, back_populates="groups")
     members = relationship("GroupMember", secondary=groups_group_members, back_populates="groups")
     meetings = relationship("Meeting", back_populates="group")
+    transcription_profiles = relationship(
+        "TranscriptionProfile", back_populates="group", cascade="all, delete-orphan",
+        passive_deletes=True, foreign_keys="TranscriptionProfile.group_id"
+    )
+    default_transcription_profile = relationship(
+        "TranscriptionProfile", foreign_keys=[default_transcription_profile_id], post_update=True
+    )
+
+
+class TranscriptionProfile(Base):
+    """Named Whisper settings a transcription runs with (backend/processing/transcription_profiles.py).
+    Profiles with no group are shared by every group, e.g. the seeded "draft" and "final"."""
+    __tablename__ = "transcription_profiles"
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=True, index=True)
+    name = Column(String(64), nullable=False)
+    model_name = Column(String(64), nullable=False)  # Whisper checkpoint, e.g. "base.en", "medium.en"
+    language = Column(String(16), nullable=True)  # None lets Whisper detect it per window
+    beam_size = Column(Integer, nullable=True)  # None decodes greedily
+    compute_type = Column(String(16), nullable=False, default="fp32")  # "fp32", "fp16" or "int8"
+    vad_skip = Column(Boolean, nullable=False, default=False)  # drop windows Whisper judges to be non-speech
+    created = Column(DateTime, nullable=False, default=func.now())
+
+    group = relationship("Group", back_populates="transcription_profiles", foreign_keys=[group_id])
+
+    __table_args__ = (
+        Index("ix_transcription_profiles_group_id_name", "group_id", "name", unique=True),
+        # NULL group_ids never collide in the index above, so shared names need their own
+        Index("ix_transcription_profiles_shared_name", "name", unique=True, postgresql_where=group_id.is_(None)),
+    )
 
 
 class GroupMember(Base):
@@ -87,12 +122,34 @@ class GroupMember(Base):
     email = Column(String(255), nullable=True)  # optional, recorded where known - not a login
     created = Column(DateTime, nullable=False, default=func.now())
 
-    embedding = Column(JSON, nullable=True)  # Stores list of floats from pyannote
-    embedding_audio_path = Column(String(255), nullable=True)  # Optional: for reference/debugging
+    embedding = Column(Vector(), nullable=True)  # Normalised float32 centroid of the voice samples below
+    embedding_audio_path = Column(String(255), nullable=True)  # Optional: latest enrolment clip, for reference/debugging
     embedding_updated_at = Column(DateTime, nullable=True)
+    embedding_model = Column(String(255), nullable=True)  # which model produced `embedding`
+    embedding_spread = Column(Float, nullable=True)  # mean cosine distance of the samples from the centroid
+    embedding_sample_count = Column(Integer, nullable=False, default=0)  # samples the centroid was built from
 
     groups = relationship("Group", secondary=groups_group_members, back_populates="members")
     attended_meetings = relationship("Meeting", secondary=meetings_group_members, back_populates="attendees")
+    voice_samples = relationship(
+        "MemberVoiceSample", back_populates="member", cascade="all, delete-orphan",
+        passive_deletes=True, order_by="MemberVoiceSample.id"
+    )
+
+class MemberVoiceSample(Base):
+    """One enrolment clip or confirmed meeting speaker and its embedding; the member's
+    `embedding` is a robust centroid of these (backend/processing/voice_prints.py)."""
+    __tablename__ = "member_voice_samples"
+    id = Column(Integer, primary_key=True)
+    member_id = Column(Integer, ForeignKey("group_members.id", ondelete="CASCADE"), nullable=False, index=True)
+    source = Column(String(32), nullable=False, default="upload")  # "upload" or "meeting"
+    audio_path = Column(String(255), nullable=True)  # under EMBEDDING_DIR; None for meeting samples
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="SET NULL"), nullable=True)
+    embedding = Column(Vector(), nullable=True)  # None until the enrolment job has embedded it
+    embedding_model = Column(String(255), nullable=True)
+    created = Column(DateTime, nullable=False, default=func.now())
+
+    member = relationship("GroupMember", back_populates="voice_samples")
 
 class Meeting(Base):
     __tablename__ = "meetings"
@@ -125,21 +182,74 @@ class RawFile(Base):
     meeting=relationship("Meeting", back_populates="media_files")
     status=Column(Text, nullable=True)
 
+
+class JobKind(str, Enum):
+    TRANSCRIPTION = "transcription"
+    ENROLMENT = "enrolment"  # embedding members' voice samples, params={"sample_ids": [...]}
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ProcessingJob(Base):
+    """A unit of background work, claimed by `python -m backend.worker` (see backend/worker.py)
+    rather than run inside the API process, so queued work survives restarts."""
+    __tablename__ = "processing_jobs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(SQLEnum(JobKind, name="job_kind"), nullable=False)
+    status = Column(SQLEnum(JobStatus, name="job_status"), nullable=False, default=JobStatus.QUEUED)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), nullable=True, index=True)
+    params = Column(JSON, nullable=True)  # keyword arguments for the job function
+    estimated_seconds = Column(Float, nullable=True)  # audio duration, so workers can take longest jobs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=func.now())  # pushed back on retry
+    device = Column(String(32), nullable=True)
+    worker_id = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    created = Column(DateTime, nullable=False, default=func.now())
+    started = Column(DateTime, nullable=True)
+    finished = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    peak_rss_mb = Column(Integer, nullable=True)  # peak worker memory while the job ran, for sizing workers
+
+    __table_args__ = (Index("ix_processing_jobs_status_run_after", "status", "run_after"),)
+
 class GroupMemberOut(BaseModel):
     id: int
     name: str
     created: datetime
     embedding_audio_path: Optional[str]
+    embedding_model: Optional[str] = None
+    embedding_spread: Optional[float] = None
+    embedding_sample_count: Optional[int] = None
     
     class Config:
         from_attributes = True
 
+class VoiceSampleOut(BaseModel):
+    id: int
+    source: str
+    audio_path: Optional[str]
+    meeting_id: Optional[int]
+    embedding_model: Optional[str]
+    created: datetime
+
+    class Config:
+        from_attributes = True
+
 class GroupOut(BaseModel):
     id: int
     name: str
     created: datetime
     github_repo_url: Optional[str] = None
     trello_board_id: Optional[str] = None
+    default_transcription_profile_id: Optional[int] = None
     members: List[GroupMemberOut]  # Include related members
     class Config:
         from_attributes = True
@@ -161,6 +271,36 @@ class RawFileOut(BaseModel):
     class Config:
         from_attributes =True
 
+class TranscriptionProfileOut(BaseModel):
+    id: int
+    group_id: Optional[int]
+    name: str
+    model_name: str
+    language: Optional[str]
+    beam_size: Optional[int]
+    compute_type: str
+    vad_skip: bool
+    created: datetime
+
+    class Config:
+        from_attributes = True
+
+class ProcessingJobOut(BaseModel):
+    id: int
+    kind: JobKind
+    status: JobStatus
+    meeting_id: Optional[int]
+    attempts: int
+    max_attempts: int
+    error: Optional[str]
+    created: datetime
+    started: Optional[datetime]
+    finished: Optional[datetime]
+    run_after: Optional[datetime]
+    peak_rss_mb: Optional[int] = None
+    class Config:
+        from_attributes = True
+
 class MeetingAttendeeOut(BaseModel):
     id: int
     name: str
@@ -0,0 +1,142 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Decode a meeting recording once, as 16 kHz mono float32, for every stage to share.
+
+Diarisation, SNR filtering, speaker embedding and Whisper all take slices of the
+same contiguous buffer (numpy views / torch.from_numpy, so no copies). Recordings
+longer than settings.AUDIO_MMAP_MIN_SECONDS are streamed straight to a `.npy`
+next to the upload and memory-mapped instead of held in RAM; that file is reused
+on later runs for as long as it is newer than the upload.
+"""
+
+import logging
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy
+import torch
+
+from backend.config import settings
+
+SAMPLE_RATE = 16000
+_BYTES_PER_SAMPLE = 4
+_READ_CHUNK_BYTES = SAMPLE_RATE * _BYTES_PER_SAMPLE * 10  # ten seconds per read
+
+
+@dataclass
+class MeetingAudio:
+    samples: numpy.ndarray  # 1-D float32, in memory or memory-mapped
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def crop(self, start: float = 0.0, end: Optional[float] = None) -> numpy.ndarray:
+        """Zero-copy view of [start, end) seconds."""
+        first = max(0, int(start * self.sample_rate))
+        last = len(self.samples) if end is None else min(len(self.samples), int(end * self.sample_rate))
+        return self.samples[first:last]
+
+    def waveform(self, start: float = 0.0, end: Optional[float] = None) -> torch.Tensor:
+        """(channel, time) tensor sharing memory with the buffer."""
+        return torch.from_numpy(self.crop(start, end)).unsqueeze(0)
+
+    def as_pyannote(self, start: float = 0.0, end: Optional[float] = None) -> dict:
+        """In-memory audio in the form pyannote pipelines/inferences accept in place of a path."""
+        return {"waveform": self.waveform(start, end), "sample_rate": self.sample_rate}
+
+
+def spill_path_for(input_file: Path) -> Path:
+    return input_file.with_name(f"{input_file.name}.16k.npy")
+
+
+def _ffmpeg_decode(input_file: Path) -> subprocess.Popen:
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", str(input_file),
+        "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(SAMPLE_RATE),
+        "-loglevel", "error", "-",
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def _raw_to_npy(raw_path: Path, npy_path: Path, num_samples: int) -> None:
+    """Prefix a raw float32 stream with an .npy header, copying in chunks."""
+    tmp_path = npy_path.with_name(npy_path.name + ".tmp")
+    with open(tmp_path, "wb") as out, open(raw_path, "rb") as raw:
+        numpy.lib.format.write_array_header_1_0(
+            out, {"descr": "<f4", "fortran_order": False, "shape": (num_samples,)}
+        )
+        while chunk := raw.read(_READ_CHUNK_BYTES * 6):
+            out.write(chunk)
+    os.replace(tmp_path, npy_path)
+
+
+def load_meeting_audio(input_file: Path, spill_seconds: Optional[float] = None) -> MeetingAudio:
+    """Decode, downmix and resample `input_file` once into a MeetingAudio buffer."""
+    input_file = Path(input_file)
+    spill_seconds = settings.AUDIO_MMAP_MIN_SECONDS if spill_seconds is None else spill_seconds
+    npy_path = spill_path_for(input_file)
+
+    if npy_path.exists() and npy_path.stat().st_mtime >= input_file.stat().st_mtime:
+        logging.info(f"Reusing decoded audio at {npy_path}")
+        # copy-on-write mapping: writable (so torch.from_numpy is happy) without touching the file
+        return MeetingAudio(numpy.load(npy_path, mmap_mode="c"))
+
+    spill_bytes = int(spill_seconds * SAMPLE_RATE) * _BYTES_PER_SAMPLE
+    raw_path = npy_path.with_name(npy_path.name + ".raw")
+    buffer = bytearray()
+    buffered = 0
+    spill_file = None
+
+    proc = _ffmpeg_decode(input_file)
+    try:
+        while chunk := proc.stdout.read(_READ_CHUNK_BYTES):
+            if spill_file is None:
+                buffer.extend(chunk)
+                buffered += len(chunk)
+                if buffered > spill_bytes:
+                    # Long recording - stop accumulating in memory and stream the rest to disk
+                    spill_file = open(raw_path, "wb")
+                    spill_file.write(buffer)
+                    buffer = bytearray()
+            else:
+                spill_file.write(chunk)
+                buffered += len(chunk)
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio {input_file}: {stderr.decode(errors='replace')}")
+    finally:
+        if spill_file is not None:
+            spill_file.close()
+        if proc.poll() is None:
+            proc.kill()
+
+    num_samples = buffered // _BYTES_PER_SAMPLE
+    if spill_file is None:
+        # a bytearray is mutable, so this view is writable without a copy
+        samples = numpy.frombuffer(buffer, dtype=numpy.float32)
+        logging.info(f"Decoded {input_file} ({num_samples / SAMPLE_RATE:.1f}s) into memory")
+        return MeetingAudio(samples)
+
+    try:
+        _raw_to_npy(raw_path, npy_path, num_samples)
+    finally:
+        raw_path.unlink(missing_ok=True)
+    logging.info(f"Decoded {input_file} ({num_samples / SAMPLE_RATE:.1f}s) to memory-mapped {npy_path}")
+    return MeetingAudio(numpy.load(npy_path, mmap_mode="c"))
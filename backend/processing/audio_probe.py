@@ -0,0 +1,38 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cheap, header-only audio duration lookup for scheduling.
+
+Used by the API when a job is queued, so it deliberately avoids the ML stack
+(unlike audio_loading.py): one ffprobe call, no decoding.
+"""
+
+import logging
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+def probe_duration(path: Path) -> Optional[float]:
+    """Duration in seconds from the container/stream headers, or None if ffprobe can't tell."""
+    cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        return float(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        logging.warning(f"Could not determine duration of {path}")
+        return None
@@ -0,0 +1,220 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Segment-batching Whisper stage.
+
+Rather than calling model.transcribe() once per diarised turn (which pays the
+full decode set-up for every two-second "yeah"), turns are packed into padded
+30-second windows, the windows are decoded together as one mel batch, and each
+decoded word is mapped back to the turn it came from using Whisper's
+cross-attention word alignment. The caller still gets one text per turn, in the
+same order it passed them in.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import numpy
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_SAMPLES, SAMPLE_RATE
+from whisper.timing import find_alignment
+from whisper.tokenizer import get_tokenizer
+
+from backend.processing.device_management import device_manager, is_oom_error
+
+WINDOW_SECONDS = N_SAMPLES / SAMPLE_RATE  # 30s, Whisper's fixed input length
+GAP_SECONDS = 0.3  # silence between packed turns, so word alignment has a clear boundary
+SHORT_TURN_SECONDS = 3.0
+NO_SPEECH_LOGPROB = -1.0  # whisper.transcribe's logprob_threshold: a confident decode is kept anyway
+
+
+@dataclass
+class TurnSpan:
+    """One diarised turn to transcribe, in seconds from the start of the audio."""
+    start: float
+    end: float
+    speaker: str
+
+
+@dataclass
+class Placement:
+    """Where (part of) a turn sits inside a packed window."""
+    turn_index: int
+    source_start: float
+    source_end: float
+    offset: float  # seconds from the start of the window
+
+    @property
+    def duration(self) -> float:
+        return self.source_end - self.source_start
+
+
+@dataclass
+class Window:
+    placements: list[Placement] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        if not self.placements:
+            return 0.0
+        last = self.placements[-1]
+        return last.offset + last.duration
+
+
+def pack_turns(turns: list[TurnSpan], window_seconds: float = WINDOW_SECONDS,
+               gap_seconds: float = GAP_SECONDS, short_turn_seconds: float = SHORT_TURN_SECONDS) -> list[Window]:
+    """Greedily pack turns, in order, into windows of at most `window_seconds`.
+
+    A turn joins the current window when it fits and either continues the
+    previous turn's speaker or is itself short - long turns from a new speaker
+    start a fresh window so Whisper's context doesn't run across a handover.
+    Turns longer than a window are split across consecutive windows of their own.
+    """
+    windows: list[Window] = []
+    current = Window()
+
+    for index, turn in enumerate(turns):
+        duration = turn.end - turn.start
+        if duration <= 0:
+            continue
+
+        if duration > window_seconds:
+            if current.placements:
+                windows.append(current)
+                current = Window()
+            piece_start = turn.start
+            while piece_start < turn.end:
+                piece_end = min(piece_start + window_seconds, turn.end)
+                windows.append(Window([Placement(index, piece_start, piece_end, 0.0)]))
+                piece_start = piece_end
+            continue
+
+        if current.placements:
+            previous = turns[current.placements[-1].turn_index]
+            offset = current.duration + gap_seconds
+            fits = offset + duration <= window_seconds
+            compatible = previous.speaker == turn.speaker or duration < short_turn_seconds
+            if fits and compatible:
+                current.placements.append(Placement(index, turn.start, turn.end, offset))
+                continue
+            windows.append(current)
+            current = Window()
+
+        current.placements.append(Placement(index, turn.start, turn.end, 0.0))
+
+    if current.placements:
+        windows.append(current)
+    return windows
+
+
+def _window_audio(audio: numpy.ndarray, window: Window, sample_rate: int = SAMPLE_RATE) -> numpy.ndarray:
+    """Concatenate the window's turns, separated by the packing gap, into one clip."""
+    buffer = numpy.zeros(int(round(window.duration * sample_rate)) + 1, dtype=numpy.float32)
+    for placement in window.placements:
+        source = audio[int(placement.source_start * sample_rate):int(placement.source_end * sample_rate)]
+        begin = int(round(placement.offset * sample_rate))
+        source = source[:len(buffer) - begin]
+        buffer[begin:begin + len(source)] = source
+    return buffer
+
+
+def _placement_for(window: Window, time: float) -> Placement:
+    """The placement a word at `time` (seconds into the window) belongs to -
+    the one containing it, else the nearest one if it fell in a gap."""
+    def distance(p: Placement) -> float:
+        if p.offset <= time <= p.offset + p.duration:
+            return 0.0
+        return min(abs(time - p.offset), abs(time - (p.offset + p.duration)))
+    return min(window.placements, key=distance)
+
+
+def iter_transcribed_turns(model, audio: numpy.ndarray, turns: list[TurnSpan], language: Optional[str] = "en",
+                           batch_size: int = 8, fp16: bool = False, beam_size: Optional[int] = None,
+                           no_speech_threshold: Optional[float] = None) -> Iterator[tuple[int, str]]:
+    """Transcribe every turn in `turns` from the 16 kHz mono `audio` buffer, yielding
+    (turn index, text) in turn order as soon as each turn's last window has been decoded.
+    `beam_size` None decodes greedily. With `no_speech_threshold`, a window Whisper thinks is
+    not speech (and decoded with low confidence, as in whisper.transcribe) contributes no text."""
+    windows = pack_turns(turns)
+    words_per_turn: list[list[str]] = [[] for _ in turns]
+    logging.info(f"Packed {len(turns)} turns into {len(windows)} windows for batched transcription.")
+
+    # A turn is finished once the last window holding any part of it is decoded
+    last_window = [0] * len(turns)
+    for window_index, window in enumerate(windows):
+        for placement in window.placements:
+            last_window[placement.turn_index] = window_index
+    next_turn = 0
+
+    batch_start = 0
+    while batch_start < len(windows):
+        batch = windows[batch_start:batch_start + batch_size]
+        clips = [_window_audio(audio, window) for window in batch]
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clip)), n_mels=model.dims.n_mels)
+            for clip in clips
+        ]).to(model.device)
+
+        options = whisper.DecodingOptions(
+            language=language, without_timestamps=True, fp16=fp16, beam_size=beam_size
+        )
+        try:
+            with torch.no_grad():
+                results = whisper.decode(model, mels, options)
+        except Exception as e:
+            if not is_oom_error(e) or batch_size == 1:
+                raise
+            # Decode the rest of the meeting in smaller batches rather than failing it
+            del mels
+            torch.cuda.empty_cache()
+            batch_size //= 2
+            device_manager.record("oom_batch_reductions")
+            logging.warning(f"CUDA out of memory decoding {len(batch)} windows; batch size now {batch_size}.")
+            continue
+
+        for window, clip, mel, result in zip(batch, clips, mels, results):
+            if (no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold
+                    and result.avg_logprob < NO_SPEECH_LOGPROB):
+                continue
+            tokenizer = get_tokenizer(
+                model.is_multilingual,
+                num_languages=getattr(model, "num_languages", 99),
+                language=result.language or language,
+                task="transcribe",
+            )
+            text_tokens = [t for t in result.tokens if t < tokenizer.eot]
+            if not text_tokens:
+                continue
+
+            num_frames = min(len(clip) // HOP_LENGTH, mel.shape[-1])
+            alignment = find_alignment(model, tokenizer, text_tokens, mel, num_frames)
+            for word in alignment:
+                if not word.word.strip():
+                    continue
+                placement = _placement_for(window, (word.start + word.end) / 2)
+                words_per_turn[placement.turn_index].append(word.word)
+
+        decoded_up_to = batch_start + len(batch) - 1
+        while next_turn < len(turns) and last_window[next_turn] <= decoded_up_to:
+            yield next_turn, "".join(words_per_turn[next_turn]).strip()
+            next_turn += 1
+        batch_start += len(batch)
+
+    # turns that ended up in no window at all (zero length) have no text
+    while next_turn < len(turns):
+        yield next_turn, "".join(words_per_turn[next_turn]).strip()
+        next_turn += 1
+
@@ -12,10 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Optional
+
 import torch
 
-def get_safe_device():
-    """Return a safe device (GPU if available and supported, else CPU)."""
+from backend.config import settings
+
+SAMPLE_RATE = 16000  # as backend/processing/audio_loading.py resamples to
+DEFAULT_WINDOW_SECONDS = 10.0
+
+_probe_lock = threading.Lock()
+_probe_result: Optional[tuple[str, str]] = None
+
+
+def _probe_device():
     if torch.cuda.is_available():
         try:
             device_index = torch.cuda.current_device()
@@ -36,18 +52,253 @@ def get_safe_device():
     return "cpu", "CUDA not available, using CPU."
 
 
-def safe_run_model(model_fn, *args, **kwargs):
+def get_safe_device(refresh: bool = False):
+    """Return a safe device (GPU if available and supported, else CPU).
+    The probe runs once per process; pass refresh=True to re-run it."""
+    global _probe_result
+    with _probe_lock:
+        if _probe_result is None or refresh:
+            _probe_result = _probe_device()
+            logging.info(f"[Device Management] {_probe_result[1]}")
+        return _probe_result
+
+
+def is_oom_error(error: BaseException) -> bool:
+    if isinstance(error, getattr(torch.cuda, "OutOfMemoryError", ())):
+        return True
+    return isinstance(error, RuntimeError) and "CUDA out of memory" in str(error)
+
+
+def tensor_bytes(obj: Any) -> int:
+    """Total size of the tensors/arrays inside `obj` (nested dicts, lists and tuples included)."""
+    if isinstance(obj, torch.Tensor):
+        return obj.numel() * obj.element_size()
+    if hasattr(obj, "nbytes") and not isinstance(obj, (str, bytes)):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(tensor_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(tensor_bytes(v) for v in obj)
+    return 0
+
+
+def windowed_estimate(model, batch_size: int) -> int:
+    """Admission estimate for a pyannote model run through Inference, which slides the model's
+    own window over the input and sends `batch_size` windows to the device at a time: the
+    device only ever holds one batch, however long the recording is."""
+    specifications = getattr(model, "specifications", None)
+    window_seconds = float(getattr(specifications, "duration", None) or DEFAULT_WINDOW_SECONDS)
+    return int(window_seconds * SAMPLE_RATE * 4 * max(1, batch_size) * settings.DEVICE_ACTIVATION_FACTOR)
+
+
+def pipeline_estimate(pipeline) -> int:
+    """windowed_estimate for a diarisation pipeline: its segmentation and embedding steps
+    each run window batches, the larger of the two bounds what it needs at once."""
+    segmentation = getattr(getattr(pipeline, "_segmentation", None), "model", None)
+    batch_size = max(getattr(pipeline, "segmentation_batch_size", 1), getattr(pipeline, "embedding_batch_size", 1))
+    return windowed_estimate(segmentation, batch_size)
+
+
+def move_to(obj: Any, device: str) -> Any:
+    """`obj` with every tensor inside it on `device`; models are moved in place."""
+    if isinstance(obj, torch.Tensor):
+        return obj.to(device)
+    if isinstance(obj, dict):
+        return {k: move_to(v, device) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(move_to(v, device) for v in obj)
+    if hasattr(obj, "to") and callable(obj.to):
+        # nn.Modules and pyannote pipelines both accept a torch.device
+        moved = obj.to(torch.device(device))
+        return obj if moved is None else moved
+    return obj
+
+
+class DeviceManager:
+    """Per-process view of device memory: what is free, what running work has reserved,
+    and how often work had to be shrunk or sent to the CPU."""
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._reserved: dict[str, int] = defaultdict(int)
+        self._peak_reserved: dict[str, int] = defaultdict(int)
+        self.counters: Counter = Counter()
+
+    @property
+    def device(self) -> str:
+        return get_safe_device()[0]
+
+    def memory(self, device: str) -> Optional[tuple[int, int]]:
+        """(free, total) bytes on a CUDA device as the driver sees it, None for the CPU."""
+        if not device.startswith("cuda"):
+            return None
+        index = torch.device(device).index or 0
+        return torch.cuda.mem_get_info(index)
+
+    def available(self, device: str) -> Optional[int]:
+        """Free memory not already promised to admitted work."""
+        memory = self.memory(device)
+        if memory is None:
+            return None
+        with self._lock:
+            return memory[0] - self._reserved[device] - settings.DEVICE_MEMORY_HEADROOM_MB * 1024 ** 2
+
+    @contextmanager
+    def reserve(self, estimate_bytes: int, device: Optional[str] = None):
+        """Admit work needing roughly `estimate_bytes` of device memory, yielding the device
+        to run it on. Waits up to DEVICE_ADMISSION_WAIT_SECONDS for other work to release
+        enough memory, then gives up and yields "cpu" instead. With nothing reserved in this
+        process there is nothing to wait for, so it gives up at once."""
+        device = device or self.device
+        if not device.startswith("cuda"):
+            yield device
+            return
+
+        deadline = time.monotonic() + settings.DEVICE_ADMISSION_WAIT_SECONDS
+        with self._lock:
+            while self.available(device) < estimate_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._reserved[device] <= 0:
+                    self.counters["admission_cpu_fallbacks"] += 1
+                    logging.warning(
+                        f"[Device Management] {estimate_bytes / 1024**2:.0f} MB not available on {device}; "
+                        f"running on CPU."
+                    )
+                    device = "cpu"
+                    break
+                self.counters["admission_waits"] += 1
+                self._lock.wait(timeout=min(remaining, 1.0))
+            if device != "cpu":
+                self._reserved[device] += estimate_bytes
+                self._peak_reserved[device] = max(self._peak_reserved[device], self._reserved[device])
+                self.counters["allocations"] += 1
+                self.counters["allocated_mb"] += round(estimate_bytes / 1024 ** 2)
+        try:
+            yield device
+        finally:
+            if device != "cpu":
+                with self._lock:
+                    self._reserved[device] -= estimate_bytes
+                    self._lock.notify_all()
+
+    def record(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        device = self.device
+        memory = self.memory(device)
+        with self._lock:
+            return {
+                "device": device,
+                "free_MB": round(memory[0] / 1024 ** 2, 2) if memory else None,
+                "total_MB": round(memory[1] / 1024 ** 2, 2) if memory else None,
+                "reserved_MB": round(self._reserved[device] / 1024 ** 2, 2),
+                "peak_reserved_MB": round(self._peak_reserved[device] / 1024 ** 2, 2),
+                "counters": dict(self.counters),
+            }
+
+
+device_manager = DeviceManager()
+
+
+class ModelUseLock:
+    """Shared by runs of a model on its own device, exclusive for a CPU fallback. Models
+    come from the process-wide registry, so moving one to the CPU and back must wait for
+    other threads' runs to finish, and holds new ones off until it is back."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._users = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._cond:
+            while self._exclusive or self._waiting:
+                self._cond.wait()
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._users -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._waiting += 1
+            while self._exclusive or self._users:
+                self._cond.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+_model_locks: "weakref.WeakKeyDictionary[Any, ModelUseLock]" = weakref.WeakKeyDictionary()
+_model_locks_guard = threading.Lock()
+
+
+def model_use_lock(model) -> ModelUseLock:
+    with _model_locks_guard:
+        lock = _model_locks.get(model)
+        if lock is None:
+            lock = _model_locks[model] = ModelUseLock()
+        return lock
+
+
+def safe_run_model(model_fn, *args, model=None, estimate_bytes: Optional[int] = None, **kwargs):
     """
     Run a model with safe device handling.
-    Falls back to CPU if CUDA OOM or compatibility errors occur.
+
+    Work is admitted against free device memory: `estimate_bytes` if given (see
+    windowed_estimate, for models that window their input), otherwise inputs x
+    DEVICE_ACTIVATION_FACTOR. On CUDA OOM a `batch_size` keyword is halved and the
+    call retried on the same device; once it can't shrink further, `model` and the
+    inputs are moved to the CPU for one more attempt (and the model moved back
+    afterwards), with no other thread running `model` meanwhile.
     """
-    device, msg = get_safe_device()
-    print(f"[Device Management] {msg}")
-
-    try:
-        return model_fn(*args, **kwargs)
-    except RuntimeError as e:
-        if "CUDA out of memory" in str(e) or "not compatible" in str(e):
-            print("[Device Management] CUDA error detected, retrying on CPU.")
-            return model_fn(device="cpu", *args, **kwargs)
-        raise
\ No newline at end of file
+    if estimate_bytes is None:
+        estimate_bytes = tensor_bytes((args, kwargs)) * settings.DEVICE_ACTIVATION_FACTOR
+    with device_manager.reserve(estimate_bytes) as device:
+        if device == "cpu" and model is not None and device_manager.device != "cpu":
+            return _run_on_cpu(model_fn, model, args, kwargs)
+        with model_use_lock(model).shared() if model is not None else nullcontext():
+            while True:
+                try:
+                    return model_fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_oom_error(e):
+                        raise
+                    torch.cuda.empty_cache()
+                    batch_size = kwargs.get("batch_size")
+                    if batch_size and batch_size > 1:
+                        kwargs["batch_size"] = batch_size // 2
+                        device_manager.record("oom_batch_reductions")
+                        logging.warning(f"[Device Management] CUDA OOM; retrying with batch_size={kwargs['batch_size']}.")
+                        continue
+                    if model is None:
+                        raise
+                    break
+        # Outside the shared hold, which the move to the CPU has to wait out
+        logging.warning("[Device Management] CUDA OOM; retrying on CPU.")
+        device_manager.record("oom_cpu_fallbacks")
+        return _run_on_cpu(model_fn, model, args, kwargs)
+
+
+def _run_on_cpu(model_fn, model, args, kwargs):
+    original = device_manager.device
+    with model_use_lock(model).exclusive():
+        move_to(model, "cpu")
+        try:
+            return model_fn(*move_to(args, "cpu"), **move_to(kwargs, "cpu"))
+        finally:
+            move_to(model, original)
+            torch.cuda.empty_cache()
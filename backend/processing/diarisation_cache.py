@@ -0,0 +1,300 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of the expensive, threshold-independent transcription outputs.
+
+Re-running a meeting only to try a different snr_threshold or
+embedding_match_threshold should not repeat diarisation, SNR/embedding
+inference or Whisper. Everything here is keyed by the audio content hash plus
+whatever else determines the result (model names and the revisions they load,
+pyannote version, num_speakers), and lives under UPLOAD_DIR/diarisation_cache/<key>/:
+
+    diarisation.rttm          the raw (unlabelled) pyannote Annotation
+    pipeline-centroids.npz    per-speaker embeddings returned by the pipeline
+    features-<sig>.npz        per-candidate-segment SNR and embeddings
+    speech-<sig>.npz          frame-level speech probability over the whole recording
+    asr-<sig>.json            per-turn Whisper text
+
+Each write or cache hit marks its recording's directory as used; past
+DIARISATION_CACHE_MAX_MB the least recently used recordings are removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy
+from pyannote.core import Annotation, Segment
+
+from backend.config import settings
+from backend.processing.model_availability import hf_repo_revision
+
+_HASH_CHUNK_BYTES = 8 * 1024 * 1024
+# Evict down to this fraction of the limit, so eviction doesn't run on every write
+_EVICT_TO = 0.9
+
+
+def _signature(*parts) -> str:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def audio_content_hash(input_file: Path) -> str:
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def diarisation_cache_key(input_file: Path, num_speakers: Optional[int], long_form: bool = False) -> str:
+    """Content hash of the audio + diarisation pipeline and revision + requested speaker count
+    (+ the window layout, when the recording is diarised in long-form windows)."""
+    import pyannote.audio
+    parts = [
+        audio_content_hash(input_file),
+        settings.DIARISATION_PIPELINE_NAME,
+        hf_repo_revision(settings.DIARISATION_PIPELINE_NAME),
+        getattr(pyannote.audio, "__version__", "unknown"),
+        num_speakers,
+    ]
+    if long_form:
+        parts += [
+            "long-form",
+            settings.LONG_FORM_WINDOW_SECONDS,
+            settings.LONG_FORM_OVERLAP_SECONDS,
+            settings.LONG_FORM_STITCH_THRESHOLD,
+        ]
+    return _signature(*parts)
+
+
+def cache_root() -> Path:
+    return settings.UPLOAD_DIR / "diarisation_cache"
+
+
+def cache_dir(key: str) -> Path:
+    return cache_root() / key
+
+
+def _touch(key: str) -> None:
+    """Mark a recording's entry as used, so eviction takes it last."""
+    try:
+        os.utime(cache_dir(key))
+    except OSError:
+        pass
+
+
+def prune_cache(keep: Optional[str] = None) -> int:
+    """Remove the least recently used recordings until the cache is under
+    DIARISATION_CACHE_MAX_MB, never `keep`. Returns how many were removed."""
+    max_bytes = settings.DIARISATION_CACHE_MAX_MB * 1024**2
+    if not max_bytes or not cache_root().is_dir():
+        return 0
+    entries = []
+    for entry in cache_root().iterdir():
+        try:
+            if entry.is_dir():
+                size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+                entries.append((entry.stat().st_mtime, size, entry))
+        except OSError:
+            continue  # removed by another worker meanwhile
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return 0
+    evicted = 0
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes * _EVICT_TO:
+            break
+        if entry.name == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted += 1
+    logging.info(f"Diarisation cache over {settings.DIARISATION_CACHE_MAX_MB} MB; "
+                 f"evicted {evicted} least recently used recordings")
+    return evicted
+
+
+def _atomic_write(path: Path, write) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+    prune_cache(keep=path.parent.name)
+
+
+# ---- diarisation ----
+
+def save_diarisation(key: str, annotation: Annotation) -> None:
+    lines = [
+        f"SPEAKER {key} 1 {segment.start:.3f} {segment.duration:.3f} <NA> <NA> {label} <NA> <NA>\n"
+        for segment, _, label in annotation.itertracks(yield_label=True)
+    ]
+    _atomic_write(cache_dir(key) / "diarisation.rttm", lambda f: f.write("".join(lines).encode("utf-8")))
+
+
+def load_diarisation(key: str) -> Optional[Annotation]:
+    path = cache_dir(key) / "diarisation.rttm"
+    if not path.exists():
+        return None
+    _touch(key)
+    annotation = Annotation(uri=key)
+    for track, line in enumerate(path.read_text(encoding="utf-8").splitlines()):
+        fields = line.split()
+        if len(fields) < 8 or fields[0] != "SPEAKER":
+            continue
+        start, duration, label = float(fields[3]), float(fields[4]), fields[7]
+        annotation[Segment(start, start + duration), track] = label
+    logging.info(f"Loaded cached diarisation from {path}")
+    return annotation
+
+
+def save_pipeline_centroids(key: str, centroids: dict[str, numpy.ndarray]) -> None:
+    labels = sorted(centroids)
+    def write(f):
+        numpy.savez(
+            f,
+            labels=numpy.array(labels, dtype=str),
+            embeddings=numpy.vstack([centroids[label] for label in labels]) if labels else numpy.zeros((0, 0)),
+        )
+    _atomic_write(cache_dir(key) / "pipeline-centroids.npz", write)
+
+
+def load_pipeline_centroids(key: str) -> Optional[dict[str, numpy.ndarray]]:
+    path = cache_dir(key) / "pipeline-centroids.npz"
+    if not path.exists():
+        return None
+    _touch(key)
+    with numpy.load(path) as data:
+        return {str(label): embedding for label, embedding in zip(data["labels"], data["embeddings"])}
+
+
+# ---- per-segment SNR / embeddings ----
+
+@dataclass
+class SegmentFeatures:
+    """SNR and embedding for every candidate reference segment of every speaker.
+    `snr` is NaN where the SNR model detected no speech (no embedding then either)."""
+    speakers: list[str]
+    starts: numpy.ndarray
+    ends: numpy.ndarray
+    snr: numpy.ndarray
+    embeddings: numpy.ndarray  # (n, dim), L2-normalised; zero rows where snr is NaN
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+
+def features_signature(min_segment_duration: float) -> str:
+    return _signature(
+        settings.SNR_MODEL_NAME, hf_repo_revision(settings.SNR_MODEL_NAME),
+        settings.SPEAKER_EMBEDDING_MODEL_NAME, hf_repo_revision(settings.SPEAKER_EMBEDDING_MODEL_NAME),
+        min_segment_duration,
+    )
+
+
+def save_segment_features(key: str, signature: str, features: SegmentFeatures) -> None:
+    def write(f):
+        numpy.savez(
+            f,
+            speakers=numpy.array(features.speakers, dtype=str),
+            starts=features.starts,
+            ends=features.ends,
+            snr=features.snr,
+            embeddings=features.embeddings,
+        )
+    _atomic_write(cache_dir(key) / f"features-{signature}.npz", write)
+
+
+def load_segment_features(key: str, signature: str) -> Optional[SegmentFeatures]:
+    path = cache_dir(key) / f"features-{signature}.npz"
+    if not path.exists():
+        return None
+    _touch(key)
+    with numpy.load(path) as data:
+        logging.info(f"Loaded cached segment features from {path}")
+        return SegmentFeatures(
+            speakers=[str(s) for s in data["speakers"]],
+            starts=data["starts"],
+            ends=data["ends"],
+            snr=data["snr"],
+            embeddings=data["embeddings"],
+        )
+
+
+# ---- speech activity ----
+
+@dataclass
+class SpeechActivity:
+    """Frame-level speech probability for the whole recording; frame i covers
+    [start + i * step, start + i * step + duration) seconds."""
+    probabilities: numpy.ndarray
+    start: float
+    step: float
+    duration: float
+
+
+def speech_signature() -> str:
+    return _signature(settings.SNR_MODEL_NAME, hf_repo_revision(settings.SNR_MODEL_NAME))
+
+
+def save_speech_activity(key: str, signature: str, activity: SpeechActivity) -> None:
+    def write(f):
+        numpy.savez(
+            f,
+            probabilities=activity.probabilities,
+            frames=numpy.array([activity.start, activity.step, activity.duration]),
+        )
+    _atomic_write(cache_dir(key) / f"speech-{signature}.npz", write)
+
+
+def load_speech_activity(key: str, signature: str) -> Optional[SpeechActivity]:
+    path = cache_dir(key) / f"speech-{signature}.npz"
+    if not path.exists():
+        return None
+    _touch(key)
+    with numpy.load(path) as data:
+        logging.info(f"Loaded cached speech activity from {path}")
+        start, step, duration = (float(x) for x in data["frames"])
+        return SpeechActivity(probabilities=data["probabilities"], start=start, step=step, duration=duration)
+
+
+# ---- Whisper text ----
+
+def asr_signature(*parts) -> str:
+    return _signature(*parts)
+
+
+def save_transcript_texts(key: str, signature: str, turns: list[tuple[float, float]], texts: list[str]) -> None:
+    payload = [{"start": start, "end": end, "text": text} for (start, end), text in zip(turns, texts)]
+    _atomic_write(cache_dir(key) / f"asr-{signature}.json", lambda f: f.write(json.dumps(payload).encode("utf-8")))
+
+
+def load_transcript_texts(key: str, signature: str, turns: list[tuple[float, float]]) -> Optional[list[str]]:
+    """Cached texts, but only if they were produced for exactly these turns."""
+    path = cache_dir(key) / f"asr-{signature}.json"
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    cached_turns = [(p["start"], p["end"]) for p in payload]
+    if len(cached_turns) != len(turns) or not numpy.allclose(cached_turns, turns, atol=2e-3):
+        return None
+    _touch(key)
+    logging.info(f"Loaded cached transcript text from {path}")
+    return [p["text"] for p in payload]
@@ -23,73 +23,87 @@ logging.basicConfig(
     ]
 )
 
-from sklearn.preprocessing import normalize
 from backend.config import settings
 from sqlalchemy.orm import Session
 from datetime import datetime
-import torch
-from pyannote.audio import Model, Inference
+from typing import Optional
 import os
-from backend.processing.device_management import get_safe_device, safe_run_model
+import numpy
+import torch
+from backend.processing.device_management import safe_run_model
+from backend.processing.audio_loading import MeetingAudio, load_meeting_audio
+from backend.processing.reference_extraction import default_batch_size, make_batches
+from backend.processing.speaker_embedding import embed_enrolment_batch, active_embedding_model_name
+from backend.processing.member_search import ensure_embedding_index
+from backend.processing.voice_prints import refresh_voice_print
 
 # Get Hugging Face token stored in env file
 HUGGING_FACE_TOKEN = os.getenv("HUGGING_FACE_TOKEN")
 if not HUGGING_FACE_TOKEN:
     raise RuntimeError("HUGGING_FACE_TOKEN environment variable not set.")
 
-def generate_embedding(member_id: int, db: Session):
-    logging.info(f"Started embedding process for member_id={member_id}")
-    from backend.models import GroupMember
-
-    #load speaker samples and generate the embeddings to be tested below
-    logging.debug("Loading pyannote/embedding model")
-    embedding_model = Model.from_pretrained("pyannote/embedding",
-                              use_auth_token=HUGGING_FACE_TOKEN)
-    
-
-    # Ask device manager what’s safe
-    device, msg = get_safe_device()
-    logging.info(msg)
-
-    # Move the model safely
-    embedding_model.to(torch.device(device))
-
-    embedding_inference = Inference(embedding_model, window="whole")
-
-    try:
-        logging.debug(f"Getting member information")
-        member = db.query(GroupMember).get(member_id)
-        if not member:
-            logging.warning(f"Member with id={member_id} not found during embedding update.")
-            return  # Or log
-        
-        # Define path
-        embedding_dir = settings.EMBEDDING_DIR
-        audio_path = embedding_dir / member.embedding_audio_path
-
-        #check file exists before processing
-        if audio_path.exists():
-            logging.info(f"Running inference on file: {audio_path}")
-
-            #use this definition to pass the call to safe_run_model
-            def run_inference(path, inference_obj):
-                return inference_obj(path)
-
-            embedding_vector = safe_run_model(run_inference, audio_path, inference_obj=embedding_inference)
-
-            embedding_array = embedding_vector.reshape(1, -1)  # (1, 512)
-            embedding_array = normalize(embedding_array)       # L2 normalize
-            embedding_list = embedding_array.flatten().tolist()
-        
-
-            member.embedding = embedding_list
-            member.embedding_updated_at = datetime.now().astimezone()
-            db.commit()
-
-            logging.info(f"Embedding complete for member {member_id}, and database updated.")
-        else:
-            logging.warning(f"No audio file found at {audio_path} for member_id={member_id}")
-            return
-    except Exception as e:
-        # You might want logging here
-        logging.error(f"Embedding failed for member_id={member_id}: {e}", exc_info=True)
+def _padded_batch(audios: list[MeetingAudio]) -> tuple[torch.Tensor, torch.Tensor]:
+    longest = max(len(audio.samples) for audio in audios)
+    waveforms = torch.zeros((len(audios), 1, longest), dtype=torch.float32)
+    mask = torch.zeros((len(audios), longest), dtype=torch.float32)
+    for row, audio in enumerate(audios):
+        waveforms[row, 0, :len(audio.samples)] = torch.from_numpy(numpy.ascontiguousarray(audio.samples))
+        mask[row, :len(audio.samples)] = 1.0
+    return waveforms, mask
+
+
+def _embed_in_chunks(audios: list[MeetingAudio], batch_size: int) -> list[numpy.ndarray]:
+    # batch_size is a keyword so safe_run_model can halve it on CUDA OOM
+    vectors = []
+    for start in range(0, len(audios), batch_size):
+        vectors.extend(embed_enrolment_batch(*_padded_batch(audios[start:start + batch_size])))
+    return vectors
+
+
+def embed_samples(sample_ids: list[int], db: Session, batch_size: Optional[int] = None) -> int:
+    """Embed the enrolment clips in `sample_ids`, recompute the voice print of every member
+    they belong to, and write it all in one transaction. Returns the number of clips embedded.
+
+    The model is loaded once (the registry keeps it for the life of the process) and the
+    clips go through it in length-sorted padded batches, so enrolling a whole cohort costs
+    one model load rather than one per member. Clips missing from disk are skipped; any
+    other failure raises before anything is written, so the job can be retried as a whole."""
+    from backend.models import MemberVoiceSample
+
+    #members are embedded with the same model transcription matches on (settings.SPEAKER_EMBEDDING_SOURCE);
+    #the registry keeps one copy per process, already moved to the safe device
+    model_name = active_embedding_model_name()
+    logging.info(f"Started embedding process for {len(sample_ids)} voice sample(s) with {model_name}")
+
+    samples, audios = [], []
+    for sample in db.query(MemberVoiceSample).filter(MemberVoiceSample.id.in_(sample_ids)).all():
+        audio_path = settings.EMBEDDING_DIR / sample.audio_path if sample.audio_path else None
+        if audio_path is None or not audio_path.exists():
+            logging.warning(f"No audio file found at {audio_path} for voice sample {sample.id}")
+            continue
+        samples.append(sample)
+        audios.append(load_meeting_audio(audio_path))
+    if not samples:
+        return 0
+
+    batch_size = batch_size or default_batch_size()
+    max_batch_samples = int(settings.REFERENCE_BATCH_MAX_SECONDS * audios[0].sample_rate)
+    batches = make_batches([max(1, len(audio.samples)) for audio in audios], batch_size, max_batch_samples,
+                           settings.REFERENCE_BATCH_MAX_PADDING)
+    logging.info(f"Embedding {len(samples)} enrolment recordings in {len(batches)} batches")
+
+    for batch in batches:
+        vectors = safe_run_model(_embed_in_chunks, [audios[i] for i in batch], batch_size=len(batch))  # L2 normalised
+        for index, vector in zip(batch, vectors):
+            samples[index].embedding = vector
+            samples[index].embedding_model = model_name
+
+    # Only the centroids change for everyone else's samples - nothing else is re-embedded
+    members = {sample.member_id: sample.member for sample in samples}
+    for member in members.values():
+        refresh_voice_print(member, model_name)
+    ensure_embedding_index(db, model_name, len(vectors[0]))
+
+    db.commit()
+    logging.info(f"Embedding complete for members {sorted(members)}, and database updated.")
+    return len(samples)
@@ -0,0 +1,177 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Diarise multi-hour recordings in overlapping fixed-length windows.
+
+The diarisation pipeline's memory grows with the length of what it is given
+(segmentation output, embeddings for every chunk, the clustering affinity
+matrix), so recordings longer than settings.LONG_FORM_MIN_SECONDS are fed to it
+one LONG_FORM_WINDOW_SECONDS window at a time - each a view into the
+(memory-mapped, see audio_loading.py) meeting buffer - and peak memory is set by
+the window length rather than the recording length.
+
+Speaker labels are only meaningful within one window, so each window's speakers
+are stitched onto the running set of global speakers: per-window centroids (the
+pipeline's own, via return_embeddings=True) are compared with the global
+centroids, assigned one-to-one with the Hungarian algorithm, and anything below
+LONG_FORM_STITCH_THRESHOLD becomes a new global speaker. Neighbouring windows
+overlap by LONG_FORM_OVERLAP_SECONDS and each keeps only its half of the
+overlap, so no speech is cut at a window edge.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy
+from pyannote.core import Annotation, Segment
+from scipy.optimize import linear_sum_assignment
+
+from backend.config import settings
+from backend.processing.speaker_matching import assign_above_threshold, similarity_matrix
+
+if TYPE_CHECKING:
+    from backend.processing.audio_loading import MeetingAudio
+
+
+@dataclass
+class DiarisationWindow:
+    start: float  # audio given to the pipeline
+    end: float
+    keep_start: float  # part of the result this window is responsible for
+    keep_end: float
+
+
+def plan_windows(duration: float, window_seconds: float, overlap_seconds: float) -> list[DiarisationWindow]:
+    """Overlapping windows covering [0, duration); each keeps the middle of its overlaps."""
+    if duration <= window_seconds:
+        return [DiarisationWindow(0.0, duration, 0.0, duration)]
+    step = window_seconds - overlap_seconds
+    starts = []
+    start = 0.0
+    while start + window_seconds < duration:
+        starts.append(start)
+        start += step
+    starts.append(max(0.0, duration - window_seconds))
+
+    windows = []
+    for i, start in enumerate(starts):
+        end = min(duration, start + window_seconds)
+        keep_start = 0.0 if i == 0 else (start + windows[-1].end) / 2
+        windows.append(DiarisationWindow(start, end, keep_start, end))
+        if i > 0:
+            windows[-2].keep_end = keep_start
+    return windows
+
+
+class SpeakerStitcher:
+    """Running set of global speakers, each with a duration-weighted centroid."""
+
+    def __init__(self, threshold: float, max_speakers: Optional[int] = None):
+        self.threshold = threshold
+        self.max_speakers = max_speakers
+        self.centroids: list[numpy.ndarray] = []
+        self.weights: list[float] = []
+
+    @staticmethod
+    def label(index: int) -> str:
+        return f"SPEAKER_{index:02d}"
+
+    def assign(self, local: dict[str, numpy.ndarray], durations: dict[str, float]) -> dict[str, str]:
+        """Map a window's local labels onto global labels, updating the global centroids."""
+        labels = sorted(local)
+        mapping: dict[str, int] = {}
+        if labels and self.centroids:
+            sims = similarity_matrix(numpy.vstack([local[l] for l in labels]), numpy.vstack(self.centroids))
+            full = self.max_speakers is not None and len(self.centroids) >= self.max_speakers
+            if full:
+                # Once every expected speaker exists, the best available match is taken regardless
+                rows, cols = linear_sum_assignment(sims, maximize=True)
+                pairs = zip(rows, cols)
+            else:
+                # Weak pairs are excluded before assigning, so one cannot displace a strong one
+                # and split a speaker who clearly matches into a new global speaker
+                pairs = assign_above_threshold(sims, self.threshold)
+            for row, col in pairs:
+                mapping[labels[row]] = int(col)
+
+        for label in labels:
+            if label in mapping:
+                continue
+            at_capacity = self.max_speakers is not None and len(self.centroids) >= self.max_speakers
+            if at_capacity:
+                # More local speakers than are left unassigned - fold into the closest global speaker
+                sims = similarity_matrix(local[label][None, :], numpy.vstack(self.centroids))[0]
+                mapping[label] = int(numpy.argmax(sims))
+                continue
+            self.centroids.append(numpy.zeros_like(local[label], dtype=numpy.float64))
+            self.weights.append(0.0)
+            mapping[label] = len(self.centroids) - 1
+
+        for label, index in mapping.items():
+            weight = max(durations.get(label, 0.0), 1e-3)
+            total = self.weights[index] + weight
+            self.centroids[index] = (self.centroids[index] * self.weights[index] + local[label] * weight) / total
+            self.weights[index] = total
+
+        return {label: self.label(index) for label, index in mapping.items()}
+
+    def global_centroids(self) -> dict[str, numpy.ndarray]:
+        return {self.label(i): centroid for i, centroid in enumerate(self.centroids)}
+
+
+def diarise_long_form(pipeline, meeting_audio: "MeetingAudio", num_speakers: Optional[int] = None,
+                      run=None) -> tuple[Annotation, dict[str, numpy.ndarray]]:
+    """Diarise `meeting_audio` window by window and stitch speakers across windows.
+
+    Returns the stitched Annotation and the global per-speaker centroids (in the
+    diarisation pipeline's embedding space). `run(audio, **kwargs)` invokes the
+    pipeline and defaults to calling it directly; transcribe.py passes one that
+    goes through safe_run_model.
+    """
+    run = run or (lambda audio, **kwargs: pipeline(audio, **kwargs))
+    windows = plan_windows(meeting_audio.duration, settings.LONG_FORM_WINDOW_SECONDS, settings.LONG_FORM_OVERLAP_SECONDS)
+    stitcher = SpeakerStitcher(settings.LONG_FORM_STITCH_THRESHOLD, max_speakers=num_speakers or None)
+    stitched = Annotation()
+    track = 0
+    logging.info(f"Long-form diarisation: {meeting_audio.duration:.0f}s in {len(windows)} windows")
+
+    for number, window in enumerate(windows, start=1):
+        # Not every attendee speaks in every window, so the count is an upper bound here
+        local_result, local_embeddings = run(
+            meeting_audio.as_pyannote(window.start, window.end),
+            max_speakers=num_speakers or None,
+            return_embeddings=True,
+        )
+        local_centroids = {
+            label: numpy.asarray(embedding, dtype=numpy.float64)
+            for label, embedding in zip(local_result.labels(), local_embeddings)
+            if numpy.all(numpy.isfinite(embedding))
+        }
+        durations = {label: local_result.label_duration(label) for label in local_centroids}
+        mapping = stitcher.assign(local_centroids, durations)
+
+        keep = Segment(window.keep_start - window.start, window.keep_end - window.start)
+        for segment, _, label in local_result.crop(keep, mode="intersection").itertracks(yield_label=True):
+            if label not in mapping:
+                continue  # the pipeline could not embed this speaker, so it cannot be placed
+            shifted = Segment(segment.start + window.start, segment.end + window.start)
+            stitched[shifted, track] = mapping[label]
+            track += 1
+        logging.info(f"Window {number}/{len(windows)}: {len(mapping)} speakers, "
+                     f"{len(stitcher.centroids)} distinct so far")
+
+    # Turns split by a window boundary are joined back up
+    stitched = stitched.support(collar=0.0)
+    return stitched, stitcher.global_centroids()
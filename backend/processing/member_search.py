@@ -0,0 +1,86 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Nearest-voice search over member voice prints, answered inside Postgres.
+
+GroupMember.embedding is a pgvector `vector` column holding float32 values
+(about a quarter of the size of the JSON list it replaced, and read back as a
+numpy array with no JSON decoding). The column has no fixed dimension, because
+members enrolled with different embedding models have different sizes, so each
+model gets its own partial HNSW index over `embedding::vector(<dim>)` restricted
+to `embedding_model = <model>`. Queries use the same cast and filter, so the
+planner can use that index for ORDER BY ... <=> ... LIMIT k.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+import numpy
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.models import GroupMember
+
+
+def embedding_index_name(model_name: str) -> str:
+    return f"ix_group_members_embedding_{hashlib.sha1(model_name.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _quoted(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def ensure_embedding_index(db: Session, model_name: str, dimensions: int) -> None:
+    """Create the HNSW index for `model_name`'s voice prints if it does not exist yet."""
+    dimensions = int(dimensions)
+    db.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {embedding_index_name(model_name)} ON group_members "
+        f"USING hnsw ((embedding::vector({dimensions})) vector_cosine_ops) "
+        f"WHERE embedding_model = {_quoted(model_name)}"
+    ))
+    logging.debug(f"Embedding index ensured for {model_name} ({dimensions} dimensions)")
+
+
+def find_similar_members(db: Session, embedding, model_name: str, limit: int = 5,
+                         exclude_member_id: Optional[int] = None,
+                         user_id: Optional[int] = None) -> list[tuple[GroupMember, float]]:
+    """Members whose voice print is closest to `embedding`, with cosine similarity. With
+    `user_id`, only members of groups that user belongs to are considered."""
+    vector = numpy.asarray(embedding, dtype=numpy.float32).reshape(-1)
+    dimensions = len(vector)
+    rows = db.execute(
+        text(
+            f"SELECT id, 1 - (embedding::vector({dimensions}) <=> CAST(:query AS vector({dimensions}))) AS similarity "
+            f"FROM group_members "
+            f"WHERE embedding_model = :model AND vector_dims(embedding) = {dimensions} "
+            f"AND (CAST(:exclude AS integer) IS NULL OR id <> :exclude) "
+            f"AND (CAST(:user_id AS integer) IS NULL OR EXISTS ("
+            f"SELECT 1 FROM groups_group_members JOIN users_groups "
+            f"ON users_groups.group_id = groups_group_members.group_id "
+            f"WHERE groups_group_members.group_member_id = group_members.id "
+            f"AND users_groups.user_id = :user_id)) "
+            f"ORDER BY embedding::vector({dimensions}) <=> CAST(:query AS vector({dimensions})) "
+            f"LIMIT :limit"
+        ),
+        {
+            "query": "[" + ",".join(repr(float(x)) for x in vector) + "]",
+            "model": model_name,
+            "exclude": exclude_member_id,
+            "user_id": user_id,
+            "limit": limit,
+        },
+    ).all()
+    members = {m.id: m for m in db.query(GroupMember).filter(GroupMember.id.in_([r.id for r in rows])).all()}
+    return [(members[r.id], float(r.similarity)) for r in rows]
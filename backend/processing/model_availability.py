@@ -0,0 +1,205 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Which speech models this process could use, without loading any of them.
+
+Health checks must stay cheap, so instead of loading Whisper/pyannote to see
+whether they work, a model counts as available if it is already resident in the
+model registry or its weights are in the local download cache (Whisper's
+~/.cache/whisper, the Hugging Face hub cache for pyannote). The result is
+computed once at startup and refreshed by a background thread every
+MODEL_STATUS_TTL_SECONDS; /status and /status/ready only read the snapshot.
+
+Every model is reported, but only those this deployment will actually load are
+`required` for readiness: the default Whisper checkpoint and every checkpoint a
+transcription profile names, the diarisation pipeline, the standalone embedding
+model only with SPEAKER_EMBEDDING_SOURCE "segments", and the SNR model only when
+reference segments or speech-activity gating use it.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from backend.config import settings
+
+LOADED = "loaded"
+CACHED = "cached"
+MISSING = "missing"
+
+
+def whisper_cache_dir() -> Path:
+    # Where whisper.load_model() downloads to when no download_root is given
+    return Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "whisper"
+
+
+def hf_hub_cache_dir() -> Path:
+    if os.getenv("HF_HUB_CACHE"):
+        return Path(os.environ["HF_HUB_CACHE"])
+    return Path(os.getenv("HF_HOME", Path.home() / ".cache" / "huggingface")) / "hub"
+
+
+def whisper_is_cached(model_name: str) -> bool:
+    return (whisper_cache_dir() / f"{model_name}.pt").is_file()
+
+
+def hf_repo_is_cached(repo_id: str) -> bool:
+    """Whether any snapshot of `repo_id` (optionally "org/name@revision") has been downloaded,
+    i.e. holds at least one file; an empty snapshot directory is a download that never finished."""
+    repo_id = repo_id.split("@")[0]
+    snapshots = hf_hub_cache_dir() / f"models--{repo_id.replace('/', '--')}" / "snapshots"
+    return snapshots.is_dir() and any(any(snapshot.iterdir()) for snapshot in snapshots.iterdir() if snapshot.is_dir())
+
+
+def hf_repo_revision(repo_id: str) -> str:
+    """The revision `repo_id` loads as: the pinned one ("org/name@revision"), else the commit
+    the download cache resolved "main" to, else "unknown" (not downloaded yet)."""
+    repo_id, _, revision = repo_id.partition("@")
+    if revision:
+        return revision
+    ref = hf_hub_cache_dir() / f"models--{repo_id.replace('/', '--')}" / "refs" / "main"
+    try:
+        return ref.read_text(encoding="utf-8").strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _loaded_keys() -> set[str]:
+    # Only ask the registry if this process has already imported it; importing it here
+    # would pull in torch just to learn that nothing is loaded.
+    module = sys.modules.get("backend.processing.model_registry")
+    if module is None:
+        return set()
+    return {entry["key"] for entry in module.registry.loaded()}
+
+
+def _entry(name: str, registry_key: str, cached: bool, loaded: set[str], required: bool = True) -> dict[str, Any]:
+    state = LOADED if registry_key in loaded else CACHED if cached else MISSING
+    return {
+        "name": name,
+        "state": state,
+        "available": state != MISSING,
+        "required": required,
+        "status": "available" if state != MISSING else "unavailable (not downloaded)",
+    }
+
+
+def _profile_whisper_models() -> list[str]:
+    """Checkpoints named by transcription profiles; any of them can be requested."""
+    from backend.db import SessionLocal
+    from backend.models import TranscriptionProfile
+
+    try:
+        db = SessionLocal()
+        try:
+            rows = db.query(TranscriptionProfile.model_name).distinct().all()
+        finally:
+            db.close()
+    except Exception:
+        logging.exception("Could not read transcription profiles for the model check")
+        return []
+    return sorted(row[0] for row in rows)
+
+
+def check_models() -> dict[str, dict[str, Any]]:
+    """One pass over the configured models: file-system checks only, nothing is loaded."""
+    loaded = _loaded_keys()
+    # settings values rather than speaker_embedding's constants, which would import torch
+    segments = settings.SPEAKER_EMBEDDING_SOURCE == "segments"
+    models = {
+        "whisper_model": _entry(
+            settings.WHISPER_MODEL_NAME, f"whisper:{settings.WHISPER_MODEL_NAME}",
+            whisper_is_cached(settings.WHISPER_MODEL_NAME), loaded,
+        ),
+    }
+    for model_name in _profile_whisper_models():
+        if model_name != settings.WHISPER_MODEL_NAME:
+            # compute types share one download, so any resident variant counts as loaded
+            resident = {key.split("@")[0] for key in loaded}
+            models[f"whisper_model:{model_name}"] = _entry(
+                model_name, f"whisper:{model_name}", whisper_is_cached(model_name), resident,
+            )
+    models.update({
+        "pyannote_diarization": _entry(
+            settings.DIARISATION_PIPELINE_NAME, "diarisation",
+            hf_repo_is_cached(settings.DIARISATION_PIPELINE_NAME), loaded,
+        ),
+        "pyannote_embedding": _entry(
+            settings.SPEAKER_EMBEDDING_MODEL_NAME, "embedding",
+            hf_repo_is_cached(settings.SPEAKER_EMBEDDING_MODEL_NAME), loaded, required=segments,
+        ),
+        "pyannote_snr": _entry(
+            settings.SNR_MODEL_NAME, "snr", hf_repo_is_cached(settings.SNR_MODEL_NAME), loaded,
+            required=segments or settings.SPEECH_ACTIVITY_GATING,
+        ),
+    })
+    return models
+
+
+class ModelAvailability:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._models: Optional[dict[str, dict[str, Any]]] = None
+        self._checked_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> dict[str, dict[str, Any]]:
+        try:
+            models = check_models()
+        except Exception as e:
+            logging.exception("Model availability check failed")
+            models = {"error": {"state": MISSING, "available": False, "detail": str(e)}}
+        with self._lock:
+            self._models = models
+            self._checked_at = time.time()
+        return models
+
+    def snapshot(self) -> dict[str, Any]:
+        """The last check's result; runs one now if there has never been one."""
+        with self._lock:
+            models, checked_at = self._models, self._checked_at
+        if models is None:
+            models = self.refresh()
+            checked_at = self._checked_at
+        return {"models": models, "checked_at": checked_at, "ttl_seconds": self.ttl_seconds}
+
+    def all_available(self) -> bool:
+        """Whether every model this deployment will load is available (unused ones don't count)."""
+        return all(
+            model["available"] for model in self.snapshot()["models"].values() if model.get("required", True)
+        )
+
+    def start(self) -> None:
+        """Check now, then keep the snapshot fresh from a daemon thread."""
+        self.refresh()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-availability", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl_seconds):
+            self.refresh()
+
+
+model_availability = ModelAvailability(settings.MODEL_STATUS_TTL_SECONDS)
@@ -0,0 +1,252 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide cache of the loaded Whisper/pyannote models.
+
+Every model is loaded lazily on first use, moved once to the device chosen by
+device_management.get_safe_device(), and then shared by every caller in the
+process (transcription, member enrolment, the /status check). Entries are kept
+in least-recently-used order; once the estimated footprint of everything loaded
+exceeds settings.MODEL_CACHE_MAX_MB the oldest entries are dropped.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import torch
+
+from backend.config import settings
+from backend.processing.device_management import get_safe_device
+
+HUGGING_FACE_TOKEN = os.getenv("HUGGING_FACE_TOKEN")
+
+WHISPER_PREFIX = "whisper:"
+DIARISATION = "diarisation"
+EMBEDDING = "embedding"
+SNR = "snr"
+
+
+def _module_bytes(obj: Any) -> int:
+    """Best-effort estimate of the parameter/buffer memory held by a model.
+    pyannote pipelines are not nn.Modules themselves, so look one level into
+    their attributes for the models they wrap."""
+    if isinstance(obj, torch.nn.Module):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    total = 0
+    for value in vars(obj).values() if hasattr(obj, "__dict__") else []:
+        if isinstance(value, torch.nn.Module):
+            total += _module_bytes(value)
+        elif isinstance(value, dict):
+            total += sum(_module_bytes(v) for v in value.values() if isinstance(v, torch.nn.Module))
+        elif hasattr(value, "model") and isinstance(getattr(value, "model"), torch.nn.Module):
+            total += _module_bytes(value.model)
+        elif hasattr(value, "model_") and isinstance(getattr(value, "model_"), torch.nn.Module):
+            total += _module_bytes(value.model_)
+    return total
+
+
+class _Entry:
+    def __init__(self, model: Any, device: str, size_bytes: int):
+        self.model = model
+        self.device = device
+        self.size_bytes = size_bytes
+
+
+class ModelRegistry:
+    """Thread-safe, lazily populated LRU cache of named model loaders."""
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes  # 0 means unbounded
+        self._loaders: dict[str, Callable[[str], Any]] = {}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: dict[str, threading.Lock] = {}
+
+    def register(self, key: str, loader: Callable[[str], Any]) -> None:
+        """Register `loader(device) -> model` under `key`. Nothing is loaded until get()."""
+        with self._lock:
+            self._loaders[key] = loader
+
+    def _loader_for(self, key: str) -> Callable[[str], Any]:
+        if key in self._loaders:
+            return self._loaders[key]
+        # Whisper sizes are open-ended ("base", "medium.en", ...), so they are
+        # resolved by prefix rather than registered one by one.
+        if key.startswith(WHISPER_PREFIX):
+            model_name, _, compute_type = key[len(WHISPER_PREFIX):].partition("@")
+            return _whisper_loader(model_name, compute_type or "fp32")
+        raise KeyError(f"No model loader registered for '{key}'")
+
+    def get(self, key: str) -> Any:
+        """Return the model for `key`, loading it on first use."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry.model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so one slow download doesn't block
+        # callers of models that are already resident; the per-key lock stops
+        # two threads loading the same model at once.
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry.model
+
+            device, msg = get_safe_device()
+            logging.info(f"[Model Registry] Loading '{key}'. {msg}")
+            model = self._loader_for(key)(device)
+            entry = _Entry(model, device, _module_bytes(model))
+            logging.info(f"[Model Registry] Loaded '{key}' on {device} (~{entry.size_bytes / 1024**2:.0f} MB)")
+
+            with self._lock:
+                self._entries[key] = entry
+                self._evict_over_budget(keep=key)
+            return model
+
+    def _evict_over_budget(self, keep: str) -> None:
+        if not self.max_bytes:
+            return
+        evicted = False
+        while self._total_bytes() > self.max_bytes:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            logging.info(f"[Model Registry] Evicting '{victim}' to stay within the model memory budget")
+            del self._entries[victim]
+            evicted = True
+        if evicted:
+            _release_device_memory()
+
+    def _total_bytes(self) -> int:
+        return sum(e.size_bytes for e in self._entries.values())
+
+    def warm(self, *keys: str) -> None:
+        """Load the given models now rather than on first use."""
+        for key in keys:
+            self.get(key)
+
+    def unload(self, key: Optional[str] = None) -> None:
+        """Drop one model (or every model if `key` is None) from the cache."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        _release_device_memory()
+
+    def is_loaded(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def loaded(self) -> list[dict[str, Any]]:
+        """Snapshot of what is resident, least recently used first."""
+        with self._lock:
+            return [
+                {"key": key, "device": e.device, "size_mb": round(e.size_bytes / 1024**2, 1)}
+                for key, e in self._entries.items()
+            ]
+
+
+def _release_device_memory() -> None:
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _whisper_loader(model_name: str, compute_type: str = "fp32") -> Callable[[str], Any]:
+    def load(device: str):
+        import whisper
+        model = whisper.load_model(model_name, device=device)
+        if compute_type == "int8":
+            if device == "cpu":
+                return _quantize_int8(model)
+            # torch's dynamic int8 kernels are CPU-only; on a GPU int8 decodes in fp16 instead
+            logging.warning(f"[Model Registry] int8 is CPU-only; '{model_name}' will decode in fp16 on {device}")
+        return model
+    return load
+
+
+def _quantize_int8(model):
+    """Dynamic int8 quantisation of every Linear layer (weights int8, activations quantised on the fly)."""
+    # quantize_dynamic only swaps modules whose type is exactly nn.Linear. Whisper's Linear
+    # subclass only adds a cast to the input dtype, which fp32 inference on the CPU never needs.
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def whisper_key(model_name: str, compute_type: str = "fp32") -> str:
+    """Registry key for a Whisper checkpoint at a compute type; fp32 keeps the plain key."""
+    suffix = "" if compute_type == "fp32" else f"@{compute_type}"
+    return f"{WHISPER_PREFIX}{model_name}{suffix}"
+
+
+def whisper_decode_fp16(model, compute_type: str) -> bool:
+    """Whether to decode with Whisper's fp16 option: only on a GPU, where int8 also falls back to it."""
+    return compute_type in ("fp16", "int8") and str(model.device).startswith("cuda")
+
+
+def _load_diarisation_pipeline(device: str):
+    from pyannote.audio import Pipeline
+    pipeline = Pipeline.from_pretrained(settings.DIARISATION_PIPELINE_NAME, use_auth_token=HUGGING_FACE_TOKEN)
+    pipeline.to(torch.device(device))
+    return pipeline
+
+
+def _load_embedding_model(device: str):
+    from pyannote.audio import Model
+    model = Model.from_pretrained(settings.SPEAKER_EMBEDDING_MODEL_NAME, use_auth_token=HUGGING_FACE_TOKEN)
+    model.to(torch.device(device))
+    model.eval()
+    return model
+
+
+def _load_snr_model(device: str):
+    from pyannote.audio import Model
+    model = Model.from_pretrained(settings.SNR_MODEL_NAME, use_auth_token=HUGGING_FACE_TOKEN)
+    model.to(torch.device(device))
+    model.eval()
+    return model
+
+
+registry = ModelRegistry(max_bytes=settings.MODEL_CACHE_MAX_MB * 1024**2)
+registry.register(DIARISATION, _load_diarisation_pipeline)
+registry.register(EMBEDDING, _load_embedding_model)
+registry.register(SNR, _load_snr_model)
+
+
+def get_whisper_model(model_name: str, compute_type: str = "fp32"):
+    return registry.get(whisper_key(model_name, compute_type))
+
+
+def get_diarisation_pipeline():
+    return registry.get(DIARISATION)
+
+
+def get_embedding_model():
+    return registry.get(EMBEDDING)
+
+
+def get_snr_model():
+    return registry.get(SNR)
+
@@ -0,0 +1,191 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batched SNR and speaker-embedding extraction for diarised reference segments.
+
+Rather than one brouhaha pass and one embedding pass per segment, every
+candidate segment of every speaker is collected up front, sorted by length and
+run through both models as zero-padded (batch, channel, samples) tensors.
+Brouhaha frames beyond a segment's real length are ignored, and the embedding
+model's statistics pooling is given per-sample weights that exclude padding.
+Masking cannot reach everything, though: both models start with a SincNet
+front end whose InstanceNorm1d normalises over the whole padded waveform, so
+padding still shifts a short segment's SNR and embedding a little. Batches are
+therefore limited to segments of near-equal length
+(REFERENCE_BATCH_MAX_PADDING), which keeps that padding to a small fraction of
+any segment.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy
+import torch
+
+from backend.config import settings
+from backend.processing.audio_loading import MeetingAudio
+from backend.processing.device_management import device_manager, get_safe_device, is_oom_error
+from backend.processing.diarisation_cache import SegmentFeatures
+from backend.processing.model_registry import get_embedding_model, get_snr_model
+
+VAD_THRESHOLD = 0.5
+
+
+@dataclass
+class Candidate:
+    speaker: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def default_batch_size(device: Optional[str] = None) -> int:
+    if device is None:
+        device, _ = get_safe_device()
+    return settings.REFERENCE_BATCH_SIZE_CUDA if device.startswith("cuda") else settings.REFERENCE_BATCH_SIZE_CPU
+
+
+def collect_candidates(segments_by_speaker, min_segment_duration: float) -> list[Candidate]:
+    """Segments long enough to be used as a reference (or a speaker's only segment)."""
+    candidates = []
+    for speaker, segments in segments_by_speaker.items():
+        for segment in segments:
+            # Ignore short segments if there are other longer ones
+            if segment.end - segment.start < min_segment_duration and len(segments) > 1:
+                continue
+            candidates.append(Candidate(speaker, segment.start, segment.end))
+    return candidates
+
+
+def make_batches(lengths: list[int], batch_size: int, max_batch_samples: int,
+                 max_padding: Optional[float] = None) -> list[list[int]]:
+    """Group indices into length-sorted batches of at most `batch_size` items whose
+    padded size (items x longest) stays within `max_batch_samples`; a single
+    over-long item still gets a batch of its own. With `max_padding`, a batch's
+    longest item is at most that fraction longer than its shortest."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current = [], []
+    for index in order:
+        # sorted ascending, so the newest item is always the longest in the batch
+        padded = (len(current) + 1) * lengths[index]
+        too_uneven = (
+            max_padding is not None and current and lengths[index] > lengths[current[0]] * (1 + max_padding)
+        )
+        if current and (len(current) >= batch_size or padded > max_batch_samples or too_uneven):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _padded_batch(meeting_audio: MeetingAudio, candidates: list[Candidate], device) -> tuple[torch.Tensor, torch.Tensor]:
+    crops = [meeting_audio.crop(c.start, c.end) for c in candidates]
+    longest = max(len(crop) for crop in crops)
+    waveforms = torch.zeros((len(crops), 1, longest), dtype=torch.float32)
+    mask = torch.zeros((len(crops), longest), dtype=torch.float32)
+    for row, crop in enumerate(crops):
+        waveforms[row, 0, :len(crop)] = torch.from_numpy(numpy.ascontiguousarray(crop))
+        mask[row, :len(crop)] = 1.0
+    return waveforms.to(device), mask.to(device)
+
+
+def _run_batch(snr_model, embedding_model, waveforms, mask):
+    lengths = mask.sum(dim=1)
+    with torch.inference_mode():
+        # (batch, frames, [vad, snr, c50])
+        frames = snr_model(waveforms)
+        num_frames = frames.shape[1]
+        frame_lengths = torch.ceil(lengths / waveforms.shape[-1] * num_frames).long()
+        frame_mask = torch.arange(num_frames, device=frames.device)[None, :] < frame_lengths[:, None]
+        speech = (frames[..., 0] > VAD_THRESHOLD) & frame_mask
+        speech_frames = speech.sum(dim=1)
+        snr = torch.where(
+            speech_frames > 0,
+            (frames[..., 1] * speech).sum(dim=1) / speech_frames.clamp(min=1),
+            torch.full_like(lengths, float("nan")),
+        )
+
+        embeddings = embedding_model(waveforms, weights=mask)
+    return snr.cpu().numpy(), embeddings.cpu().numpy(), speech_frames.cpu().numpy()
+
+
+def extract_segment_features(
+    meeting_audio: MeetingAudio,
+    segments_by_speaker,
+    min_segment_duration: float,
+    batch_size: Optional[int] = None,
+) -> SegmentFeatures:
+    """SNR and L2-normalised embedding for every candidate reference segment.
+
+    No SNR threshold is applied here - that happens when the features are used -
+    so the result can be cached and reused for any threshold."""
+    candidates = collect_candidates(segments_by_speaker, min_segment_duration)
+    snr_model = get_snr_model()
+    embedding_model = get_embedding_model()
+    device = next(embedding_model.parameters()).device
+    batch_size = batch_size or default_batch_size(str(device))
+    max_batch_samples = int(settings.REFERENCE_BATCH_MAX_SECONDS * meeting_audio.sample_rate)
+
+    snr = numpy.full(len(candidates), numpy.nan, dtype=numpy.float64)
+    embeddings: list[Optional[numpy.ndarray]] = [None] * len(candidates)
+
+    lengths = [max(1, len(meeting_audio.crop(c.start, c.end))) for c in candidates]
+    batches = make_batches(lengths, batch_size, max_batch_samples, settings.REFERENCE_BATCH_MAX_PADDING)
+    logging.info(f"Extracting reference features for {len(candidates)} segments in {len(batches)} batches")
+
+    for batch in batches:
+        waveforms, mask = _padded_batch(meeting_audio, [candidates[i] for i in batch], device)
+        try:
+            batch_snr, batch_embeddings, speech_frames = _run_batch(snr_model, embedding_model, waveforms, mask)
+        except RuntimeError as e:
+            if not is_oom_error(e) or len(batch) == 1:
+                raise
+            device_manager.record("oom_batch_reductions")
+            # Retry this batch one segment at a time rather than failing the whole meeting
+            logging.warning(f"CUDA out of memory on a batch of {len(batch)} segments; retrying individually.")
+            torch.cuda.empty_cache()
+            results = [
+                _run_batch(snr_model, embedding_model, *_padded_batch(meeting_audio, [candidates[i]], device))
+                for i in batch
+            ]
+            batch_snr = numpy.concatenate([r[0] for r in results])
+            batch_embeddings = numpy.concatenate([r[1] for r in results])
+            speech_frames = numpy.concatenate([r[2] for r in results])
+
+        for row, index in enumerate(batch):
+            if speech_frames[row] == 0:
+                continue  # no speech - never used for matching
+            snr[index] = batch_snr[row]
+            embedding = batch_embeddings[row]
+            embeddings[index] = embedding / max(numpy.linalg.norm(embedding), 1e-12)
+
+    dim = next((e.shape[0] for e in embeddings if e is not None), 0)
+    embedding_matrix = numpy.zeros((len(candidates), dim), dtype=numpy.float32)
+    for i, embedding in enumerate(embeddings):
+        if embedding is not None:
+            embedding_matrix[i] = embedding
+
+    return SegmentFeatures(
+        speakers=[c.speaker for c in candidates],
+        starts=numpy.array([c.start for c in candidates], dtype=numpy.float64),
+        ends=numpy.array([c.end for c in candidates], dtype=numpy.float64),
+        snr=snr,
+        embeddings=embedding_matrix,
+    )
@@ -0,0 +1,75 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Peak resident memory of the current process over a block of work.
+
+getrusage's ru_maxrss is the peak over the whole process lifetime, which in a
+long-lived worker says nothing about the job that just ran. PeakRssMonitor
+instead samples the current RSS from /proc on a background thread while the
+block runs, so each job gets its own figure for sizing workers. Where /proc is
+not available it falls back to ru_maxrss.
+"""
+
+import os
+import resource
+import sys
+import threading
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return lifetime_peak_rss_bytes()
+
+
+def lifetime_peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRssMonitor:
+    """Context manager recording the highest RSS seen while the block runs."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakRssMonitor":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="peak-rss")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / 1024 ** 2
@@ -0,0 +1,92 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Which model produces the speaker embeddings that members are matched on.
+
+settings.SPEAKER_EMBEDDING_SOURCE selects one of:
+
+    "segments"  - the standalone SPEAKER_EMBEDDING_MODEL_NAME model, run over each
+                  diarised speaker's high-SNR reference segments (the original
+                  behaviour; see reference_extraction.py).
+    "pipeline"  - the embedding model inside the diarisation pipeline itself. The
+                  pipeline already embeds every window to cluster speakers, so the
+                  per-speaker centroids come back with the diarisation
+                  (return_embeddings=True) and no second model is loaded or run.
+
+The two models embed into different spaces, so member enrolment
+(generate_embedding.py) uses whichever model is active and records its name in
+GroupMember.embedding_model; matching only compares like with like.
+"""
+
+from typing import Optional
+
+import numpy
+import torch
+
+from backend.config import settings
+from backend.processing.model_registry import get_diarisation_pipeline, get_embedding_model
+
+SEGMENTS = "segments"
+PIPELINE = "pipeline"
+
+# Members enrolled before the model name was recorded were embedded with the standalone model
+LEGACY_EMBEDDING_MODEL = "pyannote/embedding"
+
+
+def embedding_source() -> str:
+    source = settings.SPEAKER_EMBEDDING_SOURCE
+    if source not in (SEGMENTS, PIPELINE):
+        raise ValueError(f"SPEAKER_EMBEDDING_SOURCE must be '{SEGMENTS}' or '{PIPELINE}', not '{source}'")
+    return source
+
+
+def active_embedding_model_name() -> str:
+    """Identifier stored alongside member embeddings produced by the active source."""
+    if embedding_source() == PIPELINE:
+        return f"{settings.DIARISATION_PIPELINE_NAME}#embedding"
+    return settings.SPEAKER_EMBEDDING_MODEL_NAME
+
+
+def member_embedding_model(member) -> Optional[str]:
+    if member.embedding is None:
+        return None
+    return member.embedding_model or LEGACY_EMBEDDING_MODEL
+
+
+def _normalised(vector) -> numpy.ndarray:
+    vector = numpy.asarray(vector, dtype=numpy.float32).reshape(-1)
+    return vector / max(float(numpy.linalg.norm(vector)), 1e-12)
+
+
+def embed_enrolment_batch(waveforms: torch.Tensor, mask: torch.Tensor) -> numpy.ndarray:
+    """L2-normalised embeddings for a zero-padded (batch, channel, time) batch of enrolment
+    recordings; `mask` (batch, time) marks the real samples so padding is not pooled."""
+    with torch.inference_mode():
+        if embedding_source() == PIPELINE:
+            embeddings = get_diarisation_pipeline()._embedding(waveforms, masks=mask)
+        else:
+            model = get_embedding_model()
+            device = next(model.parameters()).device
+            embeddings = model(waveforms.to(device), weights=mask.to(device)).cpu().numpy()
+    return numpy.stack([_normalised(row) for row in embeddings])
+
+
+def pipeline_centroids(diarisation, embeddings) -> dict[str, numpy.ndarray]:
+    """Map the pipeline's (num_speakers, dim) centroids onto its speaker labels.
+    Rows follow diarisation.labels(); speakers the pipeline could not embed come back as NaN."""
+    centroids = {}
+    for label, embedding in zip(diarisation.labels(), embeddings):
+        if numpy.all(numpy.isfinite(embedding)):
+            centroids[label] = _normalised(embedding)
+    return centroids
@@ -0,0 +1,91 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Match diarised speakers to meeting attendees in one step.
+
+All speaker centroids and all attendee embeddings are stacked into matrices,
+the full cosine similarity matrix is computed with a single matrix product, and
+the one-to-one assignment is found with the Hungarian algorithm, so two
+diarised speakers can never both be labelled as the same member. Pairs below
+the threshold are excluded before assigning, not dropped afterwards: otherwise
+a weak pair could win on total similarity and displace a strong one, leaving
+the strongest match in the meeting unmatched.
+"""
+
+from dataclasses import dataclass
+
+import numpy
+from scipy.optimize import linear_sum_assignment
+
+
+@dataclass
+class SpeakerMatch:
+    speaker: str
+    attendee_id: int
+    name: str
+    similarity: float
+
+
+def _unit_rows(matrix: numpy.ndarray) -> numpy.ndarray:
+    matrix = numpy.asarray(matrix, dtype=numpy.float64)
+    norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / numpy.where(norms == 0, 1.0, norms)
+
+
+def similarity_matrix(centroids: numpy.ndarray, references: numpy.ndarray) -> numpy.ndarray:
+    """(n_speakers, n_attendees) cosine similarities."""
+    return _unit_rows(centroids) @ _unit_rows(references).T
+
+
+def assign_above_threshold(similarities: numpy.ndarray, threshold: float) -> list[tuple[int, int]]:
+    """(row, col) pairs of a one-to-one assignment using only cells at or above `threshold`:
+    as many such pairs as possible, then the highest total similarity among them."""
+    similarities = numpy.asarray(similarities, dtype=numpy.float64)
+    valid = similarities >= threshold
+    if not valid.any():
+        return []
+    # Any excluded cell costs more than a whole assignment's worth of similarity can gain
+    # (similarities are cosines, within [-1, 1]), so one is only chosen when forced
+    penalty = 2.0 * min(similarities.shape) + 1.0
+    rows, cols = linear_sum_assignment(numpy.where(valid, similarities, -penalty), maximize=True)
+    return [(int(row), int(col)) for row, col in zip(rows, cols) if valid[row, col]]
+
+
+def match_speakers(
+    centroids: dict[str, numpy.ndarray],
+    attendees: list[dict],
+    threshold: float,
+) -> dict[str, SpeakerMatch]:
+    """Assign each diarised speaker to at most one attendee, and each attendee to at most one speaker.
+
+    `centroids` maps speaker label -> mean embedding; `attendees` are dicts with
+    'id', 'name' and 'embedding' (any shape that flattens to one vector).
+    Returns speaker label -> SpeakerMatch for every pair at or above `threshold`.
+    """
+    if not centroids or not attendees:
+        return {}
+
+    speakers = sorted(centroids)  # fixed order so ties resolve the same way every run
+    speaker_matrix = numpy.vstack([numpy.ravel(centroids[s]) for s in speakers])
+    attendee_matrix = numpy.vstack([numpy.ravel(numpy.asarray(a["embedding"])) for a in attendees])
+
+    similarities = similarity_matrix(speaker_matrix, attendee_matrix)
+
+    matches = {}
+    for row, col in assign_above_threshold(similarities, threshold):
+        attendee = attendees[col]
+        matches[speakers[row]] = SpeakerMatch(
+            speakers[row], attendee["id"], attendee["name"], float(similarities[row, col])
+        )
+    return matches
@@ -0,0 +1,171 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Speech-activity gating of diarised turns before Whisper.
+
+A diarised turn often starts or ends with silence, and short fragments or
+overlap regions may hold no speech at all - Whisper then spends time decoding
+them and tends to hallucinate a "Thank you." for the silence. The brouhaha
+model already loaded for reference SNR filtering also predicts frame-level
+voice activity, so it is run once over the whole recording (cached with the
+diarisation, see diarisation_cache.SpeechActivity), and every turn is cut down
+to the speech inside it before decoding:
+
+    - frames above SPEECH_ACTIVITY_THRESHOLD form speech regions, each padded by
+      SPEECH_ACTIVITY_PADDING_SECONDS so word onsets are not clipped;
+    - within a turn, pieces of speech less than SPEECH_ACTIVITY_MERGE_GAP_SECONDS
+      apart are merged, so a breath does not split a sentence;
+    - pieces shorter than SPEECH_ACTIVITY_MIN_SECONDS are dropped.
+
+A turn can become several pieces (or none). Whisper decodes the pieces, and
+regroup_texts() joins their text back into one text per original turn, so the
+transcript still has exactly one cue per diarised turn.
+"""
+
+import logging
+from dataclasses import dataclass, replace
+from typing import Iterator, Sequence
+
+import numpy
+
+from backend.config import settings
+from backend.processing.diarisation_cache import SpeechActivity
+
+
+@dataclass
+class GatedTurns:
+    pieces: list  # the speech inside the turns, as TurnSpans, in turn order
+    owners: list[int]  # index of the turn each piece came from
+    num_turns: int
+    input_seconds: float
+    speech_seconds: float
+    dropped: int  # fragments too short to decode
+
+
+def detect_speech(meeting_audio) -> SpeechActivity:
+    """Run brouhaha over the whole recording and keep its voice-activity output."""
+    from pyannote.audio import Inference
+
+    from backend.processing.device_management import safe_run_model, windowed_estimate
+    from backend.processing.model_registry import get_snr_model
+
+    snr_model = get_snr_model()
+
+    def infer(audio, batch_size):
+        # Built per call, so a retry after the model was moved to the CPU runs there too
+        device = next(snr_model.parameters()).device
+        return Inference(snr_model, device=device, batch_size=batch_size)(audio)
+
+    output = safe_run_model(
+        infer, meeting_audio.as_pyannote(), model=snr_model, batch_size=settings.SPEECH_ACTIVITY_BATCH_SIZE,
+        estimate_bytes=windowed_estimate(snr_model, settings.SPEECH_ACTIVITY_BATCH_SIZE),
+    )
+    frames = output.sliding_window
+    # (frames, [vad, snr, c50])
+    return SpeechActivity(
+        probabilities=numpy.asarray(output.data[:, 0], dtype=numpy.float32),
+        start=float(frames.start), step=float(frames.step), duration=float(frames.duration),
+    )
+
+
+def speech_regions(activity: SpeechActivity, threshold: float) -> numpy.ndarray:
+    """(n, 2) start/end seconds of the runs of frames above `threshold`. Each frame stands
+    for the `step` seconds around its centre."""
+    active = numpy.asarray(activity.probabilities) > threshold
+    if not active.any():
+        return numpy.zeros((0, 2))
+    edges = numpy.diff(numpy.concatenate([[0], active.astype(numpy.int8), [0]]))
+    first, last = numpy.flatnonzero(edges == 1), numpy.flatnonzero(edges == -1) - 1
+    centres = activity.start + activity.duration / 2
+    return numpy.stack([
+        centres + first * activity.step - activity.step / 2,
+        centres + last * activity.step + activity.step / 2,
+    ], axis=1)
+
+
+def _speech_within(start: float, end: float, regions: numpy.ndarray, padding: float) -> list[tuple[float, float]]:
+    first = int(numpy.searchsorted(regions[:, 1] + padding, start, side="right"))
+    spans = []
+    for region_start, region_end in regions[first:]:
+        if region_start - padding >= end:
+            break
+        spans.append((max(start, region_start - padding), min(end, region_end + padding)))
+    return spans
+
+
+def _merge(spans: list[tuple[float, float]], max_gap: float) -> list[tuple[float, float]]:
+    merged = []
+    for start, end in spans:
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def gate_turns(turns: Sequence, activity: SpeechActivity) -> GatedTurns:
+    """Cut each turn (anything with start/end seconds, e.g. a TurnSpan) down to its speech."""
+    regions = speech_regions(activity, settings.SPEECH_ACTIVITY_THRESHOLD)
+    pieces, owners, dropped = [], [], 0
+    for index, turn in enumerate(turns):
+        spans = _merge(
+            _speech_within(turn.start, turn.end, regions, settings.SPEECH_ACTIVITY_PADDING_SECONDS),
+            settings.SPEECH_ACTIVITY_MERGE_GAP_SECONDS,
+        )
+        for start, end in spans:
+            if end - start < settings.SPEECH_ACTIVITY_MIN_SECONDS:
+                dropped += 1
+                continue
+            pieces.append(replace(turn, start=start, end=end))
+            owners.append(index)
+    gated = GatedTurns(
+        pieces=pieces, owners=owners, num_turns=len(turns),
+        input_seconds=sum(turn.end - turn.start for turn in turns),
+        speech_seconds=sum(piece.end - piece.start for piece in pieces),
+        dropped=dropped,
+    )
+    logging.info(
+        f"Speech gating: {gated.speech_seconds:.1f}s of {gated.input_seconds:.1f}s of turn audio sent to "
+        f"Whisper in {len(pieces)} pieces; {len(turns) - len(set(owners))} turns had no speech, "
+        f"{dropped} fragments were too short."
+    )
+    return gated
+
+
+def regroup_texts(piece_texts: Iterator[tuple[int, str]], gated: GatedTurns) -> Iterator[tuple[int, str]]:
+    """Turn (piece index, text) from decoding gated.pieces back into (turn index, text) for every
+    turn, in order, yielding each turn as soon as its last piece is done. Turns with no speech
+    left get empty text."""
+    last_piece = [-1] * gated.num_turns
+    for piece_index, owner in enumerate(gated.owners):
+        last_piece[owner] = piece_index
+    texts: list[list[str]] = [[] for _ in range(gated.num_turns)]
+    next_turn = 0
+    for piece_index, text in piece_texts:
+        if text:
+            texts[gated.owners[piece_index]].append(text)
+        while next_turn < gated.num_turns and last_piece[next_turn] <= piece_index:
+            yield next_turn, " ".join(texts[next_turn])
+            next_turn += 1
+    while next_turn < gated.num_turns:
+        yield next_turn, " ".join(texts[next_turn])
+        next_turn += 1
+
+
+def gating_signature() -> tuple:
+    """Every setting that changes which audio Whisper sees, for the ASR cache key."""
+    return (
+        settings.SNR_MODEL_NAME, settings.SPEECH_ACTIVITY_THRESHOLD, settings.SPEECH_ACTIVITY_PADDING_SECONDS,
+        settings.SPEECH_ACTIVITY_MERGE_GAP_SECONDS, settings.SPEECH_ACTIVITY_MIN_SECONDS,
+    )
@@ -0,0 +1,155 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run a sequence of stages over many items at once, one executor per stage.
+
+Each stage has its own bounded input queue and its own pool of worker threads,
+so while one meeting is in Whisper (GPU) the next can be diarised and the one
+before it indexed (CPU/database). A full queue blocks the stage feeding it, so
+a slow stage throttles everything upstream instead of letting decoded audio
+pile up in memory. Per-stage queue depth, busy time and throughput are kept in
+StageMetrics for tuning the worker counts and queue sizes.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], None]  # mutates/advances the item in place
+    workers: int = 1
+    queue_size: int = 1
+
+
+class StageMetrics:
+    def __init__(self, stage: Stage, inbox: queue.Queue):
+        self.stage = stage
+        self._inbox = inbox
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.active = 0
+        self.started_at = time.monotonic()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.busy_seconds += seconds
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            done = self.completed + self.failed
+            return {
+                "workers": self.stage.workers,
+                "active": self.active,
+                "queue_depth": self._inbox.qsize(),
+                "queue_capacity": self.stage.queue_size,
+                "completed": self.completed,
+                "failed": self.failed,
+                "mean_seconds": round(self.busy_seconds / done, 3) if done else None,
+                # fraction of the stage's worker time spent working since start
+                "utilisation": round(self.busy_seconds / (elapsed * self.stage.workers), 3),
+                "throughput_per_hour": round(self.completed * 3600 / elapsed, 2),
+            }
+
+
+class StagePipeline:
+    """Items enter with submit(), pass through every stage in order, and leave through
+    on_done(item) - or on_error(item, exception) from whichever stage raised."""
+
+    def __init__(self, stages: list[Stage], on_done: Callable[[Any], None],
+                 on_error: Callable[[Any, BaseException], None],
+                 skip: Optional[Callable[[Any], bool]] = None):
+        self.stages = stages
+        self.on_done = on_done
+        self.on_error = on_error
+        self.skip = skip or (lambda item: False)  # items that need no further stages go straight to on_done
+        self._queues = [queue.Queue(maxsize=max(1, stage.queue_size)) for stage in stages]
+        self.metrics = [StageMetrics(stage, inbox) for stage, inbox in zip(stages, self._queues)]
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._stage_loop, args=(index,), name=f"stage-{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def has_capacity(self) -> bool:
+        """Whether submit() would return without blocking right now."""
+        return not self._queues[0].full()
+
+    def submit(self, item: Any) -> None:
+        """Hand an item to the first stage; blocks while that stage's queue is full."""
+        self._queues[0].put(item)
+
+    def stop(self) -> None:
+        """Let everything already submitted finish, then stop every stage's threads."""
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                self._queues[index].put(_STOP)
+            for thread in self._threads:
+                if thread.name.startswith(f"stage-{stage.name}-"):
+                    thread.join()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {m.stage.name: m.snapshot() for m in self.metrics}
+
+    def _stage_loop(self, index: int) -> None:
+        stage, inbox, metrics = self.stages[index], self._queues[index], self.metrics[index]
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            with metrics._lock:
+                metrics.active += 1
+            started = time.monotonic()
+            try:
+                stage.fn(item)
+            except BaseException as e:
+                metrics.record(time.monotonic() - started, ok=False)
+                logging.exception(f"Stage '{stage.name}' failed")
+                self._finish(self.on_error, item, e)
+                continue
+            finally:
+                with metrics._lock:
+                    metrics.active -= 1
+            metrics.record(time.monotonic() - started, ok=True)
+
+            if index + 1 < len(self.stages) and not self.skip(item):
+                self._queues[index + 1].put(item)  # blocks while the next stage is saturated
+            else:
+                self._finish(self.on_done, item)
+
+    @staticmethod
+    def _finish(callback, *args) -> None:
+        try:
+            callback(*args)
+        except Exception:
+            logging.exception("Pipeline completion callback failed")
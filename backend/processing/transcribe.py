@@ -31,32 +31,42 @@ from sqlalchemy import and_
 from backend.models import RawFile, Meeting, Group
 from backend.transcript_rag.indexer import index_transcript
 
-#transcription
-import whisper
-
-#audio handling
-import torch
-import torchaudio
-
-device = "cpu"
-
 #diarisation
-from pyannote.audio import Pipeline
-from pyannote.audio import Model
 from pyannote.core import Segment, Annotation
 
 #embedding
-from pyannote.audio import Inference
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import normalize
 import numpy
 
 #other
+from dataclasses import dataclass, field
 from datetime import datetime
 from collections import defaultdict
+from typing import Any, Optional
 import os
 import uuid
-from backend.processing.device_management import get_safe_device, safe_run_model
+from backend.processing.device_management import pipeline_estimate, safe_run_model
+from backend.processing.audio_loading import MeetingAudio, load_meeting_audio
+from backend.processing.batched_transcription import TurnSpan, iter_transcribed_turns
+from backend.processing.vtt_writer import StreamingVttWriter
+from backend.processing.diarisation_cache import (
+    diarisation_cache_key, load_diarisation, save_diarisation,
+    load_pipeline_centroids, save_pipeline_centroids,
+    features_signature, load_segment_features, save_segment_features,
+    asr_signature, load_transcript_texts, save_transcript_texts,
+    SpeechActivity, speech_signature, load_speech_activity, save_speech_activity,
+)
+from backend.processing.long_form import diarise_long_form
+from backend.processing.reference_extraction import extract_segment_features
+from backend.processing.speaker_embedding import (
+    PIPELINE, embedding_source, active_embedding_model_name, member_embedding_model, pipeline_centroids
+)
+from backend.processing.speaker_matching import match_speakers
+from backend.processing.speech_activity import detect_speech, gate_turns, gating_signature, regroup_texts
+from backend.processing.voice_prints import samples_from_confirmed_attendance, save_speaker_matches
+from backend.processing.model_registry import (
+    get_whisper_model, get_diarisation_pipeline, whisper_decode_fp16
+)
+from backend.processing.transcription_profiles import WhisperProfile
 
 #file and report handling
 from backend.config import settings
@@ -70,18 +80,64 @@ import json
 # Get Hugging Face token stored in Colab Secrets
 HUGGING_FACE_TOKEN = os.getenv("HUGGING_FACE_TOKEN")
 
-def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshold = 5.0, embedding_match_threshold = 0.7):
-    #inputs for the embedding process
-    SNR_THRESHOLD = snr_threshold
-    MIN_SEGMENT_DURATION = 5.0
-    EMBEDDING_MATCH_THRESHOLD = embedding_match_threshold
+@dataclass
+class MeetingTranscription:
+    """Everything one meeting's transcription carries from stage to stage.
+
+    The stages below run in order; transcribe_meeting() runs them back to back
+    for one meeting, and backend/processing/stage_pipeline.py runs each on its
+    own executor so several meetings can be at different stages at once. Stages
+    hand over plain data (no ORM objects), since consecutive stages may run on
+    different threads with different database sessions.
+    """
+    group_id: int
+    meeting_id: int
+    snr_threshold: float = 5.0
+    embedding_match_threshold: float = 0.7
+    min_segment_duration: float = 5.0
+    profile: Optional[dict[str, Any]] = None  # WhisperProfile params resolved when the job was queued
+    skipped: bool = False  # nothing to transcribe; later stages do nothing
+
+    # prepare_meeting
+    input_file: Optional[Path] = None
+    audio_human_name: str = ""
+    meeting_date: Optional[datetime] = None
+    num_speakers: int = 0
+    attendees: list[dict[str, Any]] = field(default_factory=list)
+    model_name: str = ""
+    whisper_profile: Optional[WhisperProfile] = None
+    meeting_audio: Optional[MeetingAudio] = None
+
+    # diarise_meeting
+    cache_key: str = ""
+    diarisation_result: Optional[Annotation] = None
+    pipeline_speaker_centroids: Optional[dict] = None
+
+    # identify_speakers
+    segments_by_speaker: dict = field(default_factory=dict)
+    speaker_names: dict[str, str] = field(default_factory=dict)
+    speaker_matches: dict[str, Any] = field(default_factory=dict)  # speaker -> SpeakerMatch
+    speaker_centroids: dict[str, numpy.ndarray] = field(default_factory=dict)
+
+    # find_speech
+    speech_activity: Optional[SpeechActivity] = None
+
+    # transcribe_speech
+    dest_path: Optional[Path] = None
+    safe_filename: str = ""
+    human_filename: str = ""
+
+
+def prepare_meeting(job: MeetingTranscription, db: Session) -> None:
+    """Look up the meeting, its audio and attendees, and decode the audio."""
+    meeting_id = job.meeting_id
 
     # work out the group_id for the meeting
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise ValueError(f"Meeting {meeting_id} not found")
 
-    group_id = meeting.group_id
+    job.group_id = group_id = meeting.group_id
 
     # Find first audio file for this meeting
     audio_file = db.query(RawFile).filter(
@@ -93,7 +149,8 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
 
     if not audio_file:
         logging.warning(f"Audio file for meeting id {meeting_id} not found in database to process.")
-        return;
+        job.skipped = True
+        return
 
     # Get audio file path
     audio_dir = settings.UPLOAD_DIR
@@ -101,292 +158,282 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
     #check file exists before processing
     if not input_file.exists():
         logging.warning(f"Audio file at {input_file} not found to process.")
-        return;
+        job.skipped = True
+        return
 
-    
+    job.input_file = input_file
+    job.audio_human_name = audio_file.human_name
+    job.meeting_date = meeting.date
 
     #organise the inputs for the transcription pipeline. Num speakers is taken from the attendance on the database
-    # Find meeting based on the meeting_id
-    meeting = db.query(Meeting).filter(
-        Meeting.id == meeting_id,
-    ).first()
-
-    if not meeting:
-        logging.warning(f"Meeting id {meeting_id} not found in database, cannot proceed transcription")
-
     num_attendees = len(meeting.attendees)
     logging.info(f"Processing transcription file with {num_attendees} attendees.")
+    job.num_speakers = num_attendees
+    job.attendees = [
+        {
+            "id": attendee.id,
+            "name": attendee.name,
+            "embedding": attendee.embedding,
+            "embedding_model": member_embedding_model(attendee),
+        }
+        for attendee in meeting.attendees
+    ]
 
-    NUM_SPEAKERS = num_attendees
-    #TODO: This could be improved by moving the settings to be configured in the app settings page.
-    language = 'English'
-    model_size = 'medium'
-    model_name = model_size
-    #name according to available models outlined on https://github.com/openai/whisper?tab=readme-ov-file#available-models-and-languages
-    if language == 'English' and model_size != 'large':
-        model_name += '.en'
-
-    #MODELS
-    #diarisation by Pyannote
-    pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization", use_auth_token=HUGGING_FACE_TOKEN)
-    #transcription by Whisper
-    transcription_model = whisper.load_model(model_name, device=device)
-
-
-    # Move models to the GPU if available
-    device, msg = get_safe_device()
-    logging.info(msg)
-    transcription_model.to(torch.device(device))
-    pipeline.to(device)
-
-    # Perform the intensive stuff - transcription
-    def run_pyannote_inference(audio_path, inference_obj):
-        return inference_obj(audio_path)
-
-    diarization_result = safe_run_model(
-        run_pyannote_inference, 
-        input_file, 
-        inference_obj=pipeline,
-        num_speakers=NUM_SPEAKERS
-    )
-    
-
-    # ------ This next section deals with the embeddings and comparison used to label speakers ------
-
-    # Declare our functions used for various stages of embedding comparison
-    def crop_waveform(waveform, sample_rate, segment):
-        """Return waveform cropped to the specified segment."""
-        start_sample = int(segment.start * sample_rate)
-        end_sample = int(segment.end * sample_rate)
-        return waveform[:, start_sample:end_sample]
-
-    def get_reference_embeddings(ref_dict):
-        """Return dictionary of normalized reference embeddings."""
-        embeddings = {}
-        for i, (name, path) in enumerate(ref_dict.items()):
-            try:
-                emb = embedding_inference(path).reshape(1, -1)
-                emb = normalize(emb)
-                embeddings[i] = emb
-                logging.info(f"Loaded reference embedding for '{name}' as ID {i}")
-            except Exception as e:
-                logging.warning(f"Error loading reference '{name}': {e}")
-        return embeddings
-
-    def match_speaker_by_embedding(embedding, speaker_embeddings, threshold=EMBEDDING_MATCH_THRESHOLD):
-        """
-        Matches an input embedding against a list of known speaker embeddings.
-    
-        Parameters:
-            embedding (list of float): The embedding to match.
-            speaker_embeddings (list of dict): Each dict should have 'id', 'name', and 'embedding'.
-            threshold (float): Cosine similarity threshold for a valid match.
-
-        Returns:
-            str or None: Best matching speaker name, or None if no match is above threshold.
-        """
-        best_match = None
-        highest_similarity = -1
-        #ensure the reference embeddings are the correct dimension
-        #embedding = embedding.reshape(1, -1)
-
-        # Compare with reference embeddings
-        for speaker in speaker_embeddings:
-            #ensure the speakers embeddings are the correct dimension
-            #speaker_embedding = speaker["embedding"].reshape(1, -1)
-
-            similarity = cosine_similarity(embedding, speaker["embedding"])[0][0]
-            if similarity > highest_similarity:
-                highest_similarity = similarity
-                best_match = speaker
-        logging.debug(f"Highest similarity: {highest_similarity:.4f} (match: '{best_match}')")
-        if highest_similarity >= threshold:
-            return best_match
+    job.whisper_profile = WhisperProfile.from_params(job.profile)
+    job.model_name = job.whisper_profile.model_name
+    logging.info(f"Transcribing with profile '{job.whisper_profile.name}' ({job.model_name})")
+
+    # Decode the recording once (16 kHz mono float32); every stage below slices this buffer
+    job.meeting_audio = load_meeting_audio(input_file)
+
+
+def diarise_meeting(job: MeetingTranscription) -> None:
+    """Who spoke when - from the cache if this audio has been diarised before."""
+    meeting_audio = job.meeting_audio
+    NUM_SPEAKERS = job.num_speakers
+
+    # Diarisation, per-segment SNR/embeddings and Whisper text do not depend on the
+    # thresholds, so they are cached per audio hash (backend/processing/diarisation_cache.py)
+    # and a threshold re-run only repeats the cheap matching and VTT writing below.
+    # Multi-hour recordings are diarised in overlapping windows to bound peak memory
+    # (backend/processing/long_form.py); the mode is part of the cache key.
+    long_form = meeting_audio.duration >= settings.LONG_FORM_MIN_SECONDS
+    cache_key = job.cache_key = diarisation_cache_key(job.input_file, NUM_SPEAKERS, long_form=long_form)
+
+    # Perform the intensive stuff - diarisation
+    use_pipeline_embeddings = embedding_source() == PIPELINE
+    diarisation_result = load_diarisation(cache_key)
+    pipeline_speaker_centroids = load_pipeline_centroids(cache_key) if use_pipeline_embeddings else None
+    if diarisation_result is None or (use_pipeline_embeddings and pipeline_speaker_centroids is None):
+        #diarisation by Pyannote - loaded once per process and already on the safe device
+        pipeline = get_diarisation_pipeline()
+
+        def run_pyannote_inference(audio, inference_obj, **kwargs):
+            return inference_obj(audio, **kwargs)
+
+        if long_form:
+            fresh_result, stitched_centroids = diarise_long_form(
+                pipeline, meeting_audio, NUM_SPEAKERS,
+                run=lambda audio, **kwargs: safe_run_model(
+                    run_pyannote_inference, audio, inference_obj=pipeline, model=pipeline,
+                    estimate_bytes=pipeline_estimate(pipeline), **kwargs
+                )
+            )
+            if use_pipeline_embeddings:
+                pipeline_speaker_centroids = {
+                    label: centroid / max(numpy.linalg.norm(centroid), 1e-12)
+                    for label, centroid in stitched_centroids.items()
+                }
+                save_pipeline_centroids(cache_key, pipeline_speaker_centroids)
         else:
-            return None
-
-    def remove_speaker_from_diarisation(diarisation, speaker_to_remove):
-        """Return a copy of diarisation with the specified speaker removed."""
-        new_diarisation = Annotation(uri=diarisation.uri)
-
-        for segment, track, speaker in diarisation.itertracks(yield_label=True):
-            if speaker != speaker_to_remove:
-                new_diarisation[segment, track] = speaker
-
-        return new_diarisation
-
-    #load speaker samples and generate the embeddings to be tested below
-    embedding_model = Model.from_pretrained("pyannote/embedding",
-                                use_auth_token=HUGGING_FACE_TOKEN, device=device)
-    # Move model to GPU if available
-    device, msg = get_safe_device()
-    logging.info(msg)
-    embedding_model.to(torch.device(device))
-
-    embedding_inference = Inference(embedding_model, window="whole")
-
-    # Load full audio for cropping our speaker clips
-    waveform, sample_rate = torchaudio.load(input_file)  # mono only
+            fresh_result = safe_run_model(
+                run_pyannote_inference,
+                meeting_audio.as_pyannote(),
+                inference_obj=pipeline,
+                model=pipeline,
+                # the pipeline windows the recording itself, so only a batch of windows is on the device
+                estimate_bytes=pipeline_estimate(pipeline),
+                num_speakers=NUM_SPEAKERS,
+                return_embeddings=use_pipeline_embeddings
+            )
+            if use_pipeline_embeddings:
+                # the pipeline's own per-speaker centroids, from the embeddings it clustered with
+                fresh_result, speaker_embeddings = fresh_result
+                pipeline_speaker_centroids = pipeline_centroids(fresh_result, speaker_embeddings)
+                save_pipeline_centroids(cache_key, pipeline_speaker_centroids)
+        save_diarisation(cache_key, fresh_result)
+        # Re-read so a first run and a cached re-run see exactly the same (rounded) boundaries
+        diarisation_result = load_diarisation(cache_key)
+
+    job.diarisation_result = diarisation_result
+    job.pipeline_speaker_centroids = pipeline_speaker_centroids
+
+
+def identify_speakers(job: MeetingTranscription) -> None:
+    """Match each diarised speaker to at most one enrolled attendee."""
+    # ------ This next section deals with the embeddings and comparison used to label speakers ------
 
+    # Only compare against members enrolled with the same embedding model as this run uses
+    active_model = active_embedding_model_name()
     attendee_embeddings = []
 
-    for attendee in meeting.attendees:
-        if attendee.embedding:
-            attendee_embeddings.append({
-                "id": attendee.id,
-                "name": attendee.name,
-                "embedding": torch.tensor(attendee.embedding, dtype=torch.float32).unsqueeze(0)
-            })
-    logging.info(f"Embeddings for {len(attendee_embeddings)} out of {len(meeting.attendees)} generated.")
+    for attendee in job.attendees:
+        if attendee["embedding"] is None:
+            continue
+        if attendee["embedding_model"] != active_model:
+            logging.warning(
+                f"Skipping '{attendee['name']}': enrolled with {attendee['embedding_model']}, "
+                f"this run matches on {active_model}. Re-upload their sample to re-enrol."
+            )
+            continue
+        attendee_embeddings.append({
+            "id": attendee["id"],
+            "name": attendee["name"],
+            "embedding": numpy.asarray(attendee["embedding"], dtype=numpy.float32)
+        })
+    logging.info(f"Embeddings for {len(attendee_embeddings)} out of {len(job.attendees)} generated.")
     # Use diarisation from previous code block to loop through identified speakers
 
     # Group segments by speaker so we can run comparisons
     segments_by_speaker = defaultdict(list)
-    for turn, _, speaker in diarisation_result.itertracks(yield_label=True):
+    for turn, _, speaker in job.diarisation_result.itertracks(yield_label=True):
         segments_by_speaker[speaker].append(Segment(turn.start, turn.end))
-
-    # Load SNR model which will help identify the best audio clip to compare
-    snr_model = Model.from_pretrained("pyannote/brouhaha", use_auth_token=HUGGING_FACE_TOKEN)
-    
-    # Move model to GPU if available
-    device, msg = get_safe_device()
-    logging.info(msg)
-    snr_model.to(torch.device(device))
-
-    # apply model
-    snr_inference = Inference(snr_model)
-
-    # Step through each speaker label and its associated segments from diarisation
-    for speaker, segments in segments_by_speaker.items():
-        valid_embeddings = []
-
-        # Process each segment for that speaker
-        for segment in segments:
-            duration = segment.end - segment.start
-
-            # Ignore short segments if there are other longer ones
-            if duration < MIN_SEGMENT_DURATION and len(segments) > 1:
-                continue
-
-            # Crop audio to just this segment
-            cropped = crop_waveform(waveform, sample_rate, segment)
-
-            # Apply SNR model to filter out low-quality audio
-            def run_snr_inference(audio_dict, inference_obj):
-                return inference_obj(audio_dict)
-
-            snr_result = safe_run_model(run_snr_inference, {"waveform": cropped, "sample_rate": sample_rate}, inference_obj=snr_inference)
-            
-            # Extract SNR values where speech is detected
-            snr_values = [snr for frame, (vad, snr, c50) in snr_result if vad > 0.5]
-
-            if not snr_values:
-                continue  # skip if there's no speech
-
-            avg_snr = sum(snr_values) / len(snr_values)
-
-            if avg_snr < SNR_THRESHOLD:  # optional threshold to skip noisy clips
-                continue
-
-            # Compute embedding for this valid segment
-            def run_embedding_inference(audio_dict, inference_obj):
-                return inference_obj(audio_dict)
-
-            embedding = safe_run_model(run_embedding_inference, {"waveform": cropped, "sample_rate": sample_rate}, inference_obj=embedding_inference).reshape(1, -1)
-
-            embedding = normalize(embedding)
-            valid_embeddings.append(embedding)
-
-        # Average the embeddings for this speaker if any were collected
-        if valid_embeddings:
-            mean_embedding = numpy.mean(numpy.vstack(valid_embeddings), axis=0, keepdims=True)
-
-            match = match_speaker_by_embedding(mean_embedding, attendee_embeddings)
-
-            if match:
-                logging.info(f"Speaker '{speaker}' best matches reference speaker: {match['name']}")
-                # rename speakers if you know their name
-                diarisation_result = diarisation_result.rename_labels({speaker: match['name']})
-
+    job.segments_by_speaker = segments_by_speaker
+
+    if job.pipeline_speaker_centroids is not None:
+        # No separate SNR/embedding pass - the snr_threshold does not apply in this mode
+        centroids = job.pipeline_speaker_centroids
+        for speaker in segments_by_speaker:
+            if speaker not in centroids:
+                logging.info(f"No pipeline embedding for speaker '{speaker}'.")
+    else:
+        # SNR and embedding for every candidate segment, whatever the threshold
+        features_key = features_signature(job.min_segment_duration)
+        features = load_segment_features(job.cache_key, features_key)
+        if features is None:
+            features = extract_segment_features(job.meeting_audio, segments_by_speaker, job.min_segment_duration)
+            save_segment_features(job.cache_key, features_key, features)
+
+        # Average each speaker's segments that clear the SNR threshold into one centroid
+        centroids = {}
+        feature_speakers = numpy.array(features.speakers, dtype=str)
+        for speaker in segments_by_speaker:
+            # NaN SNR (no speech detected) compares False, so those segments drop out here too
+            valid = (feature_speakers == speaker) & (features.snr >= job.snr_threshold)
+            if valid.any():
+                centroids[speaker] = numpy.mean(features.embeddings[valid], axis=0)
             else:
-                logging.info(f"Speaker '{speaker}' could not be confidently matched.")
-                #diarisation_result = remove_speaker_from_diarisation(diarisation_result, speaker)
+                logging.info(f"No valid segments to compare found for speaker '{speaker}'.")
+
+    # One similarity matrix and a one-to-one assignment across all speakers at once
+    matches = match_speakers(centroids, attendee_embeddings, job.embedding_match_threshold)
+    for speaker in centroids:
+        if speaker in matches:
+            logging.info(
+                f"Speaker '{speaker}' best matches reference speaker: {matches[speaker].name} "
+                f"(similarity {matches[speaker].similarity:.4f})"
+            )
         else:
-            logging.info(f"No valid segments to compare found for speaker '{speaker}'.")
-            
-
-    # finally, merge the diarisation results with the whisper output and export to terminal.
-    # we do this by running whisper on each segment
-    from pyannote.audio import Audio
-    audio = Audio(sample_rate=16000, mono=True)
-
-    def format_timestamp(seconds: float) -> str:
-        """Convert seconds to WebVTT timestamp format (HH:MM:SS.mmm)."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
-        return f"{hours:02}:{minutes:02}:{secs:02}.{millis:03}"
-
-    vtt_lines = ["WEBVTT\n"]
-    index = 1
+            logging.info(f"Speaker '{speaker}' could not be confidently matched.")
+    # rename speakers if you know their name
+    job.speaker_names = {speaker: match.name for speaker, match in matches.items()}
+    job.speaker_matches = matches
+    job.speaker_centroids = centroids
+
+
+def find_speech(job: MeetingTranscription) -> None:
+    """Frame-level voice activity over the recording, so Whisper only decodes speech."""
+    if not settings.SPEECH_ACTIVITY_GATING:
+        return
+    signature = speech_signature()
+    activity = load_speech_activity(job.cache_key, signature)
+    if activity is None:
+        activity = detect_speech(job.meeting_audio)
+        save_speech_activity(job.cache_key, signature, activity)
+    job.speech_activity = activity
+
+
+def transcribe_speech(job: MeetingTranscription) -> None:
+    """Whisper over every diarised turn, streamed cue by cue into the transcript file."""
+    meeting_audio = job.meeting_audio
+    speaker_names = job.speaker_names
+    cache_key = job.cache_key
+    profile = job.whisper_profile
+
+    # finally, merge the diarisation results with the whisper output.
+    # Turns are packed into 30-second windows and decoded in batches (see
+    # backend/processing/batched_transcription.py), then written one cue per turn
+    # as soon as each is done (backend/processing/vtt_writer.py).
     logging.info(f"Performing transcription on audio file")
 
-     # Get total duration in seconds from waveform and sample_rate
-    total_duration = waveform.shape[1] / sample_rate
-    for segment, _, speaker in diarisation_result.itertracks(yield_label=True):
+    # Get total duration in seconds from the decoded audio
+    total_duration = meeting_audio.duration
+    turns = []
+    for segment, _, speaker in job.diarisation_result.itertracks(yield_label=True):
         # Adjust segment end if it exceeds audio duration
         seg_start = segment.start
         seg_end = min(segment.end, total_duration)
         if seg_start >= total_duration:
             logging.warning(f"Segment [{seg_start}, {seg_end}] is outside audio bounds, skipping.")
             continue
-        # Create a new segment with the adjusted end
-        safe_segment = Segment(seg_start, seg_end)
-
-        waveform, sample_rate = audio.crop(input_file, safe_segment)
-
-        # Convert to mono if needed
-        if waveform.ndim > 1:
-            waveform = waveform.mean(axis=0)
-
-        # Resample if needed
-        if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=16000)
-            waveform = resampler(torch.tensor(waveform)).numpy()
-            sample_rate = 16000
-
-        audio_np = waveform.squeeze().cpu().numpy().astype("float32")
-
-        result = transcription_model.transcribe(audio_np, language="en", fp16=False)
-        text = result["text"]
-
-        start = format_timestamp(segment.start)
-        end = format_timestamp(segment.end)
-        
-        vtt_lines.append(f"{index}")
-        vtt_lines.append(f"{start} --> {end}")
-        vtt_lines.append(f"{speaker}: {text.strip()}")
-        vtt_lines.append("")  # blank line between entries
-        index += 1
-    
+        turns.append((segment, TurnSpan(seg_start, seg_end, speaker)))
+
+    # Turns are packed using the raw diarisation labels so the cached text stays valid
+    # whichever attendees they end up matched to.
+    spans = [span for _, span in turns]
+    turn_bounds = [(span.start, span.end) for span in spans]
+    gating = job.speech_activity is not None
+    asr_key = asr_signature(*profile.signature(), *(gating_signature() if gating else ()))
+    texts = load_transcript_texts(cache_key, asr_key, turn_bounds)
+
+    # Cues are appended to a partial file as each turn finishes (and checkpointed), so a
+    # retried job resumes where the last attempt stopped and clients can tail progress.
+    # The signature covers everything that changes cue text, so a re-run with different
+    # thresholds starts a fresh file rather than resuming a stale one.
+    target_dir = settings.UPLOAD_DIR / str(job.group_id) / str(job.meeting_id)
+    writer = StreamingVttWriter(
+        target_dir, asr_signature(cache_key, asr_key, len(turns), sorted(speaker_names.items()))
+    )
+    resume_from = writer.open()
+    try:
+        def write_cue(index, text):
+            segment, span = turns[index]
+            writer.write_cue(segment.start, segment.end, speaker_names.get(span.speaker, span.speaker), text)
+
+        if texts is not None:
+            for index in range(resume_from, len(turns)):
+                write_cue(index, texts[index])
+        else:
+            #transcription by Whisper - loaded once per process and already on the safe device
+            transcription_model = get_whisper_model(profile.model_name, profile.compute_type)
+            remaining = spans[resume_from:]
+
+            def decode(turns_to_decode):
+                return iter_transcribed_turns(
+                    transcription_model, meeting_audio.samples, turns_to_decode, language=profile.language,
+                    batch_size=settings.WHISPER_BATCH_SIZE,
+                    fp16=whisper_decode_fp16(transcription_model, profile.compute_type),
+                    beam_size=profile.beam_size,
+                    no_speech_threshold=settings.WHISPER_NO_SPEECH_THRESHOLD if profile.vad_skip else None,
+                )
+
+            if gating:
+                # Decode only the speech inside each turn, then join it back up per turn
+                gated = gate_turns(remaining, job.speech_activity)
+                turn_texts = regroup_texts(decode(gated.pieces), gated)
+            else:
+                turn_texts = decode(remaining)
+            new_texts = []
+            for offset, text in turn_texts:
+                write_cue(resume_from + offset, text)
+                new_texts.append(text)
+            # only a run that transcribed every turn itself has the full text to cache
+            if resume_from == 0:
+                save_transcript_texts(cache_key, asr_key, turn_bounds, new_texts)
+    except BaseException:
+        writer.close()
+        raise
+
     # Build human-readable name for subtitle file
-    audio_base_name = Path(audio_file.human_name).stem
-    human_filename = f"{audio_base_name}.vtt"
+    audio_base_name = Path(job.audio_human_name).stem
+    job.human_filename = human_filename = f"{audio_base_name}.vtt"
 
     logging.info(f"File is being created.")
     # Safe UUID-based file name
-    safe_filename = f"{uuid.uuid4().hex}_{human_filename}"
-    
-    # Build the target directory
-    target_dir = settings.UPLOAD_DIR / str(group_id) / str(meeting_id)
-    target_dir.mkdir(parents=True, exist_ok=True)
-    dest_path = target_dir / safe_filename
+    job.safe_filename = safe_filename = f"{uuid.uuid4().hex}_{human_filename}"
+    job.dest_path = target_dir / safe_filename
 
+    # Move the completed transcript into place in one step
+    writer.finalize(job.dest_path)
 
-    # Write to disk
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(vtt_lines))
+    # The decoded audio is not needed past this point; let it go before the next stage
+    job.meeting_audio = None
+
+
+def publish_transcript(job: MeetingTranscription, db: Session) -> None:
+    """Record the transcript in the database and index it for search."""
+    group_id = job.group_id
+    meeting_id = job.meeting_id
 
     logging.info(f"Database is being updated.")
     # finally, update the database for the status of the transcription.
@@ -402,8 +449,8 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
 
     # Create new RawFile entry for the transcript
     transcript_file = RawFile(
-        file_name=safe_filename,
-        human_name=human_filename,
+        file_name=job.safe_filename,
+        human_name=job.human_filename,
         description="Auto-generated transcript",
         meeting_id=meeting_id,
         type="transcript_generated",
@@ -419,9 +466,9 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
             group_id=group_id,
             group_name=group.name,
             meeting_id=meeting_id,
-            vtt_path=dest_path,
+            vtt_path=job.dest_path,
             meeting_title=group.name,
-            meeting_date=meeting.date.date().isoformat(),
+            meeting_date=job.meeting_date.date().isoformat(),
         )
     except Exception:
         # Same non-fatal handling as the direct-upload path (backend/routes/upload.py) -
@@ -431,7 +478,7 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
 
     # Build speaker report for logging and future database storage
     speaker_report = []
-    for speaker, segments in segments_by_speaker.items():
+    for speaker, segments in job.segments_by_speaker.items():
         segment_times = []
         for segment in segments:
             segment_times.append({
@@ -439,7 +486,7 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
                 "end": float(segment.end)
             })
         speaker_report.append({
-            "speaker": speaker,
+            "speaker": job.speaker_names.get(speaker, speaker),
           "segments": segment_times
         })
 
@@ -450,5 +497,49 @@ def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshol
 
     # TODO: Store report_json in the database (e.g., as a new table or column)
 
+    # Matched speakers' centroids are kept so confirmed attendees can gain a voice sample
+    # from this meeting, now or when their attendance is confirmed later
+    active_model = active_embedding_model_name()
+    speaker_matches = {}
+    for speaker, match in job.speaker_matches.items():
+        centroid = job.speaker_centroids[speaker]
+        speaker_matches[match.attendee_id] = {
+            "speaker": speaker,
+            "similarity": float(match.similarity),
+            "embedding": (centroid / max(numpy.linalg.norm(centroid), 1e-12)).tolist(),
+            "embedding_model": active_model,
+        }
+    save_speaker_matches(group_id, meeting_id, speaker_matches)
+    if settings.VOICE_PRINT_SAMPLES_FROM_MEETINGS:
+        samples_from_confirmed_attendance(db, group_id, meeting_id)
+
     logging.info(f"Transcription process complete for meeting {meeting_id}.")
 
+
+# (name, function, needs a database session) in the order they run
+TRANSCRIPTION_STAGES = [
+    ("prepare", prepare_meeting, True),
+    ("diarise", diarise_meeting, False),
+    ("identify", identify_speakers, False),
+    ("speech", find_speech, False),
+    ("transcribe", transcribe_speech, False),
+    ("publish", publish_transcript, True),
+]
+
+
+def transcribe_meeting(group_id: int, meeting_id: int, db: Session, snr_threshold = 5.0, embedding_match_threshold = 0.7,
+                       profile: Optional[dict] = None):
+    job = MeetingTranscription(
+        group_id=group_id,
+        meeting_id=meeting_id,
+        snr_threshold=snr_threshold,
+        embedding_match_threshold=embedding_match_threshold,
+        profile=profile,
+    )
+    for _, stage, needs_db in TRANSCRIPTION_STAGES:
+        if job.skipped:
+            return
+        if needs_db:
+            stage(job, db)
+        else:
+            stage(job)
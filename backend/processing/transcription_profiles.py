@@ -0,0 +1,120 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Which Whisper settings a transcription runs with.
+
+A TranscriptionProfile row names a Whisper checkpoint, language, beam size,
+compute type and whether to skip windows Whisper judges to be non-speech. A
+request may name a profile; otherwise the group's default is used, and without
+one the built-in default from settings (WHISPER_MODEL_NAME, English, greedy,
+fp32 - how every meeting was transcribed before profiles existed). The API
+resolves the profile when it queues the job and stores the values in the job's
+params, so editing a profile later does not change jobs already queued.
+
+In the worker, each distinct (checkpoint, compute type) pair is one entry in
+the model registry (see model_registry.get_whisper_model), so a cheap "draft"
+profile and an accurate "final" one can both stay loaded and each is loaded
+only once.
+
+This module is imported by the API and must not import torch or whisper.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import Group, TranscriptionProfile
+
+FP32 = "fp32"
+FP16 = "fp16"
+INT8 = "int8"
+COMPUTE_TYPES = (FP32, FP16, INT8)
+
+
+@dataclass(frozen=True)
+class WhisperProfile:
+    model_name: str
+    language: Optional[str] = "en"
+    beam_size: Optional[int] = None
+    compute_type: str = FP32
+    vad_skip: bool = False
+    name: str = "default"
+
+    @classmethod
+    def default(cls) -> "WhisperProfile":
+        return cls(model_name=settings.WHISPER_MODEL_NAME)
+
+    @classmethod
+    def from_row(cls, profile: TranscriptionProfile) -> "WhisperProfile":
+        return cls(
+            model_name=profile.model_name, language=profile.language, beam_size=profile.beam_size,
+            compute_type=profile.compute_type, vad_skip=profile.vad_skip, name=profile.name,
+        )
+
+    @classmethod
+    def from_params(cls, params: Optional[dict[str, Any]]) -> "WhisperProfile":
+        """The profile a queued job was given, or the default for jobs queued without one."""
+        return cls(**params) if params else cls.default()
+
+    def to_params(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def signature(self) -> tuple:
+        """Everything that changes the decoded text, for cache keys (not the profile's name)."""
+        return (self.model_name, self.language, self.beam_size, self.compute_type, self.vad_skip)
+
+
+def find_profile(db: Session, group_id: int, name: str) -> Optional[TranscriptionProfile]:
+    """The group's own profile called `name`, else the shared one."""
+    candidates = db.query(TranscriptionProfile).filter(
+        TranscriptionProfile.name == name,
+        or_(TranscriptionProfile.group_id == group_id, TranscriptionProfile.group_id.is_(None)),
+    ).all()
+    return min(candidates, key=lambda p: p.group_id is None, default=None)
+
+
+def resolve_profile(db: Session, group_id: int, name: Optional[str] = None) -> WhisperProfile:
+    """The profile a transcription of this group should use. Raises LookupError if `name`
+    matches no profile of the group and no shared one."""
+    if name is not None:
+        profile = find_profile(db, group_id, name)
+        if profile is None:
+            raise LookupError(f"No transcription profile named '{name}'")
+        return WhisperProfile.from_row(profile)
+    group = db.query(Group).get(group_id)
+    if group is not None and group.default_transcription_profile is not None:
+        return WhisperProfile.from_row(group.default_transcription_profile)
+    return WhisperProfile.default()
+
+
+def default_whisper_variants(db: Session) -> list[tuple[str, str]]:
+    """Distinct (checkpoint, compute type) pairs a worker should expect to load: the built-in
+    default first, then those of profiles that are some group's default, the most widely used
+    first. Profiles only ever named in a request can't be foreseen and are not included."""
+    default = WhisperProfile.default()
+    variants = [(default.model_name, default.compute_type)]
+    rows = (
+        db.query(TranscriptionProfile.model_name, TranscriptionProfile.compute_type, func.count(Group.id))
+        .join(Group, Group.default_transcription_profile_id == TranscriptionProfile.id)
+        .group_by(TranscriptionProfile.model_name, TranscriptionProfile.compute_type)
+        .order_by(func.count(Group.id).desc(), TranscriptionProfile.model_name)
+        .all()
+    )
+    for model_name, compute_type, _ in rows:
+        if (model_name, compute_type) not in variants:
+            variants.append((model_name, compute_type))
+    return variants
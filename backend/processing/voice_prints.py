@@ -0,0 +1,159 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A member's voice print: several embedded samples reduced to one centroid.
+
+Each enrolment clip is embedded once, when it is added, and kept as a
+MemberVoiceSample. The member's `embedding` (what transcription matches on) is
+the normalised centroid of their samples in the active embedding model's space,
+with `embedding_spread` recording how tightly the samples agree. Adding or
+removing a sample only recomputes that centroid from the stored vectors - no
+other clip is re-embedded.
+
+Meetings feed the voice print too: when a transcription matches a diarised
+speaker to an attendee, the speaker's centroid is written to
+speaker_matches.json next to the transcript, and attendees whose attendance is
+confirmed gain that centroid as a "meeting" sample.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import GroupMember, MemberVoiceSample, meetings_group_members
+from backend.processing.vtt_writer import meeting_dir
+
+UPLOAD = "upload"
+MEETING = "meeting"
+MATCHES_NAME = "speaker_matches.json"
+
+
+def _unit(vectors: numpy.ndarray) -> numpy.ndarray:
+    norms = numpy.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / numpy.maximum(norms, 1e-12)
+
+
+def robust_centroid(embeddings) -> tuple[numpy.ndarray, float, numpy.ndarray]:
+    """Normalised centroid of `embeddings` (n, dim), the spread (mean cosine distance of
+    the samples used from it) and a mask of which samples were used. With enough samples,
+    outliers - e.g. a clip with someone else talking - are dropped before the final mean."""
+    vectors = _unit(numpy.asarray(embeddings, dtype=numpy.float64))
+    keep = numpy.ones(len(vectors), dtype=bool)
+    centroid = _unit(vectors.mean(axis=0))
+    if len(vectors) >= settings.VOICE_PRINT_TRIM_MIN_SAMPLES:
+        similarities = vectors @ centroid
+        cutoff = similarities.mean() - settings.VOICE_PRINT_OUTLIER_SIGMAS * similarities.std()
+        keep = similarities >= cutoff
+        centroid = _unit(vectors[keep].mean(axis=0))
+    spread = float(numpy.mean(1.0 - vectors[keep] @ centroid))
+    return centroid, spread, keep
+
+
+def refresh_voice_print(member: GroupMember, model_name: Optional[str]) -> None:
+    """Recompute `member`'s centroid from their stored samples embedded with `model_name`."""
+    samples = [s for s in member.voice_samples if s.embedding is not None and s.embedding_model == model_name]
+    if not samples:
+        member.embedding = None
+        member.embedding_spread = None
+        member.embedding_sample_count = 0
+        return
+    centroid, spread, keep = robust_centroid([s.embedding for s in samples])
+    dropped = [s.id for s, kept in zip(samples, keep) if not kept]
+    if dropped:
+        logging.info(f"Voice print for member {member.id} leaves out outlying samples {dropped}")
+    member.embedding = centroid.astype(numpy.float32)
+    member.embedding_model = model_name
+    member.embedding_spread = spread
+    member.embedding_sample_count = int(keep.sum())
+    member.embedding_updated_at = datetime.now().astimezone()
+
+
+def remove_sample(db: Session, sample: MemberVoiceSample) -> None:
+    """Delete a sample (and its clip) and recompute the member's voice print without it."""
+    member = sample.member
+    if sample.audio_path:
+        (settings.EMBEDDING_DIR / sample.audio_path).unlink(missing_ok=True)
+    member.voice_samples.remove(sample)
+    if member.embedding_audio_path == sample.audio_path:
+        uploads = [s for s in member.voice_samples if s.audio_path]
+        member.embedding_audio_path = uploads[-1].audio_path if uploads else None
+    refresh_voice_print(member, member.embedding_model)
+
+
+def save_speaker_matches(group_id: int, meeting_id: int, matches: dict[int, dict]) -> None:
+    """Record which member each diarised speaker matched, with the speaker's centroid."""
+    path = meeting_dir(group_id, meeting_id) / MATCHES_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({str(k): v for k, v in matches.items()}), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_speaker_matches(group_id: int, meeting_id: int) -> dict[int, dict]:
+    path = meeting_dir(group_id, meeting_id) / MATCHES_NAME
+    try:
+        return {int(k): v for k, v in json.loads(path.read_text(encoding="utf-8")).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def add_meeting_sample(member: GroupMember, meeting_id: int, embedding, model_name: str) -> None:
+    """Add (or replace) the sample `meeting_id` contributed to `member`, keeping only the
+    latest VOICE_PRINT_MAX_MEETING_SAMPLES meeting samples."""
+    for sample in [s for s in member.voice_samples if s.source == MEETING and s.meeting_id == meeting_id]:
+        member.voice_samples.remove(sample)
+    member.voice_samples.append(MemberVoiceSample(
+        source=MEETING, meeting_id=meeting_id,
+        embedding=numpy.asarray(embedding, dtype=numpy.float32), embedding_model=model_name
+    ))
+    from_meetings = [s for s in member.voice_samples if s.source == MEETING]
+    for sample in from_meetings[:-settings.VOICE_PRINT_MAX_MEETING_SAMPLES]:
+        member.voice_samples.remove(sample)
+    refresh_voice_print(member, model_name)
+
+
+def samples_from_confirmed_attendance(db: Session, group_id: int, meeting_id: int,
+                                      member_ids: Optional[Iterable[int]] = None) -> list[int]:
+    """Give every confirmed attendee who was confidently matched in the meeting's latest
+    transcription a sample from it. Returns the ids of the members that gained one."""
+    matches = load_speaker_matches(group_id, meeting_id)
+    confirmed = db.execute(
+        meetings_group_members.select().where(
+            meetings_group_members.c.meeting_id == meeting_id,
+            meetings_group_members.c.confirmed.is_(True),
+        )
+    ).all()
+    wanted = None if member_ids is None else set(member_ids)
+    added = []
+    for row in confirmed:
+        member_id = row.group_member_id
+        match = matches.get(member_id)
+        if match is None or (wanted is not None and member_id not in wanted):
+            continue
+        if match["similarity"] < settings.VOICE_PRINT_MEETING_MIN_SIMILARITY:
+            continue  # too uncertain to teach the voice print with
+        member = db.query(GroupMember).get(member_id)
+        if member.embedding_model not in (None, match["embedding_model"]):
+            continue  # the meeting was matched in a different embedding space
+        add_meeting_sample(member, meeting_id, match["embedding"], match["embedding_model"])
+        added.append(member_id)
+    if added:
+        db.commit()
+        logging.info(f"Meeting {meeting_id} added voice samples for members {added}")
+    return added
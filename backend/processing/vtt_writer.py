@@ -0,0 +1,150 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write a WebVTT transcript cue by cue while it is being transcribed.
+
+Cues are appended to UPLOAD_DIR/<group>/<meeting>/transcript.partial.vtt as each
+turn is finished, and transcript.checkpoint.json records how many cues (and
+bytes) are safely on disk. A job that dies part-way and is retried picks the
+partial file back up at the last checkpoint instead of starting over, as long
+as it is producing the same transcript (same `signature`). When every cue is
+written the partial file is renamed into place as the final transcript, so the
+final file only ever appears complete.
+
+The transcription stream endpoint (backend/routes/meetings.py) tails the same
+partial file; parse_cues() is shared so both sides agree on the format.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from backend.config import settings
+
+HEADER = "WEBVTT\n\n"
+PARTIAL_NAME = "transcript.partial.vtt"
+CHECKPOINT_NAME = "transcript.checkpoint.json"
+
+
+@dataclass
+class Cue:
+    index: int
+    start: str
+    end: str
+    speaker: str
+    text: str
+
+
+def format_timestamp(seconds: float) -> str:
+    """Convert seconds to WebVTT timestamp format (HH:MM:SS.mmm)."""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    millis = int((seconds % 1) * 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}.{millis:03}"
+
+
+def meeting_dir(group_id: int, meeting_id: int) -> Path:
+    return settings.UPLOAD_DIR / str(group_id) / str(meeting_id)
+
+
+def partial_transcript_path(group_id: int, meeting_id: int) -> Path:
+    return meeting_dir(group_id, meeting_id) / PARTIAL_NAME
+
+
+def parse_cues(text: str) -> tuple[list[Cue], int]:
+    """Complete cues in `text` (which may end mid-cue) and the number of characters they span."""
+    cues = []
+    consumed = 0
+    while True:
+        end = text.find("\n\n", consumed)
+        if end == -1:
+            break
+        block = text[consumed:end]
+        consumed = end + 2
+        lines = block.strip("\n").split("\n")
+        if len(lines) < 3 or " --> " not in lines[1]:
+            continue  # the WEBVTT header, or anything else that isn't a cue
+        start, _, cue_end = lines[1].partition(" --> ")
+        speaker, _, cue_text = "\n".join(lines[2:]).partition(": ")
+        cues.append(Cue(int(lines[0]), start, cue_end, speaker, cue_text))
+    return cues, consumed
+
+
+class StreamingVttWriter:
+    def __init__(self, directory: Path, signature: str):
+        self.directory = Path(directory)
+        self.partial_path = self.directory / PARTIAL_NAME
+        self.checkpoint_path = self.directory / CHECKPOINT_NAME
+        self.signature = signature
+        self.cues_written = 0
+        self._file = None
+
+    def open(self) -> int:
+        """Open the partial file, resuming from a matching checkpoint. Returns cues already written."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = self._read_checkpoint()
+        if (
+            checkpoint
+            and checkpoint.get("signature") == self.signature
+            and self.partial_path.exists()
+            and self.partial_path.stat().st_size >= checkpoint["bytes"]
+        ):
+            self._file = open(self.partial_path, "r+b")
+            # anything past the checkpoint is a cue the previous attempt never finished
+            self._file.truncate(checkpoint["bytes"])
+            self._file.seek(checkpoint["bytes"])
+            self.cues_written = checkpoint["cues"]
+            logging.info(f"Resuming transcript at cue {self.cues_written + 1} from {self.partial_path}")
+        else:
+            self._file = open(self.partial_path, "wb")
+            self._file.write(HEADER.encode("utf-8"))
+            self.cues_written = 0
+            self._flush()
+        return self.cues_written
+
+    def write_cue(self, start: float, end: float, speaker: str, text: str) -> None:
+        self.cues_written += 1
+        cue = f"{self.cues_written}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{speaker}: {text.strip()}\n\n"
+        self._file.write(cue.encode("utf-8"))
+        self._flush()
+
+    def finalize(self, dest_path: Path) -> None:
+        """Close and atomically move the finished transcript to `dest_path`."""
+        self._file.close()
+        os.replace(self.partial_path, dest_path)
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close without finalising, leaving the partial file and checkpoint to resume from."""
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def _flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": self.signature, "cues": self.cues_written, "bytes": self._file.tell()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _read_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,159 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load and exercise the speech models before the first real job.
+
+With settings.WARMUP_MODELS the worker (backend/worker.py) calls
+warm_up_models() before it claims anything: every model transcription uses is
+loaded into the registry on the target device and run once over a short
+synthetic clip, through the same code paths a meeting takes, so weight
+downloads, CUDA context creation, cuDNN autotuning and lazy kernel compilation
+all happen here rather than inside the first meeting. The worker only reports
+itself ready (settings.WORKER_READY_FILE) once this has finished.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+import numpy
+import torch
+
+from backend.config import settings
+from backend.processing.audio_loading import SAMPLE_RATE, MeetingAudio
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class WarmupState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = PENDING
+        self.seconds: dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def set(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.error = error
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] = round(seconds, 2)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {"status": self.status, "seconds": dict(self.seconds), "error": self.error}
+
+
+warmup_state = WarmupState()
+
+
+def dummy_clip(seconds: float) -> MeetingAudio:
+    """Quiet noise with a tone in it - enough for every model to run its full forward pass."""
+    rng = numpy.random.default_rng(0)
+    t = numpy.arange(int(seconds * SAMPLE_RATE), dtype=numpy.float32) / SAMPLE_RATE
+    samples = 0.1 * numpy.sin(2 * numpy.pi * 220.0 * t) + 0.01 * rng.standard_normal(len(t))
+    return MeetingAudio(samples.astype(numpy.float32))
+
+
+def whisper_variants() -> list[tuple[str, str]]:
+    """The (checkpoint, compute type) pairs to warm: the groups' default transcription
+    profiles (transcription_profiles.default_whisper_variants), at most
+    WARMUP_WHISPER_MAX_VARIANTS of them. Without the database, just the built-in default."""
+    from backend.db import SessionLocal
+    from backend.processing.transcription_profiles import WhisperProfile, default_whisper_variants
+
+    try:
+        db = SessionLocal()
+        try:
+            variants = default_whisper_variants(db)
+        finally:
+            db.close()
+    except Exception:
+        logging.exception("[Warm-up] Could not read transcription profiles; warming the default Whisper model only")
+        default = WhisperProfile.default()
+        variants = [(default.model_name, default.compute_type)]
+    return variants[:max(1, settings.WARMUP_WHISPER_MAX_VARIANTS)]
+
+
+def _warm_whisper(clip: MeetingAudio) -> None:
+    from backend.processing.batched_transcription import TurnSpan, iter_transcribed_turns
+    from backend.processing.model_registry import get_whisper_model, whisper_decode_fp16
+
+    for model_name, compute_type in whisper_variants():
+        model = get_whisper_model(model_name, compute_type)
+        # batched decode plus word alignment, as transcribe_speech runs it
+        list(iter_transcribed_turns(model, clip.samples, [TurnSpan(0.0, clip.duration, "SPEAKER_00")],
+                                    batch_size=1, fp16=whisper_decode_fp16(model, compute_type)))
+        logging.info(f"[Warm-up] Whisper {model_name} ({compute_type}) warm")
+
+
+def _warm_diarisation(clip: MeetingAudio) -> None:
+    from backend.processing.model_registry import get_diarisation_pipeline
+
+    get_diarisation_pipeline()(clip.as_pyannote())
+
+
+def _warm_speaker_embedding(clip: MeetingAudio) -> None:
+    from pyannote.core import Segment
+
+    from backend.processing.reference_extraction import extract_segment_features
+    from backend.processing.speaker_embedding import SEGMENTS, embed_enrolment_batch, embedding_source
+
+    if embedding_source() == SEGMENTS:
+        # SNR model and standalone embedding model, batched as in identify_speakers
+        extract_segment_features(clip, {"SPEAKER_00": [Segment(0.0, clip.duration)]}, 0.0)
+    # and the masked batch path member enrolment uses
+    waveforms = clip.waveform().unsqueeze(0)
+    embed_enrolment_batch(waveforms, torch.ones((1, waveforms.shape[-1])))
+
+
+def _warm_speech_activity(clip: MeetingAudio) -> None:
+    from backend.processing.speech_activity import detect_speech
+
+    if settings.SPEECH_ACTIVITY_GATING:
+        detect_speech(clip)
+
+
+WARMUP_STEPS = [
+    ("whisper", _warm_whisper),
+    ("diarisation", _warm_diarisation),
+    ("speech_activity", _warm_speech_activity),
+    ("speaker_embedding", _warm_speaker_embedding),
+]
+
+
+def warm_up_models() -> dict[str, Any]:
+    """Load and run every model once. A failure is recorded and re-raised: a worker that
+    cannot load its models never reports ready, and exits for its supervisor to restart."""
+    warmup_state.set(RUNNING)
+    clip = dummy_clip(settings.WARMUP_CLIP_SECONDS)
+    started = time.monotonic()
+    try:
+        for name, step in WARMUP_STEPS:
+            step_started = time.monotonic()
+            step(clip)
+            warmup_state.record(name, time.monotonic() - step_started)
+            logging.info(f"[Warm-up] {name} ready in {time.monotonic() - step_started:.1f}s")
+    except Exception as e:
+        warmup_state.set(FAILED, f"{type(e).__name__}: {e}")
+        raise
+    warmup_state.set(READY)
+    logging.info(f"[Warm-up] All models warm after {time.monotonic() - started:.1f}s")
+    return warmup_state.snapshot()
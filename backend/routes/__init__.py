@@ -22,6 +22,7 @@ from .users import router as users_router
 from .aliases import router as aliases_router
 from .transcripts import router as transcripts_router
 from .admin import router as admin_router
+from .transcription_profiles import router as transcription_profiles_router
 
 router = APIRouter()
 router.include_router(upload_router)
@@ -33,3 +34,4 @@ router.include_router(users_router)
 router.include_router(aliases_router)
 router.include_router(transcripts_router)
 router.include_router(admin_router)
+router.include_router(transcription_profiles_router)
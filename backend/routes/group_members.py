@@ -14,18 +14,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, File, Form, UploadFile, Query
 from sqlalchemy.orm import Session
-from typing import List
-from backend.models import GroupMember, Group, GroupMemberOut
+from typing import List, Optional
+from backend.models import (
+    GroupMember, Group, GroupMemberOut, MemberVoiceSample, VoiceSampleOut,
+    ProcessingJob, ProcessingJobOut, JobKind, JobStatus
+)
 from backend.db_dependency import get_db
-from backend.auth import get_current_user_id
+from backend.auth import get_current_user_id, is_group_user
 from backend.validation import GroupMembersCreateEdit
 from backend.config import settings
-from backend.processing.generate_embedding import generate_embedding
+from backend.processing.member_search import find_similar_members
+from backend.processing.voice_prints import UPLOAD, remove_sample
 from backend.routes.upload import ALLOWED_AUDIO_EXTENSIONS
 import shutil
 import os
+import uuid
 
 router = APIRouter(prefix="/groups/{group_id}/members", tags=["group_members"])
 
@@ -111,11 +116,119 @@ def delete_member(
     db.commit()
     return {"message": "Member deleted"}
 
+def _enrolment_file_name(member_id: int, file: UploadFile) -> str:
+    """Validate an uploaded enrolment clip and return a new, unique name to store it under."""
+    # Keep original extension (fall back to .wav if missing)
+    _, ext = os.path.splitext(file.filename)
+    ext = ext.lower()
+
+    if not ext or ext not in ALLOWED_AUDIO_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file extension '{ext}'. Allowed: {', '.join(ALLOWED_AUDIO_EXTENSIONS)}"
+        )
+
+    # Members keep several clips, so each gets its own name rather than replacing the last
+    return f"{member_id}_{uuid.uuid4().hex[:12]}{ext}"
+
+def _add_upload_sample(member: GroupMember, file: UploadFile, file_name: str) -> MemberVoiceSample:
+    embedding_dir = settings.EMBEDDING_DIR
+    embedding_dir.mkdir(parents=True, exist_ok=True)
+    with open(embedding_dir / file_name, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    sample = MemberVoiceSample(source=UPLOAD, audio_path=file_name)
+    member.voice_samples.append(sample)
+    member.embedding_audio_path = file_name
+    return sample
+
+def _queue_enrolment(db: Session, group_id: int, sample_ids: List[int]) -> ProcessingJob:
+    # Embedding runs in `python -m backend.worker`, which keeps the model loaded between jobs
+    job = ProcessingJob(
+        kind=JobKind.ENROLMENT,
+        status=JobStatus.QUEUED,
+        group_id=group_id,
+        params={"sample_ids": sample_ids},
+        max_attempts=settings.TRANSCRIPTION_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def _get_group_member(db: Session, group_id: int, member_id: int) -> GroupMember:
+    member = db.query(GroupMember).filter(
+        GroupMember.id == member_id
+    ).filter(GroupMember.groups.any(id=group_id)).first()
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    return member
+
+@router.post("/embeddings")
+def enrol_members(
+        group_id: int,
+        files: Optional[List[UploadFile]] = File(None),
+        member_ids: Optional[List[int]] = Form(None),
+        db: Session = Depends(get_db),
+        user_id: int = Depends(get_current_user_id),
+    ):
+    """Embed many members in one job. Upload `files` with a matching list of `member_ids`
+    (one id per file, in the same order; a member may have several files) to add voice
+    samples, or send no files to re-embed every uploaded sample of the group's members."""
+    group = db.query(Group).filter(Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    members = {member.id: member for member in group.members}
+
+    if files:
+        if not member_ids or len(member_ids) != len(files):
+            raise HTTPException(status_code=400, detail="Provide one member_id for each uploaded file.")
+        missing = sorted({member_id for member_id in member_ids if member_id not in members})
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Members not found in this group: {missing}")
+
+        # Validate every file before writing any, so a bad upload leaves nothing half-enrolled
+        file_names = [_enrolment_file_name(member_id, file) for member_id, file in zip(member_ids, files)]
+        samples = [
+            _add_upload_sample(members[member_id], file, file_name)
+            for member_id, file, file_name in zip(member_ids, files, file_names)
+        ]
+        db.commit()
+    else:
+        samples = [sample for member in members.values() for sample in member.voice_samples if sample.audio_path]
+        if not samples:
+            raise HTTPException(status_code=400, detail="No members of this group have enrolment audio.")
+
+    sample_ids = sorted(sample.id for sample in samples)
+    member_ids = sorted({sample.member_id for sample in samples})
+    job = _queue_enrolment(db, group_id, sample_ids)
+    return {
+        "message": f"Embedding of {len(sample_ids)} sample(s) for {len(member_ids)} member(s) queued.",
+        "member_ids": member_ids,
+        "sample_ids": sample_ids,
+        "job_id": job.id,
+        "status_check_url": f"/groups/{group_id}/members/embeddings/jobs/{job.id}",
+    }
+
+@router.get("/embeddings/jobs/{job_id}", response_model=ProcessingJobOut)
+def get_enrolment_job(
+        group_id: int,
+        job_id: int,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(get_current_user_id),
+    ):
+    job = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.group_id == group_id,
+        ProcessingJob.kind == JobKind.ENROLMENT
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Enrolment job not found")
+    return job
+
 @router.post("/{member_id}/embedding")
 def upload_member_embedding(
         group_id: int,
         member_id: int,
-        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         overwrite: bool = Query(False),
         db: Session = Depends(get_db),
@@ -132,43 +245,76 @@ def upload_member_embedding(
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
 
-    # Define path
-    embedding_dir = settings.EMBEDDING_DIR
-    embedding_dir.mkdir(parents=True, exist_ok=True)
-
-    # Keep original extension (fall back to .wav if missing)
-    _, ext = os.path.splitext(file.filename)
-    ext = ext.lower()
-
-    if not ext or ext not in ALLOWED_AUDIO_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file extension '{ext}'. Allowed: {', '.join(ALLOWED_AUDIO_EXTENSIONS)}"
-        )
-    
-    file_name = f"{member_id}{ext}"
-    audio_path = embedding_dir / file_name
+    file_name = _enrolment_file_name(member_id, file)
 
-    # Check for existing audio
-    if audio_path.exists() and not overwrite:
-        raise HTTPException(
-            status_code=409,
-            detail="Embedding audio already exists. Use `overwrite=true` to replace it."
-        )
+    # Each upload adds a voice sample; `overwrite=true` replaces the member's uploaded clips instead
+    if overwrite:
+        for sample in [s for s in member.voice_samples if s.source == UPLOAD]:
+            remove_sample(db, sample)
 
-    # Save file
-    with open(audio_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    #update member with file name
-    member.embedding_audio_path = file_name
+    sample = _add_upload_sample(member, file, file_name)
     db.commit()
 
-    # Queue background embedding process
-    background_tasks.add_task(generate_embedding, member_id, db)
+    # Queue embedding of just the new clip; the member's other samples are reused as they are
+    job = _queue_enrolment(db, group_id, [sample.id])
 
     return {
         "message": "Audio file uploaded. Embedding will be processed shortly.",
         "member_id": member_id,
+        "sample_id": sample.id,
         "file_name":file_name,
-    }
\ No newline at end of file
+        "job_id": job.id,
+        "status_check_url": f"/groups/{group_id}/members/embeddings/jobs/{job.id}",
+    }
+
+@router.get("/{member_id}/samples", response_model=List[VoiceSampleOut])
+def list_voice_samples(
+        group_id: int,
+        member_id: int,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(get_current_user_id),
+    ):
+    return _get_group_member(db, group_id, member_id).voice_samples
+
+@router.delete("/{member_id}/samples/{sample_id}", response_model=GroupMemberOut)
+def delete_voice_sample(
+        group_id: int,
+        member_id: int,
+        sample_id: int,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(get_current_user_id),
+    ):
+    member = _get_group_member(db, group_id, member_id)
+    sample = next((s for s in member.voice_samples if s.id == sample_id), None)
+    if not sample:
+        raise HTTPException(status_code=404, detail="Voice sample not found")
+    # The centroid is recomputed from the remaining samples' stored embeddings - no model run
+    remove_sample(db, sample)
+    db.commit()
+    db.refresh(member)
+    return member
+
+@router.get("/{member_id}/similar")
+def find_similar_voices(
+        group_id: int,
+        member_id: int,
+        limit: int = Query(5, ge=1, le=50),
+        db: Session = Depends(get_db),
+        user_id: int = Depends(is_group_user),
+    ):
+    """Members of the caller's groups whose voice print is closest to this member's,
+    nearest first - e.g. to spot the same person enrolled in two cohorts."""
+    member = _get_group_member(db, group_id, member_id)
+    if member.embedding is None:
+        raise HTTPException(status_code=400, detail="Member has no voice print yet")
+    matches = find_similar_members(db, member.embedding, member.embedding_model, limit,
+                                   exclude_member_id=member.id, user_id=user_id)
+    return [
+        {
+            "member_id": match.id,
+            "name": match.name,
+            "group_ids": [group.id for group in match.groups if user_id in [u.id for u in group.users]],
+            "similarity": round(similarity, 4),
+        }
+        for match, similarity in matches
+    ]
@@ -14,15 +14,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
-from backend.models import Meeting, MeetingOut, GroupMember, GroupMemberOut, RawFile
+from backend.models import (
+    Meeting, MeetingOut, GroupMember, GroupMemberOut, RawFile,
+    ProcessingJob, ProcessingJobOut, JobKind, JobStatus, meetings_group_members
+)
 from backend.db_dependency import get_db
+from backend.db import SessionLocal
+from backend.config import settings
 from datetime import datetime
 from backend.validation import MeetingCreateEdit, MeetingAttendee
 from backend.auth import get_current_user_id, is_group_user
-from backend.processing.transcribe import transcribe_meeting
+from backend.processing.audio_probe import probe_duration
+from backend.processing.vtt_writer import parse_cues, partial_transcript_path, meeting_dir
+from backend.processing.voice_prints import samples_from_confirmed_attendance
+from backend.processing.transcription_profiles import resolve_profile
+from dataclasses import asdict
+from typing import Optional
+import json
+import os
+import time
 
 router = APIRouter(prefix="/groups/{group_id}/meetings", tags=["meetings"])
 
@@ -135,15 +149,43 @@ def remove_attendee(
         return {"message": "Attendee removed"}
     else:
         raise HTTPException(status_code=404, detail="Member is not an attendee of this meeting")
-    
+
+@router.post("/{meeting_id}/attendees/{member_id}/confirm")
+def confirm_attendee(
+    group_id: int,
+    meeting_id: int,
+    member_id: int,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(is_group_user)
+):
+    # Mark the attendance as confirmed
+    result = db.execute(
+        meetings_group_members.update()
+        .where(
+            meetings_group_members.c.meeting_id == meeting_id,
+            meetings_group_members.c.group_member_id == member_id,
+        )
+        .values(confirmed=True)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Member is not an attendee of this meeting")
+    db.commit()
+
+    # If the meeting has been transcribed and they were confidently matched, their voice
+    # print gains a sample from it (backend/processing/voice_prints.py)
+    added = []
+    if settings.VOICE_PRINT_SAMPLES_FROM_MEETINGS:
+        added = samples_from_confirmed_attendance(db, group_id, meeting_id, member_ids=[member_id])
+    return {"message": "Attendance confirmed", "voice_sample_added": member_id in added}
+
 @router.post("/{meeting_id}/transcribe")
-async def start_transcription_job(
+def start_transcription_job(
     group_id: int,
     meeting_id: int,
     reprocess: bool = Query(False),
+    profile: Optional[str] = Query(None, description="Transcription profile name; defaults to the group's"),
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id),
-    background_tasks: BackgroundTasks = None
 ):
     # Find first audio file for this meeting
     audio_file = db.query(RawFile).filter(
@@ -166,11 +208,130 @@ async def start_transcription_job(
             detail="This file has already been processed. To reprocess, set the 'reprocess=true' query parameter."
         )
 
-    # Queue background transcription process
-    background_tasks.add_task(transcribe_meeting, group_id, meeting_id, db)
+    # Only one transcription per meeting in flight at a time
+    in_flight = db.query(ProcessingJob).filter(
+        ProcessingJob.meeting_id == meeting_id,
+        ProcessingJob.kind == JobKind.TRANSCRIPTION,
+        ProcessingJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+    ).first()
+    if in_flight:
+        raise HTTPException(
+            status_code=409,
+            detail=f"A transcription job for this meeting is already {in_flight.status.value}."
+        )
+
+    # The profile is fixed now, so later edits to it don't change what this job runs with
+    try:
+        whisper_profile = resolve_profile(db, group_id, profile)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    # Queue the job; a separate `python -m backend.worker` process picks it up.
+    # The duration lets multi-process workers start the longest meetings first.
+    audio_path = settings.UPLOAD_DIR / str(group_id) / str(meeting_id) / audio_file.file_name
+    job = ProcessingJob(
+        kind=JobKind.TRANSCRIPTION,
+        status=JobStatus.QUEUED,
+        group_id=group_id,
+        meeting_id=meeting_id,
+        params={"profile": whisper_profile.to_params()},
+        max_attempts=settings.TRANSCRIPTION_MAX_ATTEMPTS,
+        estimated_seconds=probe_duration(audio_path) if audio_path.exists() else None,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
 
     return {
         "message": f"{'Reprocessing' if reprocess else 'Transcription job started'}.",
         "file": audio_file.file_name,
+        "job_id": job.id,
+        "profile": whisper_profile.name,
         "status_check_url": f"/groups/{group_id}/meetings/{meeting_id}/transcription/status"
     }
+
+def _latest_transcription_job(db: Session, meeting_id: int):
+    return db.query(ProcessingJob).filter(
+        ProcessingJob.meeting_id == meeting_id,
+        ProcessingJob.kind == JobKind.TRANSCRIPTION
+    ).order_by(ProcessingJob.id.desc()).first()
+
+@router.get("/{meeting_id}/transcription/status", response_model=ProcessingJobOut)
+def get_transcription_status(
+    group_id: int,
+    meeting_id: int,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(is_group_user)
+):
+    # Most recent transcription job for this meeting
+    job = _latest_transcription_job(db, meeting_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No transcription job found for this meeting")
+    return job
+
+def _stream_transcript_cues(group_id: int, meeting_id: int, job_id: int):
+    """Yield server-sent events for each cue in the partial transcript as it is written,
+    then a final `done` event once the job has stopped running. If the file is rewritten
+    from the start (a retry that could not resume it), a `reset` event tells the client to
+    drop the cues it has and the cues are sent again from the first."""
+    partial_path = partial_transcript_path(group_id, meeting_id)
+    offset = 0
+    sent = 0  # index of the last cue sent
+    while True:
+        # Read the job state before the file, so the last cues are never missed:
+        # the finished file is renamed into place before the job is marked complete.
+        db = SessionLocal()
+        try:
+            job = db.query(ProcessingJob).get(job_id)
+            status = job.status
+            final = None
+            if status == JobStatus.COMPLETED:
+                final = db.query(RawFile).filter_by(meeting_id=meeting_id, type="transcript_generated").first()
+        finally:
+            db.close()
+
+        # The finished transcript is the partial file renamed, so offsets carry over
+        path = partial_path
+        if not path.exists() and final is not None:
+            path = meeting_dir(group_id, meeting_id) / final.file_name
+        while path.exists():
+            with open(path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(min(offset, size))
+                chunk = f.read()
+            cut = chunk.rfind(b"\n\n")
+            cues, _ = parse_cues(chunk[:cut + 2].decode("utf-8", errors="replace")) if cut != -1 else ([], 0)
+            # Shorter than what was already read, or not continuing from the last cue sent:
+            # the file was started again, so what was sent no longer matches it
+            if offset and (size < offset or (cues and cues[0].index != sent + 1)):
+                offset, sent = 0, 0
+                yield "event: reset\ndata: {}\n\n"
+                continue
+            if cut != -1:
+                offset += cut + 2
+                for cue in cues:
+                    sent = cue.index
+                    yield f"event: cue\ndata: {json.dumps(asdict(cue))}\n\n"
+            break
+
+        if status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            yield f"event: done\ndata: {json.dumps({'status': status.value})}\n\n"
+            return
+        time.sleep(settings.TRANSCRIPT_STREAM_POLL_SECONDS)
+
+@router.get("/{meeting_id}/transcription/stream")
+def stream_transcription(
+    group_id: int,
+    meeting_id: int,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(is_group_user)
+):
+    # Tail the transcript cues of the most recent transcription job as server-sent events
+    job = _latest_transcription_job(db, meeting_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No transcription job found for this meeting")
+    return StreamingResponse(
+        _stream_transcript_cues(group_id, meeting_id, job.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -12,18 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 from datetime import datetime
-import os
+import json
+import sys
+import time
 
+from backend.config import settings
 from backend.db import SessionLocal
 from backend.startup import START_TIME
+from backend.processing.model_availability import model_availability
 
 router = APIRouter()
-HUGGING_FACE_TOKEN = os.getenv("HUGGING_FACE_TOKEN")
 
 def get_db():
     db = SessionLocal()
@@ -38,11 +41,7 @@ def get_status(db: Session = Depends(get_db)):
     models = check_model_status()
 
     # Check PostgreSQL connection
-    try:
-        db.execute(text('SELECT 1'))  # Lightweight DB health check
-        db_status = "connected"
-    except SQLAlchemyError as e:
-        db_status = f"error: {str(e)}"
+    db_status = check_database(db)
 
     return {
         "status": "ok",
@@ -51,9 +50,55 @@ def get_status(db: Session = Depends(get_db)):
         "database": db_status
     }
 
+@router.get("/status/live")
+def get_liveness():
+    # Liveness only: the process is up and serving requests. No database or model checks,
+    # so a slow dependency never gets a healthy process restarted.
+    return {"status": "ok"}
+
+@router.get("/status/ready")
+def get_readiness(response: Response, db: Session = Depends(get_db)):
+    # Readiness: whether to route traffic here. Models come from the background snapshot
+    # (backend/processing/model_availability.py), never from loading them.
+    db_status = check_database(db)
+    snapshot = model_availability.snapshot()
+    models_ready = model_availability.all_available()
+    ready = db_status == "connected" and (models_ready or not settings.READINESS_REQUIRES_MODELS)
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not ready",
+        "database": db_status,
+        "models_ready": models_ready,
+        "models_checked_at": snapshot["checked_at"],
+    }
+
+def check_database(db: Session) -> str:
+    try:
+        db.execute(text('SELECT 1'))  # Lightweight DB health check
+        return "connected"
+    except SQLAlchemyError as e:
+        return f"error: {str(e)}"
+
+@router.get("/status/pipeline")
+def get_pipeline_status():
+    # Per-stage queue depth and throughput published by pipeline-mode workers (backend/worker.py)
+    metrics_dir = settings.UPLOAD_DIR / "worker_metrics"
+    cutoff = time.time() - 10 * settings.WORKER_METRICS_SECONDS
+    workers = []
+    for path in sorted(metrics_dir.glob("*.json")) if metrics_dir.exists() else []:
+        if path.stat().st_mtime < cutoff:
+            continue  # that worker has stopped reporting
+        try:
+            workers.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return {"workers": workers}
+
 @router.get("/gpu-status")
 def get_gpu_status():
     import torch
+    from backend.processing.device_management import device_manager
 
     if not torch.cuda.is_available():
         return {"cuda_available": False, "message": "CUDA not available."}
@@ -81,71 +126,41 @@ def get_gpu_status():
         "memory_allocated_MB": round(memory_allocated / 1024**2, 2),
         "memory_reserved_MB": round(memory_reserved / 1024**2, 2),
         "total_memory_MB": round(total_memory / 1024**2, 2),
+        # admission, OOM fallbacks and reservations in this process (backend/processing/device_management.py)
+        "device_manager": device_manager.snapshot(),
     }
 
 def check_model_status():
-    status = {}
-
-    # Whisper check
-    try:
-        import whisper
-        model = whisper.load_model("base")
-        status["whisper_model"] = {
-            "status": "available",
-            "version": whisper.__version__ if hasattr(whisper, "__version__") else "unknown"
-        }
-    except Exception as e:
-        status["whisper_model"] = {
-            "status": f"unavailable ({str(e)})",
-            "version": "unknown"
-        }
-
-    # PyAnnote diarisation check
-    try:
-        from pyannote.audio import Pipeline
-        import pyannote
-        Pipeline.from_pretrained("pyannote/speaker-diarization", use_auth_token=HUGGING_FACE_TOKEN)
-        status["pyannote_diarization"] = {
-            "status": "available",
-            "version": pyannote.__version__ if hasattr(pyannote, "__version__") else "unknown"
-        }
-    except Exception as e:
-        status["pyannote_diarization"] = {
-            "status": f"unavailable ({str(e)})",
-            "version": "unknown"
-        }
-
-    # PyAnnote embedding model check
-    try:
-        from pyannote.audio import Inference
-        Inference("pyannote/embedding", use_auth_token=HUGGING_FACE_TOKEN)
-        status["pyannote_embedding"] = {
-            "status": "available",
-            "version": "included with pyannote.audio"
-        }
-    except Exception as e:
-        status["pyannote_embedding"] = {
-            "status": f"unavailable ({str(e)})",
-            "version": "unknown"
-        }
-
-    # Torch and CUDA status
-    try:
-        import torch
-        cuda_available = torch.cuda.is_available()
-        device_name = torch.cuda.get_device_name(0) if cuda_available else "CPU"
-
-        status["torch"] = {
-            "version": torch.__version__,
-            "cuda_available": cuda_available,
-            "device": device_name,
-            "info": "See /gpu-status endpoint for more details" if cuda_available else ""
-        }
-    except Exception as e:
-        status["torch"] = {
-            "version": "unknown",
-            "cuda_available": False,
-            "device": f"unavailable ({str(e)})"
-        }
+    # Availability from the registry and download caches, refreshed in the background -
+    # nothing is loaded here (see backend/processing/model_availability.py)
+    status = dict(model_availability.snapshot()["models"])
+
+    # Torch and CUDA status - only if something in this process has already imported torch.
+    # Importing it here would load the whole ML stack into the API on the first poll.
+    torch = sys.modules.get("torch")
+    if torch is None:
+        status["torch"] = {"version": None, "cuda_available": None, "device": "not loaded in this process"}
+    else:
+        try:
+            cuda_available = torch.cuda.is_available()
+            device_name = torch.cuda.get_device_name(0) if cuda_available else "CPU"
+
+            status["torch"] = {
+                "version": torch.__version__,
+                "cuda_available": cuda_available,
+                "device": device_name,
+                "info": "See /gpu-status endpoint for more details" if cuda_available else ""
+            }
+        except Exception as e:
+            status["torch"] = {
+                "version": "unknown",
+                "cuda_available": False,
+                "device": f"unavailable ({str(e)})"
+            }
+
+    # Models currently resident in this process (see backend/processing/model_registry.py);
+    # as in model_availability._loaded_keys, the registry is not imported just to ask
+    model_registry = sys.modules.get("backend.processing.model_registry")
+    status["loaded_models"] = model_registry.registry.loaded() if model_registry is not None else []
 
     return status
@@ -0,0 +1,133 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from backend.db_dependency import get_db
+from backend.auth import is_group_user
+from backend.models import Group, TranscriptionProfile, TranscriptionProfileOut
+from backend.validation import TranscriptionProfileCreateEdit
+
+router = APIRouter(prefix="/groups/{group_id}/transcription-profiles", tags=["transcription_profiles"])
+
+
+def _group_profile(db: Session, group_id: int, profile_id: int) -> TranscriptionProfile:
+    # Shared profiles (no group) are visible to every group but edited by none of them
+    profile = db.query(TranscriptionProfile).filter_by(id=profile_id, group_id=group_id).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Transcription profile not found in this group")
+    return profile
+
+
+def _apply(profile: TranscriptionProfile, data: TranscriptionProfileCreateEdit) -> None:
+    profile.name = data.name
+    profile.model_name = data.model_name
+    profile.language = data.language or None
+    profile.beam_size = data.beam_size
+    profile.compute_type = data.compute_type
+    profile.vad_skip = data.vad_skip
+
+
+def _check_name_free(db: Session, group_id: int, name: str, profile_id: int = None) -> None:
+    clash = db.query(TranscriptionProfile).filter_by(group_id=group_id, name=name).first()
+    if clash and clash.id != profile_id:
+        raise HTTPException(status_code=409, detail=f"This group already has a profile named '{name}'")
+
+
+@router.get("/", response_model=List[TranscriptionProfileOut])
+def list_profiles(group_id: int, db: Session = Depends(get_db), user_id: int = Depends(is_group_user)):
+    """This group's profiles followed by the shared ones; a group profile hides a shared one
+    of the same name when a transcription request names it."""
+    own = db.query(TranscriptionProfile).filter_by(group_id=group_id).order_by(TranscriptionProfile.name).all()
+    shared = db.query(TranscriptionProfile).filter(
+        TranscriptionProfile.group_id.is_(None)
+    ).order_by(TranscriptionProfile.name).all()
+    return own + shared
+
+
+@router.post("/", response_model=TranscriptionProfileOut)
+def create_profile(
+        group_id: int,
+        data: TranscriptionProfileCreateEdit,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(is_group_user),
+    ):
+    _check_name_free(db, group_id, data.name)
+    profile = TranscriptionProfile(group_id=group_id)
+    _apply(profile, data)
+    db.add(profile)
+    if data.make_default:
+        db.query(Group).get(group_id).default_transcription_profile = profile
+    db.commit()
+    db.refresh(profile)
+    return profile
+
+
+@router.put("/{profile_id}", response_model=TranscriptionProfileOut)
+def update_profile(
+        group_id: int,
+        profile_id: int,
+        data: TranscriptionProfileCreateEdit,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(is_group_user),
+    ):
+    profile = _group_profile(db, group_id, profile_id)
+    _check_name_free(db, group_id, data.name, profile_id)
+    _apply(profile, data)
+    if data.make_default:
+        db.query(Group).get(group_id).default_transcription_profile = profile
+    db.commit()
+    db.refresh(profile)
+    return profile
+
+
+@router.put("/{profile_id}/default")
+def set_default_profile(
+        group_id: int,
+        profile_id: int,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(is_group_user),
+    ):
+    """Make a profile - the group's own or a shared one - the group's default."""
+    profile = db.query(TranscriptionProfile).get(profile_id)
+    if not profile or profile.group_id not in (group_id, None):
+        raise HTTPException(status_code=404, detail="Transcription profile not found")
+    db.query(Group).get(group_id).default_transcription_profile = profile
+    db.commit()
+    return {"message": f"'{profile.name}' is now the default transcription profile"}
+
+
+@router.delete("/default")
+def clear_default_profile(group_id: int, db: Session = Depends(get_db), user_id: int = Depends(is_group_user)):
+    """Go back to the built-in default (settings.WHISPER_MODEL_NAME, English, greedy)."""
+    db.query(Group).get(group_id).default_transcription_profile = None
+    db.commit()
+    return {"message": "Default transcription profile cleared"}
+
+
+@router.delete("/{profile_id}")
+def delete_profile(
+        group_id: int,
+        profile_id: int,
+        db: Session = Depends(get_db),
+        user_id: int = Depends(is_group_user),
+    ):
+    profile = _group_profile(db, group_id, profile_id)
+    group = db.query(Group).get(group_id)
+    if group.default_transcription_profile_id == profile.id:
+        group.default_transcription_profile = None
+    db.delete(profile)
+    db.commit()
+    return {"message": "Transcription profile deleted"}
@@ -12,8 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from typing import Any, List, Optional
 from backend.db_dependency import get_db
@@ -27,6 +28,12 @@ router = APIRouter(prefix="/groups/{group_id}/transcripts", tags=["transcripts"]
 class TranscriptSearchRequest(BaseModel):
     query: str
     meeting_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    speaker: Optional[str] = None
+    min_duration: Optional[float] = Field(default=None, ge=0)
+    n_results: int = Field(default=5, ge=1, le=50)
+    offset: int = Field(default=0, ge=0, le=450)
 
 
 @router.post("/search")
@@ -38,9 +45,21 @@ def search(
     ):
     """Semantic search over this group's indexed transcript chunks (see
     backend/transcript_rag/indexer.py). Retrieval only - no LLM call - the
-    caller is responsible for turning results into prose if it wants that."""
+    caller is responsible for turning results into prose if it wants that.
+    Filters are applied inside the index, so a filtered search still returns
+    up to n_results hits; page on with offset."""
+    if payload.date_from and payload.date_to and payload.date_from > payload.date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
     group = db.query(Group).get(group_id)
-    hits: List[dict[str, Any]] = search_transcripts(group.name, payload.query)
-    if payload.meeting_id is not None:
-        hits = [h for h in hits if h.get("meeting_id") == str(payload.meeting_id)]
-    return {"results": hits}
+    hits: List[dict[str, Any]] = search_transcripts(
+        group.name,
+        payload.query,
+        n_results=payload.n_results,
+        offset=payload.offset,
+        meeting_id=payload.meeting_id,
+        date_from=payload.date_from,
+        date_to=payload.date_to,
+        speaker=payload.speaker,
+        min_duration=payload.min_duration,
+    )
+    return {"results": hits, "offset": payload.offset, "n_results": payload.n_results}
@@ -7,18 +7,12 @@ Design notes (see the plan / README "Testing" section for the full rationale):
   `testcontainers`), not SQLite, so Postgres-specific behaviour (JSON
   columns, native enums) is actually exercised.
 
-- Importing `backend.main` pulls in the *entire* ML stack (whisper, torch,
-  torchaudio, pyannote.audio, pyannote.core, scikit-learn) as a side effect,
-  because `backend/routes/group_members.py` and `backend/routes/meetings.py`
-  import `backend/processing/generate_embedding.py` and
-  `backend/processing/transcribe.py` at module scope, and those import the ML
-  libraries at module scope too. Dev machines that don't have the full
-  CUDA/whisper/pyannote stack installed (this one included) would otherwise
-  be unable to run even a plain CRUD test. `_stub_missing_module` installs a
-  lightweight `MagicMock` stand-in for any of these that fail to import for
-  real, so route/CRUD/auth logic can be exercised without them. Where the
-  real packages ARE installed (e.g. inside the built Docker image), the
-  stubs are skipped entirely and the real modules load normally.
+- Importing `backend.main` does not import the ML stack (whisper, torch,
+  pyannote, scikit-learn, chromadb, sentence-transformers): routes only
+  queue work for the worker, and the modules they do import load those
+  packages inside the functions that need them. So CRUD/auth tests run
+  on machines without the CUDA/whisper/pyannote stack installed, and
+  `test_import_budget.py` keeps it that way.
 
 - `backend/startup.py` no longer calls `Base.metadata.create_all()` (removed
   when the project switched to Alembic for schema management) - deployment
@@ -34,11 +28,9 @@ Design notes (see the plan / README "Testing" section for the full rationale):
   exercised against a correct schema.
 """
 
-import importlib
 import os
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock
 
 import pytest
 from sqlalchemy import text
@@ -48,38 +40,6 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-# Modules that pull in the heavy/CUDA-specific ML stack. Stubbed only if the
-# real package isn't importable in the current environment.
-_STUBBABLE_MODULES = (
-    "whisper",
-    "torchaudio",
-    "pyannote.audio",
-    "pyannote.core",
-    "sklearn.preprocessing",
-    "sklearn.metrics.pairwise",
-    "chromadb",
-    "sentence_transformers",
-)
-
-
-def _stub_missing_module(dotted_name: str) -> None:
-    parts = dotted_name.split(".")
-    for i in range(1, len(parts) + 1):
-        prefix = ".".join(parts[:i])
-        if prefix in sys.modules:
-            continue
-        try:
-            importlib.import_module(prefix)
-            continue
-        except ImportError:
-            pass
-        stub = MagicMock(name=prefix)
-        sys.modules[prefix] = stub
-        if i > 1:
-            parent = sys.modules[".".join(parts[: i - 1])]
-            setattr(parent, parts[i - 1], stub)
-
-
 def _truncate_all_tables(engine) -> None:
     with engine.begin() as conn:
         tables = conn.execute(
@@ -93,7 +53,7 @@ def _truncate_all_tables(engine) -> None:
 
 @pytest.fixture(scope="session")
 def postgres_container():
-    with PostgresContainer("postgres:15", username="test_user", password="test_pass", dbname="test_db") as pg:
+    with PostgresContainer("pgvector/pgvector:pg15", username="test_user", password="test_pass", dbname="test_db") as pg:
         yield pg
 
 
@@ -112,13 +72,13 @@ def app(postgres_container, tmp_path_factory):
     os.environ["PGADMIN_DEFAULT_PASSWORD"] = "test-pass"
     os.environ["UPLOAD_DIR"] = str(tmp_path_factory.mktemp("uploads"))
 
-    for name in _STUBBABLE_MODULES:
-        _stub_missing_module(name)
-
     import backend.main as main_module
 
     from backend.db import Base, engine
 
+    # Voice prints are pgvector columns; the extension is normally created by the migrations
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
     Base.metadata.create_all(bind=engine)
 
     from alembic import command
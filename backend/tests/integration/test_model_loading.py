@@ -20,6 +20,16 @@ pytestmark = pytest.mark.integration
 
 
 def test_status_endpoint_reports_real_models_available(client):
+    # /status no longer loads anything itself, so load the real models first
+    from backend.processing.model_availability import model_availability
+    from backend.processing.model_registry import get_diarisation_pipeline, get_embedding_model, get_whisper_model
+    from backend.config import settings
+
+    get_whisper_model(settings.WHISPER_MODEL_NAME)
+    get_diarisation_pipeline()
+    get_embedding_model()
+    model_availability.refresh()
+
     response = client.get("/status")
     assert response.status_code == 200
     models = response.json()["models"]
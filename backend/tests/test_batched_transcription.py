@@ -0,0 +1,43 @@
+"""
+No-DB checks for the turn-packing step of the batched Whisper stage
+(backend/processing/batched_transcription.py). Decoding itself needs real
+Whisper weights and is not exercised here.
+"""
+
+import pytest
+
+pytest.importorskip("whisper")
+
+from backend.processing.batched_transcription import TurnSpan, pack_turns
+
+
+def test_adjacent_same_speaker_turns_share_a_window():
+    turns = [TurnSpan(0.0, 5.0, "A"), TurnSpan(5.5, 10.0, "A"), TurnSpan(10.5, 12.0, "A")]
+    windows = pack_turns(turns)
+    assert len(windows) == 1
+    assert [p.turn_index for p in windows[0].placements] == [0, 1, 2]
+
+
+def test_long_turn_from_new_speaker_starts_new_window():
+    turns = [TurnSpan(0.0, 5.0, "A"), TurnSpan(5.0, 15.0, "B")]
+    windows = pack_turns(turns)
+    assert [[p.turn_index for p in w.placements] for w in windows] == [[0], [1]]
+
+
+def test_short_turns_are_packed_across_speakers():
+    turns = [TurnSpan(0.0, 5.0, "A"), TurnSpan(5.0, 6.0, "B"), TurnSpan(6.0, 7.0, "A")]
+    windows = pack_turns(turns)
+    assert len(windows) == 1
+
+
+def test_windows_never_exceed_thirty_seconds():
+    turns = [TurnSpan(i * 4.0, i * 4.0 + 4.0, "A") for i in range(20)]
+    windows = pack_turns(turns)
+    assert all(w.duration <= 30.0 for w in windows)
+    assert sorted(p.turn_index for w in windows for p in w.placements) == list(range(20))
+
+
+def test_turn_longer_than_window_is_split():
+    windows = pack_turns([TurnSpan(0.0, 70.0, "A")])
+    assert len(windows) == 3
+    assert all(w.placements[0].turn_index == 0 for w in windows)
@@ -0,0 +1,156 @@
+"""
+No-DB checks for OOM handling and memory admission in
+backend/processing/device_management.py (no GPU needed; CUDA is faked).
+"""
+
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from backend.config import settings
+from backend.processing import device_management
+from backend.processing.device_management import (
+    DeviceManager,
+    is_oom_error,
+    model_use_lock,
+    safe_run_model,
+    tensor_bytes,
+    windowed_estimate,
+)
+
+MB = 1024 ** 2
+
+
+class FakeModel:
+    def __init__(self):
+        self.moves = []
+
+    def to(self, device):
+        self.moves.append(str(device))
+        return self
+
+
+@pytest.fixture
+def fresh_manager(monkeypatch):
+    manager = DeviceManager()
+    monkeypatch.setattr(device_management, "device_manager", manager)
+    return manager
+
+
+def oom():
+    return RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+
+
+def test_oom_errors_are_recognised():
+    assert is_oom_error(oom())
+    assert not is_oom_error(RuntimeError("shape mismatch"))
+    assert not is_oom_error(ValueError("CUDA out of memory"))
+
+
+def test_tensor_bytes_walks_nested_inputs():
+    waveform = torch.zeros(1, 1000, dtype=torch.float32)
+    assert tensor_bytes({"waveform": waveform, "sample_rate": 16000}) == 4000
+    assert tensor_bytes(([waveform, waveform], {})) == 8000
+
+
+def test_oom_halves_batch_size_before_giving_up(fresh_manager, monkeypatch):
+    monkeypatch.setattr(device_management.torch.cuda, "empty_cache", lambda: None)
+    seen = []
+
+    def run(batch_size):
+        seen.append(batch_size)
+        if batch_size > 2:
+            raise oom()
+        return batch_size
+
+    assert safe_run_model(run, batch_size=8) == 2
+    assert seen == [8, 4, 2]
+    assert fresh_manager.counters["oom_batch_reductions"] == 2
+
+
+def test_oom_without_batch_moves_model_to_cpu_and_back(fresh_manager, monkeypatch):
+    monkeypatch.setattr(device_management.torch.cuda, "empty_cache", lambda: None)
+    monkeypatch.setattr(device_management, "get_safe_device", lambda refresh=False: ("cuda:0", ""))
+    monkeypatch.setattr(DeviceManager, "memory", lambda self, device: (64 * 1024 * MB, 64 * 1024 * MB))
+    model = FakeModel()
+    calls = []
+
+    def run(audio):
+        calls.append(audio.device.type)
+        if len(calls) == 1:
+            raise oom()
+        return "ok"
+
+    assert safe_run_model(run, torch.zeros(10), model=model) == "ok"
+    assert model.moves == ["cpu", "cuda:0"]
+    assert fresh_manager.counters["oom_cpu_fallbacks"] == 1
+
+
+def test_admission_falls_back_to_cpu_when_memory_stays_short(fresh_manager, monkeypatch):
+    monkeypatch.setattr(settings, "DEVICE_ADMISSION_WAIT_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "DEVICE_MEMORY_HEADROOM_MB", 0)
+    monkeypatch.setattr(DeviceManager, "memory", lambda self, device: (100 * MB, 1000 * MB))
+
+    with fresh_manager.reserve(80 * MB, device="cuda:0") as device:
+        assert device == "cuda:0"
+        assert fresh_manager.available("cuda:0") == 20 * MB
+        # the first reservation still holds most of the free memory
+        with fresh_manager.reserve(80 * MB, device="cuda:0") as second:
+            assert second == "cpu"
+    assert fresh_manager.available("cuda:0") == 100 * MB
+    assert fresh_manager.counters["allocations"] == 1
+    assert fresh_manager.counters["admission_cpu_fallbacks"] == 1
+
+
+def test_admission_does_not_wait_when_nothing_here_could_free_memory(fresh_manager, monkeypatch):
+    monkeypatch.setattr(settings, "DEVICE_ADMISSION_WAIT_SECONDS", 60.0)
+    monkeypatch.setattr(settings, "DEVICE_MEMORY_HEADROOM_MB", 0)
+    monkeypatch.setattr(DeviceManager, "memory", lambda self, device: (100 * MB, 1000 * MB))
+
+    with fresh_manager.reserve(200 * MB, device="cuda:0") as device:
+        assert device == "cpu"
+    assert fresh_manager.counters["admission_waits"] == 0
+
+
+def test_windowed_models_are_estimated_per_batch_not_per_recording(monkeypatch):
+    monkeypatch.setattr(settings, "DEVICE_ACTIVATION_FACTOR", 40)
+
+    class Specifications:
+        duration = 10.0
+
+    class Model:
+        specifications = Specifications()
+
+    # 32 ten-second windows of float32 at 16 kHz, whatever the recording's length
+    assert windowed_estimate(Model(), 32) == 10 * 16000 * 4 * 32 * 40
+
+
+def test_cpu_fallback_waits_for_other_runs_of_the_model(fresh_manager, monkeypatch):
+    monkeypatch.setattr(device_management.torch.cuda, "empty_cache", lambda: None)
+    monkeypatch.setattr(device_management, "get_safe_device", lambda refresh=False: ("cuda:0", ""))
+    monkeypatch.setattr(DeviceManager, "memory", lambda self, device: (64 * 1024 * MB, 64 * 1024 * MB))
+    model = FakeModel()
+    lock = model_use_lock(model)
+    released = threading.Event()
+
+    def other_run():
+        with lock.shared():
+            released.wait(5)
+
+    runner = threading.Thread(target=other_run)
+    runner.start()
+    def run(audio):
+        if not model.moves:
+            raise oom()
+        return "ok"
+
+    fallback = threading.Thread(target=safe_run_model, args=(run, torch.zeros(10)), kwargs={"model": model})
+    fallback.start()
+    fallback.join(0.2)
+    assert model.moves == []  # still waiting for the other run
+    released.set()
+    fallback.join(5)
+    runner.join(5)
+    assert model.moves == ["cpu", "cuda:0"]
@@ -0,0 +1,55 @@
+"""
+No-DB checks for the per-recording diarisation cache (backend/processing/diarisation_cache.py):
+model revisions in the cache keys, and least-recently-used eviction past DIARISATION_CACHE_MAX_MB.
+"""
+
+import os
+
+import numpy
+import pytest
+
+from backend.config import settings
+from backend.processing import diarisation_cache
+from backend.processing.diarisation_cache import (
+    SpeechActivity, cache_dir, features_signature, load_speech_activity, save_speech_activity, speech_signature,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_in_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+
+
+def _activity(frames: int) -> SpeechActivity:
+    return SpeechActivity(probabilities=numpy.zeros(frames, dtype=numpy.float32), start=0.0, step=0.01, duration=0.01)
+
+
+def _resolve_main(tmp_path, repo_id, commit):
+    ref = tmp_path / "hub" / f"models--{repo_id.replace('/', '--')}" / "refs" / "main"
+    ref.parent.mkdir(parents=True, exist_ok=True)
+    ref.write_text(commit)
+
+
+def test_signatures_change_with_the_downloaded_revision(tmp_path):
+    before = features_signature(1.0), speech_signature()
+    _resolve_main(tmp_path, settings.SNR_MODEL_NAME, "1111111")
+    after = features_signature(1.0), speech_signature()
+    assert before[0] != after[0] and before[1] != after[1]
+    # a different embedding model checkpoint also invalidates the segment features
+    _resolve_main(tmp_path, settings.SPEAKER_EMBEDDING_MODEL_NAME, "2222222")
+    assert features_signature(1.0) != after[0]
+
+
+def test_least_recently_used_recordings_are_evicted(monkeypatch):
+    monkeypatch.setattr(settings, "DIARISATION_CACHE_MAX_MB", 0)
+    for age, key in enumerate(["old", "used", "new"]):
+        save_speech_activity(key, "sig", _activity(100_000))  # ~400 kB each
+        os.utime(cache_dir(key), (1_000_000 + age, 1_000_000 + age))
+    # a hit makes "used" the most recently used entry
+    assert load_speech_activity("used", "sig") is not None
+
+    monkeypatch.setattr(settings, "DIARISATION_CACHE_MAX_MB", 1)
+    save_speech_activity("newest", "sig", _activity(100_000))
+    remaining = {path.name for path in diarisation_cache.cache_root().iterdir()}
+    assert remaining == {"used", "newest"}
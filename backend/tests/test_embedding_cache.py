@@ -0,0 +1,83 @@
+"""
+No-DB checks for the on-disk transcript embedding cache
+(backend/transcript_rag/embedding_cache.py) and its use by the indexer.
+"""
+
+import numpy
+
+from backend.config import settings
+from backend.transcript_rag import indexer
+from backend.transcript_rag.embedding_cache import EmbeddingCache
+
+
+def test_vectors_round_trip_per_model(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=0)
+    cache.put_many("model-a", {"Yeah.": numpy.array([0.5, 1.5], dtype=numpy.float64)})
+
+    found = cache.get_many("model-a", ["Yeah.", "Okay, thanks"])
+    assert list(found) == ["Yeah."]
+    assert found["Yeah."].dtype == numpy.float32
+    assert found["Yeah."].tolist() == [0.5, 1.5]
+    assert cache.get_many("model-b", ["Yeah."]) == {}
+
+
+def test_least_recently_used_vectors_are_evicted_past_the_limit(tmp_path, monkeypatch):
+    clock = iter(range(0, 100000, 100))  # far enough apart that every hit is recorded
+    monkeypatch.setattr("backend.transcript_rag.embedding_cache.time.time", lambda: next(clock))
+    vector = numpy.zeros(100, dtype=numpy.float32)  # 400 bytes each
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=1000)
+
+    cache.put_many("m", {"a": vector, "b": vector})
+    cache.get_many("m", ["a"])  # "b" is now the least recently used
+    cache.put_many("m", {"c": vector})
+
+    assert set(cache.get_many("m", ["a", "b", "c"])) == {"a", "c"}
+    assert cache.size_bytes() <= 1000
+
+
+def test_size_is_tracked_through_replacements_and_evictions(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=0)
+    cache.put_many("m", {"a": numpy.zeros(100, dtype=numpy.float32), "b": numpy.zeros(10, dtype=numpy.float32)})
+    cache.put_many("m", {"a": numpy.zeros(50, dtype=numpy.float32)})
+    assert cache.size_bytes() == 240
+    cache.close()
+
+    # reopening keeps the running total rather than recounting
+    assert EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=0).size_bytes() == 240
+
+
+def test_repeated_hits_within_a_minute_do_not_write(tmp_path, monkeypatch):
+    clock = iter([0.0, 10.0, 20.0, 90.0])
+    monkeypatch.setattr("backend.transcript_rag.embedding_cache.time.time", lambda: next(clock))
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=0)
+    cache.put_many("m", {"a": numpy.zeros(4, dtype=numpy.float32)})
+    last_used = lambda: cache._conn.execute("SELECT last_used FROM embeddings").fetchone()[0]
+
+    cache.get_many("m", ["a"])
+    cache.get_many("m", ["a"])
+    assert last_used() == 0.0
+    cache.get_many("m", ["a"])
+    assert last_used() == 90.0
+
+
+def test_indexer_encodes_each_uncached_text_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPT_CHROMA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "TRANSCRIPT_EMBEDDING_CACHE_MB", 1)
+    indexer._get_embedding_cache.cache_clear()
+    encoded = []
+
+    class Model:
+        def encode(self, texts, **kwargs):
+            encoded.extend(texts)
+            return numpy.array([[float(len(t)), 1.0] for t in texts], dtype=numpy.float32)
+
+    monkeypatch.setattr(indexer, "_get_embedding_model", lambda: Model())
+    try:
+        first = indexer._embed_texts(["Yeah.", "Agenda", "Yeah."])
+        second = indexer._embed_texts(["Agenda", "Next steps"])
+    finally:
+        indexer._get_embedding_cache.cache_clear()
+
+    assert encoded == ["Yeah.", "Agenda", "Next steps"]
+    assert first == [[5.0, 1.0], [6.0, 1.0], [5.0, 1.0]]
+    assert second == [[6.0, 1.0], [10.0, 1.0]]
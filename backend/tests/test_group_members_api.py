@@ -68,3 +68,127 @@ def test_upload_member_embedding_rejects_bad_extension(client, make_user, make_g
         headers=headers,
     )
     assert response.status_code == 400
+
+
+def test_bulk_enrolment_queues_one_job_for_all_files(client, db_session, make_user, make_group, make_member, auth_header_for):
+    from backend.models import JobKind, ProcessingJob
+
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    bob = make_member(name="Bob", group=group)
+    carol = make_member(name="Carol", group=group)
+    headers = auth_header_for(owner.id)
+
+    response = client.post(
+        f"/groups/{group.id}/members/embeddings",
+        files=[
+            ("files", ("bob.wav", b"RIFF", "audio/wav")),
+            ("files", ("carol.wav", b"RIFF", "audio/wav")),
+        ],
+        data={"member_ids": [str(bob.id), str(carol.id)]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["member_ids"] == [bob.id, carol.id]
+    assert len(body["sample_ids"]) == 2
+
+    job = db_session.query(ProcessingJob).get(body["job_id"])
+    assert job.kind == JobKind.ENROLMENT
+    assert job.params == {"sample_ids": body["sample_ids"]}
+
+    status = client.get(body["status_check_url"], headers=headers)
+    assert status.status_code == 200
+    assert status.json()["status"] == "queued"
+
+
+def test_bulk_enrolment_needs_one_member_id_per_file(client, make_user, make_group, make_member, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    bob = make_member(name="Bob", group=group)
+    headers = auth_header_for(owner.id)
+
+    response = client.post(
+        f"/groups/{group.id}/members/embeddings",
+        files=[
+            ("files", ("bob.wav", b"RIFF", "audio/wav")),
+            ("files", ("other.wav", b"RIFF", "audio/wav")),
+        ],
+        data={"member_ids": [str(bob.id)]},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_bulk_re_enrolment_without_audio_is_rejected(client, make_user, make_group, make_member, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    make_member(name="Bob", group=group)
+    headers = auth_header_for(owner.id)
+
+    response = client.post(f"/groups/{group.id}/members/embeddings", headers=headers)
+    assert response.status_code == 400
+
+
+def test_uploads_add_voice_samples_instead_of_replacing(client, make_user, make_group, make_member, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    member = make_member(name="Bob", group=group)
+    headers = auth_header_for(owner.id)
+
+    for name in ("first.wav", "second.wav"):
+        response = client.post(
+            f"/groups/{group.id}/members/{member.id}/embedding",
+            files={"file": (name, b"RIFF", "audio/wav")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    samples = client.get(f"/groups/{group.id}/members/{member.id}/samples", headers=headers).json()
+    assert [s["source"] for s in samples] == ["upload", "upload"]
+
+    response = client.delete(f"/groups/{group.id}/members/{member.id}/samples/{samples[0]['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["embedding_audio_path"] == samples[1]["audio_path"]
+    assert len(client.get(f"/groups/{group.id}/members/{member.id}/samples", headers=headers).json()) == 1
+
+
+def test_similar_voices_are_found_across_groups(client, db_session, make_user, make_group, make_member, auth_header_for):
+    owner = make_user(username="owner")
+    cohort_a = make_group(name="Cohort A", owner=owner)
+    cohort_b = make_group(name="Cohort B", owner=owner)
+    bob = make_member(name="Bob", group=cohort_a)
+    bob_again = make_member(name="Robert", group=cohort_b)
+    carol = make_member(name="Carol", group=cohort_b)
+    for member, vector in ((bob, [1.0, 0.0, 0.0]), (bob_again, [0.9, 0.1, 0.0]), (carol, [0.0, 0.0, 1.0])):
+        member.embedding = vector
+        member.embedding_model = "test-model"
+    db_session.commit()
+    headers = auth_header_for(owner.id)
+
+    response = client.get(f"/groups/{cohort_a.id}/members/{bob.id}/similar?limit=2", headers=headers)
+    assert response.status_code == 200
+    matches = response.json()
+    assert [m["member_id"] for m in matches] == [bob_again.id, carol.id]
+    assert matches[0]["group_ids"] == [cohort_b.id]
+    assert matches[0]["similarity"] > 0.99
+
+
+def test_similar_voices_stay_within_the_callers_groups(client, db_session, make_user, make_group, make_member, auth_header_for):
+    owner = make_user(username="owner")
+    stranger = make_user(username="stranger")
+    cohort = make_group(name="Cohort", owner=owner)
+    elsewhere = make_group(name="Elsewhere", owner=stranger)
+    bob = make_member(name="Bob", group=cohort)
+    other_bob = make_member(name="Other Bob", group=elsewhere)
+    for member in (bob, other_bob):
+        member.embedding = [1.0, 0.0, 0.0]
+        member.embedding_model = "test-model"
+    db_session.commit()
+
+    response = client.get(f"/groups/{cohort.id}/members/{bob.id}/similar", headers=auth_header_for(owner.id))
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.get(f"/groups/{cohort.id}/members/{bob.id}/similar", headers=auth_header_for(stranger.id))
+    assert response.status_code == 403
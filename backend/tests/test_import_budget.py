@@ -0,0 +1,64 @@
+"""
+No-DB checks that the API imports without the ML stack and within a time budget.
+
+`import backend.main` runs in a fresh interpreter, so nothing this test process
+has already imported can hide a regression. The budget defaults to
+IMPORT_BUDGET_SECONDS and can be overridden with API_IMPORT_BUDGET_SECONDS on
+slow machines; the best of a few runs is compared with it, to ride out noise.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+IMPORT_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = (
+    "torch", "torchaudio", "whisper", "pyannote.audio", "sklearn", "chromadb", "sentence_transformers",
+)
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+# what the load balancer polls must not pull the ML stack in either
+from backend.routes.status import check_model_status
+check_model_status()
+after_status = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy, "heavy_after_status": after_status}}))
+"""
+
+
+def _import_backend_main(tmp_path) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "POSTGRES_DB": "db", "POSTGRES_USER": "user", "POSTGRES_PASSWORD": "pass",
+        "POSTGRES_HOST": "localhost", "POSTGRES_PORT": "5432",
+        "PGADMIN_DEFAULT_EMAIL": "test@example.com", "PGADMIN_DEFAULT_PASSWORD": "pass",
+        "SECRET_KEY": "test-secret-key", "HUGGING_FACE_TOKEN": "test-dummy-token",
+        "UPLOAD_DIR": str(tmp_path / "uploads"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_api_import_does_not_load_the_ml_stack(tmp_path):
+    assert _import_backend_main(tmp_path)["heavy"] == []
+
+
+def test_model_status_does_not_load_the_ml_stack(tmp_path):
+    assert _import_backend_main(tmp_path)["heavy_after_status"] == []
+
+
+def test_api_import_fits_the_time_budget(tmp_path):
+    budget = float(os.environ.get("API_IMPORT_BUDGET_SECONDS", IMPORT_BUDGET_SECONDS))
+    best = min(_import_backend_main(tmp_path)["seconds"] for _ in range(3))
+    assert best <= budget, f"import backend.main took {best:.2f}s (budget {budget:.2f}s)"
@@ -0,0 +1,39 @@
+"""
+Checks for how the job queue (backend/worker.py) treats jobs whose worker died mid-run.
+"""
+
+from datetime import datetime, timedelta
+
+from backend.models import JobKind, JobStatus, ProcessingJob
+from backend.worker import requeue_stale_jobs
+
+
+def _running_job(db_session, meeting, attempts, max_attempts=3):
+    job = ProcessingJob(
+        kind=JobKind.TRANSCRIPTION, status=JobStatus.RUNNING, group_id=meeting.group_id, meeting_id=meeting.id,
+        attempts=attempts, max_attempts=max_attempts, worker_id="host:1",
+        heartbeat_at=datetime.now() - timedelta(days=1),
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def test_lost_run_is_retried_after_a_backoff(db_session, make_group, make_meeting):
+    job = _running_job(db_session, make_meeting(make_group()), attempts=1)
+
+    assert requeue_stale_jobs(db_session) == 1
+    db_session.refresh(job)
+    assert job.status == JobStatus.QUEUED
+    assert job.worker_id is None
+    assert job.run_after > job.created  # pushed back by the retry delay
+    assert "Lost its worker" in job.error
+
+
+def test_job_that_keeps_killing_workers_fails_at_max_attempts(db_session, make_group, make_meeting):
+    job = _running_job(db_session, make_meeting(make_group()), attempts=3)
+
+    requeue_stale_jobs(db_session)
+    db_session.refresh(job)
+    assert job.status == JobStatus.FAILED
+    assert job.finished is not None
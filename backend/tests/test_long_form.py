@@ -0,0 +1,57 @@
+"""
+No-DB checks for window planning and cross-window speaker stitching in
+long-form diarisation (backend/processing/long_form.py).
+"""
+
+import numpy
+import pytest
+
+pytest.importorskip("pyannote.core")
+
+from backend.processing.long_form import SpeakerStitcher, plan_windows
+
+
+def test_short_recording_is_one_window():
+    windows = plan_windows(100.0, window_seconds=600.0, overlap_seconds=30.0)
+    assert [(w.start, w.end, w.keep_start, w.keep_end) for w in windows] == [(0.0, 100.0, 0.0, 100.0)]
+
+
+def test_windows_overlap_and_kept_parts_tile_the_recording():
+    windows = plan_windows(2500.0, window_seconds=1000.0, overlap_seconds=100.0)
+    assert windows[0].start == 0.0 and windows[-1].end == 2500.0
+    for previous, current in zip(windows, windows[1:]):
+        assert current.start < previous.end  # overlapping audio
+        assert previous.keep_end == current.keep_start  # no gaps or double counting
+        assert current.start <= current.keep_start <= previous.end
+    assert all(w.end - w.start <= 1000.0 for w in windows)
+
+
+def test_stitcher_reuses_matching_speakers_across_windows():
+    stitcher = SpeakerStitcher(threshold=0.8)
+    first = stitcher.assign({"A": numpy.array([1.0, 0.0]), "B": numpy.array([0.0, 1.0])}, {"A": 10, "B": 10})
+    # local labels in the next window are arbitrary - they are matched by embedding
+    second = stitcher.assign({"SPEAKER_00": numpy.array([0.1, 1.0]), "SPEAKER_01": numpy.array([1.0, 0.05])},
+                             {"SPEAKER_00": 5, "SPEAKER_01": 5})
+    assert second == {"SPEAKER_00": first["B"], "SPEAKER_01": first["A"]}
+
+
+def test_stitcher_adds_new_speaker_below_threshold_until_capacity():
+    stitcher = SpeakerStitcher(threshold=0.9, max_speakers=2)
+    stitcher.assign({"A": numpy.array([1.0, 0.0])}, {"A": 10})
+    stitcher.assign({"A": numpy.array([0.0, 1.0])}, {"A": 10})
+    assert len(stitcher.centroids) == 2
+    # capacity reached: an unfamiliar voice is folded into the closest existing speaker
+    mapping = stitcher.assign({"A": numpy.array([0.9, 0.5])}, {"A": 10})
+    assert len(stitcher.centroids) == 2
+    assert mapping == {"A": "SPEAKER_00"}
+
+
+def test_stitcher_keeps_a_strong_match_over_a_weak_total():
+    stitcher = SpeakerStitcher(threshold=0.7)
+    stitcher.assign({"X": numpy.array([1.0, 0.0, 0.0]), "Y": numpy.array([0.0, 1.0, 0.0])}, {"X": 10, "Y": 10})
+    # "A" clearly is X; "B" is closer to X than to Y but below threshold against Y
+    mapping = stitcher.assign(
+        {"A": numpy.array([0.95, 0.3, 0.0]), "B": numpy.array([0.75, 0.0, 0.66])}, {"A": 5, "B": 5}
+    )
+    assert mapping["A"] == "SPEAKER_00"
+    assert mapping["B"] == "SPEAKER_02"
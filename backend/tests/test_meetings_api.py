@@ -100,3 +100,39 @@ def test_transcribe_requires_uploaded_audio(client, make_user, make_group, make_
         f"/groups/{group.id}/meetings/{meeting.id}/transcribe", headers=auth_header_for(owner.id)
     )
     assert response.status_code == 400
+
+
+def test_transcribe_queues_job_and_reports_status(
+        client, db_session, make_user, make_group, make_meeting, auth_header_for):
+    from backend.models import RawFile, RawFileType
+
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    meeting = make_meeting(group)
+    headers = auth_header_for(owner.id)
+    db_session.add(RawFile(file_name="a.wav", human_name="a.wav", meeting_id=meeting.id, type=RawFileType.AUDIO))
+    db_session.commit()
+
+    response = client.post(f"/groups/{group.id}/meetings/{meeting.id}/transcribe", headers=headers)
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    status_response = client.get(response.json()["status_check_url"], headers=headers)
+    assert status_response.status_code == 200
+    assert status_response.json()["id"] == job_id
+    assert status_response.json()["status"] == "queued"
+
+    # A second submission while the first is still queued is rejected
+    duplicate = client.post(f"/groups/{group.id}/meetings/{meeting.id}/transcribe", headers=headers)
+    assert duplicate.status_code == 409
+
+
+def test_transcription_status_not_found_without_job(client, make_user, make_group, make_meeting, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    meeting = make_meeting(group)
+
+    response = client.get(
+        f"/groups/{group.id}/meetings/{meeting.id}/transcription/status", headers=auth_header_for(owner.id)
+    )
+    assert response.status_code == 404
@@ -0,0 +1,88 @@
+"""
+No-DB checks that model availability comes from the download caches and the
+model registry, without loading anything (backend/processing/model_availability.py).
+"""
+
+import pytest
+
+from backend.config import settings
+from backend.processing import model_availability
+from backend.processing.model_availability import CACHED, LOADED, MISSING, ModelAvailability, check_models
+
+
+@pytest.fixture(autouse=True)
+def no_profiles(monkeypatch):
+    # the profile lookup needs the database; these checks supply profiles where they need them
+    monkeypatch.setattr(model_availability, "_profile_whisper_models", lambda: [])
+
+
+def _cache_hf_repo(hub_dir, repo_id):
+    snapshot = hub_dir / f"models--{repo_id.replace('/', '--')}" / "snapshots" / "abc123"
+    snapshot.mkdir(parents=True)
+    (snapshot / "config.yaml").write_text("")
+
+
+def test_models_are_found_in_the_download_caches(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+    (tmp_path / "xdg" / "whisper").mkdir(parents=True)
+    (tmp_path / "xdg" / "whisper" / f"{settings.WHISPER_MODEL_NAME}.pt").write_bytes(b"")
+    _cache_hf_repo(tmp_path / "hub", settings.DIARISATION_PIPELINE_NAME)
+
+    models = check_models()
+    assert models["whisper_model"]["state"] == CACHED
+    assert models["pyannote_diarization"]["state"] == CACHED
+    assert models["pyannote_embedding"]["state"] == MISSING
+    assert models["pyannote_embedding"]["available"] is False
+
+
+def test_empty_snapshot_directory_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+    repo_dir = tmp_path / "hub" / f"models--{settings.SNR_MODEL_NAME.replace('/', '--')}"
+    (repo_dir / "snapshots" / "abc123").mkdir(parents=True)
+    assert model_availability.hf_repo_is_cached(settings.SNR_MODEL_NAME) is False
+
+    (repo_dir / "snapshots" / "abc123" / "config.yaml").write_text("")
+    assert model_availability.hf_repo_is_cached(settings.SNR_MODEL_NAME) is True
+
+
+def test_resident_models_count_as_loaded(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+    monkeypatch.setattr(model_availability, "_loaded_keys", lambda: {"snr"})
+    assert check_models()["pyannote_snr"]["state"] == LOADED
+
+
+def test_snapshot_is_reused_until_refreshed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(model_availability, "check_models", lambda: calls.append(1) or {"m": {"available": True}})
+    availability = ModelAvailability(ttl_seconds=3600)
+
+    assert availability.all_available()
+    availability.snapshot()
+    assert len(calls) == 1
+    availability.refresh()
+    assert len(calls) == 2
+
+
+def test_only_models_this_deployment_loads_are_required(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+    monkeypatch.setattr(settings, "SPEAKER_EMBEDDING_SOURCE", "pipeline")
+    monkeypatch.setattr(settings, "SPEECH_ACTIVITY_GATING", False)
+    monkeypatch.setattr(model_availability, "_profile_whisper_models", lambda: ["base.en"])
+    (tmp_path / "xdg" / "whisper").mkdir(parents=True)
+    (tmp_path / "xdg" / "whisper" / f"{settings.WHISPER_MODEL_NAME}.pt").write_bytes(b"")
+    _cache_hf_repo(tmp_path / "hub", settings.DIARISATION_PIPELINE_NAME)
+
+    models = check_models()
+    assert models["pyannote_embedding"]["required"] is False
+    assert models["pyannote_snr"]["required"] is False
+    # a profile's checkpoint is required, and missing
+    assert models["whisper_model:base.en"]["required"] is True
+    assert models["whisper_model:base.en"]["state"] == MISSING
+
+    availability = ModelAvailability(ttl_seconds=3600)
+    assert not availability.all_available()
+    (tmp_path / "xdg" / "whisper" / "base.en.pt").write_bytes(b"")
+    availability.refresh()
+    assert availability.all_available()
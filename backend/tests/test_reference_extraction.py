@@ -0,0 +1,44 @@
+"""
+No-DB checks for how reference segments are selected and grouped into padded
+mini-batches (backend/processing/reference_extraction.py). The model passes
+themselves need real pyannote/brouhaha weights and are not exercised here.
+"""
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("pyannote.core")
+
+from pyannote.core import Segment
+
+from backend.processing.reference_extraction import collect_candidates, make_batches
+
+
+def test_short_segments_skipped_unless_only_one():
+    segments_by_speaker = {
+        "A": [Segment(0, 2), Segment(3, 10)],
+        "B": [Segment(10, 11)],
+    }
+    candidates = collect_candidates(segments_by_speaker, min_segment_duration=5.0)
+    assert [(c.speaker, c.start, c.end) for c in candidates] == [("A", 3, 10), ("B", 10, 11)]
+
+
+def test_batches_are_length_sorted_and_capped_by_count():
+    lengths = [50, 10, 40, 20, 30]
+    assert make_batches(lengths, batch_size=2, max_batch_samples=1000) == [[1, 3], [4, 2], [0]]
+
+
+def test_batches_respect_padded_sample_budget():
+    lengths = [10, 10, 100]
+    # three items padded to 100 would be 300 samples; the long one goes on its own
+    assert make_batches(lengths, batch_size=8, max_batch_samples=150) == [[0, 1], [2]]
+
+
+def test_single_item_over_budget_still_gets_a_batch():
+    assert make_batches([500], batch_size=8, max_batch_samples=100) == [[0]]
+
+
+def test_batches_only_group_near_equal_lengths():
+    lengths = [100, 105, 109, 112, 300]
+    # 112 is more than 10% longer than 100, so it starts a batch of its own
+    assert make_batches(lengths, batch_size=8, max_batch_samples=10000, max_padding=0.1) == [[0, 1, 2], [3], [4]]
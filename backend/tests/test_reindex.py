@@ -0,0 +1,55 @@
+"""
+No-DB checks for the transcript rebuild (backend/transcript_rag/reindex.py) and the
+collection aliases it swaps (backend/transcript_rag/indexer.py).
+"""
+
+import pytest
+
+from backend.config import settings
+from backend.transcript_rag import indexer, reindex
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+        self.adds = []
+
+    def add(self, ids, documents, metadatas, embeddings):
+        assert len(ids) == len(documents) == len(metadatas) == len(embeddings)
+        self.adds.append(list(ids))
+
+
+@pytest.fixture
+def chroma_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPT_CHROMA_DIR", tmp_path)
+    return tmp_path
+
+
+def test_names_resolve_to_themselves_until_swapped(chroma_dir):
+    assert indexer.resolve_collection("team_a_transcripts") == "team_a_transcripts"
+
+    previous = indexer.swap_aliases({"team_a_transcripts": "team_a_transcripts_v1"})
+    assert previous == {"team_a_transcripts": "team_a_transcripts"}
+    assert indexer.resolve_collection("team_a_transcripts") == "team_a_transcripts_v1"
+
+    previous = indexer.swap_aliases({"team_a_transcripts": "team_a_transcripts_v2"})
+    assert previous == {"team_a_transcripts": "team_a_transcripts_v1"}
+    assert indexer.resolve_collection("team_a_transcripts") == "team_a_transcripts_v2"
+    assert not list(chroma_dir.glob("*.tmp"))
+
+
+def test_writer_embeds_full_batches_across_meetings_and_collections(monkeypatch):
+    batches = []
+    monkeypatch.setattr(reindex, "_embed_texts", lambda texts: batches.append(len(texts)) or [[0.0]] * len(texts))
+    team_a, team_b = FakeCollection("a"), FakeCollection("b")
+    writer = reindex.ChunkWriter(batch_size=4)
+
+    writer.add(team_a, [{"chunk_id": f"1_{i}", "text": f"a{i}"} for i in range(3)])
+    assert batches == []
+    writer.add(team_b, [{"chunk_id": f"2_{i}", "text": f"b{i}"} for i in range(3)])
+    writer.flush()
+
+    assert batches == [4, 2]
+    assert team_a.adds == [["1_0", "1_1", "1_2"]]
+    assert team_b.adds == [["2_0"], ["2_1", "2_2"]]
+    assert writer.written == 6
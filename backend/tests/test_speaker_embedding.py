@@ -0,0 +1,47 @@
+"""
+No-DB checks for choosing and tagging the speaker-embedding model
+(backend/processing/speaker_embedding.py).
+"""
+
+from types import SimpleNamespace
+
+import numpy
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("pyannote.core")
+
+from pyannote.core import Annotation, Segment
+
+from backend.config import settings
+from backend.processing import speaker_embedding
+
+
+def test_active_model_follows_source(monkeypatch):
+    monkeypatch.setattr(settings, "SPEAKER_EMBEDDING_SOURCE", "segments")
+    assert speaker_embedding.active_embedding_model_name() == settings.SPEAKER_EMBEDDING_MODEL_NAME
+    monkeypatch.setattr(settings, "SPEAKER_EMBEDDING_SOURCE", "pipeline")
+    assert speaker_embedding.active_embedding_model_name() == f"{settings.DIARISATION_PIPELINE_NAME}#embedding"
+
+
+def test_unknown_source_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "SPEAKER_EMBEDDING_SOURCE", "bogus")
+    with pytest.raises(ValueError):
+        speaker_embedding.embedding_source()
+
+
+def test_members_without_a_recorded_model_are_legacy():
+    legacy = SimpleNamespace(embedding=[0.1, 0.2], embedding_model=None)
+    unenrolled = SimpleNamespace(embedding=None, embedding_model=None)
+    assert speaker_embedding.member_embedding_model(legacy) == speaker_embedding.LEGACY_EMBEDDING_MODEL
+    assert speaker_embedding.member_embedding_model(unenrolled) is None
+
+
+def test_pipeline_centroids_follow_labels_and_drop_nan_rows():
+    diarisation = Annotation()
+    diarisation[Segment(0, 1)] = "SPEAKER_00"
+    diarisation[Segment(1, 2)] = "SPEAKER_01"
+    embeddings = numpy.array([[3.0, 4.0], [numpy.nan, numpy.nan]])
+    centroids = speaker_embedding.pipeline_centroids(diarisation, embeddings)
+    assert list(centroids) == ["SPEAKER_00"]
+    numpy.testing.assert_allclose(centroids["SPEAKER_00"], [0.6, 0.8])
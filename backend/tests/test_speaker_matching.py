@@ -0,0 +1,44 @@
+"""
+No-DB checks for the one-to-one speaker/attendee assignment
+(backend/processing/speaker_matching.py).
+"""
+
+import numpy
+
+from backend.processing.speaker_matching import assign_above_threshold, match_speakers, similarity_matrix
+
+
+def _attendee(id, name, embedding):
+    return {"id": id, "name": name, "embedding": numpy.asarray(embedding, dtype=numpy.float32)}
+
+
+def test_similarity_matrix_is_cosine():
+    sims = similarity_matrix(numpy.array([[2.0, 0.0], [1.0, 1.0]]), numpy.array([[1.0, 0.0], [0.0, 3.0]]))
+    numpy.testing.assert_allclose(sims, [[1.0, 0.0], [0.7071068, 0.7071068]], atol=1e-6)
+
+
+def test_two_speakers_never_share_an_attendee():
+    # Both speakers are closest to Alice; greedy matching would label both as her
+    centroids = {"SPEAKER_00": [1.0, 0.1], "SPEAKER_01": [1.0, 0.4]}
+    attendees = [_attendee(1, "Alice", [1.0, 0.0]), _attendee(2, "Bob", [0.6, 0.8])]
+    matches = match_speakers(centroids, attendees, threshold=0.5)
+    assert {s: m.name for s, m in matches.items()} == {"SPEAKER_00": "Alice", "SPEAKER_01": "Bob"}
+
+
+def test_pairs_below_threshold_are_left_unmatched():
+    centroids = {"SPEAKER_00": [1.0, 0.0], "SPEAKER_01": [0.0, 1.0]}
+    attendees = [_attendee(1, "Alice", [1.0, 0.0])]
+    matches = match_speakers(centroids, attendees, threshold=0.7)
+    assert list(matches) == ["SPEAKER_00"]
+    assert matches["SPEAKER_00"].attendee_id == 1
+
+
+def test_a_weak_pair_never_displaces_a_strong_one():
+    # A-X 0.95, A-Y 0.3, B-X 0.75, B-Y 0.0: maximising raw totals would pick A-Y + B-X (1.05)
+    # and, after thresholding, leave A unmatched
+    similarities = numpy.array([[0.95, 0.3], [0.75, 0.0]])
+    assert assign_above_threshold(similarities, threshold=0.7) == [(0, 0)]
+
+
+def test_no_attendee_embeddings_matches_nothing():
+    assert match_speakers({"SPEAKER_00": [1.0, 0.0]}, [], threshold=0.0) == {}
@@ -0,0 +1,73 @@
+"""
+No-DB checks for speech-activity gating of turns before Whisper
+(backend/processing/speech_activity.py); frame probabilities are made up, no model runs.
+"""
+
+from dataclasses import dataclass
+
+import numpy
+import pytest
+
+from backend.config import settings
+from backend.processing.diarisation_cache import SpeechActivity
+from backend.processing.speech_activity import gate_turns, regroup_texts, speech_regions
+
+
+@dataclass
+class Turn:
+    start: float
+    end: float
+    speaker: str
+
+
+def activity(*speech: tuple[float, float], seconds: float = 20.0, step: float = 0.01) -> SpeechActivity:
+    """Frames of `step` seconds, speech (probability 0.9) inside the given spans."""
+    centres = numpy.arange(int(seconds / step)) * step + step / 2
+    probabilities = numpy.full(len(centres), 0.05, dtype=numpy.float32)
+    for start, end in speech:
+        probabilities[(centres >= start) & (centres < end)] = 0.9
+    return SpeechActivity(probabilities=probabilities, start=0.0, step=step, duration=step)
+
+
+@pytest.fixture(autouse=True)
+def gating_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SPEECH_ACTIVITY_THRESHOLD", 0.5)
+    monkeypatch.setattr(settings, "SPEECH_ACTIVITY_PADDING_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "SPEECH_ACTIVITY_MERGE_GAP_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "SPEECH_ACTIVITY_MIN_SECONDS", 0.3)
+
+
+def test_speech_regions_follow_frames_above_threshold():
+    regions = speech_regions(activity((1.0, 2.0), (5.0, 5.5)), 0.5)
+    assert regions == pytest.approx(numpy.array([[1.0, 2.0], [5.0, 5.5]]), abs=0.011)
+
+
+def test_leading_and_trailing_silence_is_trimmed():
+    gated = gate_turns([Turn(0.0, 6.0, "A")], activity((2.0, 4.0)))
+    assert [(p.start, p.end, p.speaker) for p in gated.pieces] == [
+        pytest.approx((2.0, 4.0, "A"), abs=0.011)
+    ]
+    assert gated.speech_seconds == pytest.approx(2.0, abs=0.02)
+    assert gated.input_seconds == pytest.approx(6.0)
+
+
+def test_micro_gaps_merge_and_long_gaps_split():
+    gated = gate_turns([Turn(0.0, 10.0, "A")], activity((1.0, 2.0), (2.3, 3.0), (6.0, 7.0)))
+    assert [(round(p.start, 1), round(p.end, 1)) for p in gated.pieces] == [(1.0, 3.0), (6.0, 7.0)]
+    assert gated.owners == [0, 0]
+
+
+def test_short_fragments_and_silent_turns_are_dropped():
+    turns = [Turn(0.0, 2.0, "A"), Turn(2.0, 4.0, "B"), Turn(4.0, 8.0, "A")]
+    gated = gate_turns(turns, activity((0.5, 0.6), (5.0, 7.0)))
+    assert gated.owners == [2]
+    assert gated.dropped == 1
+
+
+def test_regrouped_texts_cover_every_turn_in_order():
+    turns = [Turn(0.0, 2.0, "A"), Turn(2.0, 4.0, "B"), Turn(4.0, 10.0, "A"), Turn(10.0, 12.0, "B")]
+    gated = gate_turns(turns, activity((0.5, 1.5), (4.5, 5.5), (8.0, 9.0)))
+    assert gated.owners == [0, 2, 2]
+
+    decoded = regroup_texts(iter([(0, "hello"), (1, "so"), (2, "anyway")]), gated)
+    assert list(decoded) == [(0, "hello"), (1, ""), (2, "so anyway"), (3, "")]
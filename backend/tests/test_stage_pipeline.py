@@ -0,0 +1,70 @@
+"""
+No-DB checks for the stage-parallel executor (backend/processing/stage_pipeline.py).
+"""
+
+import threading
+
+from backend.processing.stage_pipeline import Stage, StagePipeline
+
+
+class Item:
+    def __init__(self, n):
+        self.n = n
+        self.trace = []
+        self.skipped = False
+
+
+def _run(stages, items, skip=None):
+    done, failed = [], []
+    finished = threading.Semaphore(0)
+
+    def on_done(item):
+        done.append(item)
+        finished.release()
+
+    def on_error(item, error):
+        failed.append((item, error))
+        finished.release()
+
+    pipeline = StagePipeline(stages, on_done=on_done, on_error=on_error, skip=skip)
+    pipeline.start()
+    for item in items:
+        pipeline.submit(item)
+    for _ in items:
+        assert finished.acquire(timeout=5)
+    snapshot = pipeline.snapshot()
+    pipeline.stop()
+    return done, failed, snapshot
+
+
+def test_items_pass_through_every_stage_in_order():
+    stages = [Stage(name, lambda item, name=name: item.trace.append(name), workers=2) for name in ("a", "b", "c")]
+    done, failed, snapshot = _run(stages, [Item(i) for i in range(10)])
+    assert not failed
+    assert sorted(item.n for item in done) == list(range(10))
+    assert all(item.trace == ["a", "b", "c"] for item in done)
+    assert snapshot["c"]["completed"] == 10 and snapshot["a"]["queue_capacity"] == 1
+
+
+def test_failing_stage_reports_error_and_stops_that_item():
+    def explode(item):
+        if item.n == 1:
+            raise RuntimeError("boom")
+        item.trace.append("b")
+
+    stages = [Stage("a", lambda item: item.trace.append("a")), Stage("b", explode), Stage("c", lambda item: item.trace.append("c"))]
+    done, failed, snapshot = _run(stages, [Item(0), Item(1), Item(2)])
+    assert [item.n for item, _ in failed] == [1]
+    assert failed[0][0].trace == ["a"]
+    assert sorted(item.n for item in done) == [0, 2]
+    assert snapshot["b"]["failed"] == 1
+
+
+def test_skipped_items_leave_early():
+    def first(item):
+        item.trace.append("a")
+        item.skipped = item.n == 0
+
+    stages = [Stage("a", first), Stage("b", lambda item: item.trace.append("b"))]
+    done, _, _ = _run(stages, [Item(0), Item(1)], skip=lambda item: item.skipped)
+    assert {item.n: item.trace for item in done} == {0: ["a"], 1: ["a", "b"]}
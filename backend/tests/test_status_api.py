@@ -1,8 +1,8 @@
 """
-Smoke tests for the root/status/gpu-status endpoints. The real model-loading
-checks inside `check_model_status()` (whisper/pyannote actually loading) are
-covered separately under `backend/tests/integration/`, since they need the
-full ML stack and a working Hugging Face token.
+Smoke tests for the root/status/gpu-status endpoints. `/status` only reads the
+model availability snapshot (backend/processing/model_availability.py); real
+model loading is covered separately under `backend/tests/integration/`, since
+it needs the full ML stack and a working Hugging Face token.
 """
 
 
@@ -32,3 +32,29 @@ def test_gpu_status_reports_shape(client):
     else:
         assert body.get("cuda_available") is False
         assert "message" in body
+
+
+def test_liveness_needs_nothing_but_the_process(client):
+    response = client.get("/status/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness_reports_database_and_model_snapshot(client):
+    response = client.get("/status/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"] == "connected"
+    assert "models_ready" in body
+
+
+def test_readiness_can_require_models(client, monkeypatch):
+    from backend.config import settings
+    from backend.processing.model_availability import model_availability
+
+    monkeypatch.setattr(settings, "READINESS_REQUIRES_MODELS", True)
+    monkeypatch.setattr(model_availability, "all_available", lambda: False)
+    response = client.get("/status/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not ready"
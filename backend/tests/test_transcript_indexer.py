@@ -0,0 +1,138 @@
+"""
+No-DB checks for incremental transcript indexing (backend/transcript_rag/indexer.py):
+a dict-backed stand-in replaces the Chroma collection and embedding is counted, not run.
+"""
+
+from datetime import date
+
+import pytest
+
+from backend.config import settings
+from backend.transcript_rag import indexer
+
+VTT = """WEBVTT
+
+1
+00:00:00.000 --> 00:00:04.000
+Alice: We should ship the release on Friday.
+
+2
+00:00:04.000 --> 00:00:08.000
+Bob: Friday works if the migration is merged.
+
+3
+00:00:08.000 --> 00:00:12.000
+Alice: I'll review it this afternoon.
+"""
+
+
+class FakeCollection:
+    name = "team_a_transcripts"
+
+    def __init__(self):
+        self.items = {}
+
+    def get(self, where=None, include=None):
+        ids = [i for i, (_, meta) in self.items.items() if all(meta.get(k) == v for k, v in (where or {}).items())]
+        return {"ids": ids, "metadatas": [self.items[i][1] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        assert len(embeddings) == len(ids)
+        for chunk_id, document, metadata in zip(ids, documents, metadatas):
+            self.items[chunk_id] = (document, metadata)
+
+    def update(self, ids, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.items[chunk_id] = (self.items[chunk_id][0], metadata)
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            del self.items[chunk_id]
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.last_query = {"n_results": n_results, "where": where}
+        metadatas = [meta for _, meta in self.items.values()][:n_results]
+        return {"metadatas": [metadatas], "distances": [[0.1 * i for i in range(len(metadatas))]]}
+
+
+class FakeClient:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_collection(self, name):
+        return self.collection
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    collection = FakeCollection()
+    embedded = []
+    monkeypatch.setattr(settings, "_embedding_dir", tmp_path / "embeddings")
+    monkeypatch.setattr(indexer, "_get_chroma_client", lambda: FakeClient(collection))
+    monkeypatch.setattr(indexer, "_embed_texts", lambda texts: embedded.extend(texts) or [[0.0]] * len(texts))
+
+    def run(text):
+        vtt_path = tmp_path / "meeting.vtt"
+        vtt_path.write_text(text, encoding="utf-8")
+        embedded.clear()
+        summary = indexer.index_transcript(1, "Team A", 7, vtt_path, "Team A", "2025-01-01")
+        return summary["index_changes"], list(embedded)
+
+    run.collection = collection
+    return run
+
+
+def test_reindexing_an_unchanged_transcript_embeds_nothing(index):
+    counts, embedded = index(VTT)
+    assert counts["added"] == 3 and len(embedded) == 3
+
+    counts, embedded = index(VTT)
+    assert counts == {"added": 0, "removed": 0, "updated": 0, "unchanged": 3}
+    assert embedded == []
+    assert len(index.collection.items) == 3
+
+
+def test_an_edit_re_embeds_only_the_edited_chunk(index):
+    index(VTT)
+    counts, embedded = index(VTT.replace("this afternoon", "tomorrow morning"))
+
+    assert embedded == ["I'll review it tomorrow morning."]
+    assert (counts["added"], counts["removed"]) == (1, 1)
+    # the chunk before it now links to a different next chunk, so its metadata is refreshed
+    assert counts["updated"] == 1
+    assert len(index.collection.items) == 3
+
+
+def test_chunks_indexed_without_a_manifest_are_replaced_not_duplicated(index):
+    index.collection.items["7_00000_deadbeef"] = ("stale", {"meeting_id": "7", "text": "stale"})
+    counts, _ = index(VTT)
+
+    assert counts["removed"] == 1
+    assert "7_00000_deadbeef" not in index.collection.items
+    assert len(index.collection.items) == 3
+
+
+def test_search_filters_become_a_chroma_where_clause():
+    assert indexer.transcript_where() is None
+    assert indexer.transcript_where(meeting_id=7) == {"meeting_id": "7"}
+    assert indexer.transcript_where(
+        date_from=date(2025, 1, 1), date_to=date(2025, 3, 31), speaker="Alice", min_duration=2.5
+    ) == {"$and": [
+        {"meeting_day": {"$gte": 20250101}},
+        {"meeting_day": {"$lte": 20250331}},
+        {"speaker": "Alice"},
+        {"duration_sec": {"$gte": 2.5}},
+    ]}
+
+
+def test_search_filters_in_the_index_and_pages_by_offset(index):
+    index(VTT)
+    assert all(meta["meeting_day"] == 20250101 for _, meta in index.collection.items.values())
+
+    hits = indexer.search_transcripts("Team A", "release", n_results=2, offset=1, meeting_id=7)
+
+    assert index.collection.last_query == {"n_results": 3, "where": {"meeting_id": "7"}}
+    assert [hit["distance"] for hit in hits] == pytest.approx([0.1, 0.2])
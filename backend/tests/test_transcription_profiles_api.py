@@ -0,0 +1,164 @@
+def _profile(name="draft", **overrides):
+    body = {"name": name, "model_name": "base.en", "language": "en", "beam_size": None,
+            "compute_type": "int8", "vad_skip": True}
+    body.update(overrides)
+    return body
+
+
+def _add_audio(db_session, meeting):
+    from backend.models import RawFile, RawFileType
+
+    db_session.add(RawFile(file_name="a.wav", human_name="a.wav", meeting_id=meeting.id, type=RawFileType.AUDIO))
+    db_session.commit()
+
+
+def _queued_params(db_session, job_id):
+    from backend.models import ProcessingJob
+
+    db_session.expire_all()
+    return db_session.query(ProcessingJob).get(job_id).params
+
+
+def test_create_list_update_and_delete_profile(client, make_user, make_group, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    headers = auth_header_for(owner.id)
+    base = f"/groups/{group.id}/transcription-profiles/"
+
+    created = client.post(base, json=_profile(), headers=headers)
+    assert created.status_code == 200
+    profile_id = created.json()["id"]
+    assert created.json()["group_id"] == group.id
+
+    updated = client.put(f"{base}{profile_id}", json=_profile(beam_size=3, compute_type="fp32"), headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["beam_size"] == 3
+
+    listed = client.get(base, headers=headers)
+    assert [p["name"] for p in listed.json()] == ["draft"]
+
+    assert client.delete(f"{base}{profile_id}", headers=headers).status_code == 200
+    assert client.get(base, headers=headers).json() == []
+
+
+def test_profile_names_are_unique_within_a_group(client, make_user, make_group, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    headers = auth_header_for(owner.id)
+    base = f"/groups/{group.id}/transcription-profiles/"
+
+    assert client.post(base, json=_profile(), headers=headers).status_code == 200
+    assert client.post(base, json=_profile(), headers=headers).status_code == 409
+
+
+def test_profile_rejects_unknown_compute_type(client, make_user, make_group, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+
+    response = client.post(
+        f"/groups/{group.id}/transcription-profiles/", json=_profile(compute_type="int4"),
+        headers=auth_header_for(owner.id),
+    )
+    assert response.status_code == 422
+
+
+def test_profile_rejects_unknown_whisper_model(client, make_user, make_group, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+
+    response = client.post(
+        f"/groups/{group.id}/transcription-profiles/", json=_profile(model_name="meduim.en"),
+        headers=auth_header_for(owner.id),
+    )
+    assert response.status_code == 422
+
+
+def test_profiles_require_group_membership(client, make_user, make_group, auth_header_for):
+    owner = make_user(username="owner")
+    outsider = make_user(username="outsider")
+    group = make_group(name="Team A", owner=owner)
+
+    response = client.get(f"/groups/{group.id}/transcription-profiles/", headers=auth_header_for(outsider.id))
+    assert response.status_code == 403
+
+
+def test_transcription_without_profile_uses_builtin_default(
+        client, db_session, make_user, make_group, make_meeting, auth_header_for):
+    from backend.config import settings
+
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    meeting = make_meeting(group)
+    _add_audio(db_session, meeting)
+
+    response = client.post(f"/groups/{group.id}/meetings/{meeting.id}/transcribe", headers=auth_header_for(owner.id))
+    assert response.status_code == 200
+    profile = _queued_params(db_session, response.json()["job_id"])["profile"]
+    assert profile["model_name"] == settings.WHISPER_MODEL_NAME
+    assert profile["compute_type"] == "fp32"
+
+
+def test_transcription_uses_named_then_group_default_profile(
+        client, db_session, make_user, make_group, make_meeting, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    headers = auth_header_for(owner.id)
+    base = f"/groups/{group.id}/transcription-profiles/"
+    client.post(base, json=_profile(name="final", model_name="medium.en", beam_size=5, compute_type="fp16",
+                                    vad_skip=False, make_default=True), headers=headers)
+    client.post(base, json=_profile(), headers=headers)
+
+    first = make_meeting(group)
+    _add_audio(db_session, first)
+    named = client.post(f"/groups/{group.id}/meetings/{first.id}/transcribe?profile=draft", headers=headers)
+    assert named.json()["profile"] == "draft"
+    assert _queued_params(db_session, named.json()["job_id"])["profile"]["compute_type"] == "int8"
+
+    second = make_meeting(group)
+    _add_audio(db_session, second)
+    default = client.post(f"/groups/{group.id}/meetings/{second.id}/transcribe", headers=headers)
+    params = _queued_params(db_session, default.json()["job_id"])["profile"]
+    assert (params["name"], params["model_name"], params["beam_size"]) == ("final", "medium.en", 5)
+
+
+def test_transcription_with_unknown_profile_is_rejected(
+        client, db_session, make_user, make_group, make_meeting, auth_header_for):
+    owner = make_user(username="owner")
+    group = make_group(name="Team A", owner=owner)
+    meeting = make_meeting(group)
+    _add_audio(db_session, meeting)
+
+    response = client.post(
+        f"/groups/{group.id}/meetings/{meeting.id}/transcribe?profile=nope", headers=auth_header_for(owner.id)
+    )
+    assert response.status_code == 404
+
+
+def test_group_default_profiles_are_the_whisper_variants_to_warm(client, db_session, make_user, make_group, auth_header_for):
+    from backend.config import settings
+    from backend.processing.transcription_profiles import default_whisper_variants
+
+    owner = make_user(username="owner")
+    headers = auth_header_for(owner.id)
+    for name in ("Team A", "Team B"):
+        group = make_group(name=name, owner=owner)
+        client.post(f"/groups/{group.id}/transcription-profiles/", json=_profile(make_default=True), headers=headers)
+    other = make_group(name="Team C", owner=owner)
+    # a profile nobody has as their default is not warmed
+    client.post(f"/groups/{other.id}/transcription-profiles/", json=_profile(model_name="small.en"), headers=headers)
+
+    assert default_whisper_variants(db_session) == [(settings.WHISPER_MODEL_NAME, "fp32"), ("base.en", "int8")]
+
+
+def test_shared_profile_names_are_unique(db_session):
+    import pytest
+    from sqlalchemy.exc import IntegrityError
+
+    from backend.models import TranscriptionProfile
+
+    db_session.add(TranscriptionProfile(name="shared", model_name="base.en"))
+    db_session.commit()
+    db_session.add(TranscriptionProfile(name="shared", model_name="medium.en"))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
@@ -0,0 +1,71 @@
+"""
+No-DB checks for building member voice prints from several samples
+(backend/processing/voice_prints.py).
+"""
+
+from types import SimpleNamespace
+
+import numpy
+import pytest
+
+from backend.config import settings
+from backend.processing.voice_prints import MEETING, UPLOAD, add_meeting_sample, refresh_voice_print, robust_centroid
+
+
+def _sample(id, vector, model="model-a", source=UPLOAD, meeting_id=None):
+    return SimpleNamespace(id=id, embedding=list(vector), embedding_model=model, source=source, meeting_id=meeting_id)
+
+
+def _member(samples):
+    return SimpleNamespace(id=1, voice_samples=list(samples), embedding=None, embedding_model=None,
+                           embedding_spread=None, embedding_sample_count=0, embedding_updated_at=None)
+
+
+def test_centroid_is_normalised_mean_with_spread():
+    centroid, spread, keep = robust_centroid([[1.0, 0.0], [0.0, 1.0]])
+    assert numpy.allclose(centroid, [numpy.sqrt(0.5), numpy.sqrt(0.5)])
+    assert spread == pytest.approx(1 - numpy.sqrt(0.5))
+    assert keep.all()
+
+
+def test_outlying_sample_is_left_out(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_PRINT_TRIM_MIN_SAMPLES", 4)
+    monkeypatch.setattr(settings, "VOICE_PRINT_OUTLIER_SIGMAS", 1.0)
+    rng = numpy.random.default_rng(0)
+    voice = rng.normal(size=16)
+    clips = [voice + rng.normal(scale=0.1, size=16) for _ in range(5)]
+    someone_else = rng.normal(size=16)
+
+    centroid, _, keep = robust_centroid(clips + [someone_else])
+    assert keep.tolist() == [True] * 5 + [False]
+    assert centroid @ (voice / numpy.linalg.norm(voice)) > 0.99
+
+
+def test_refresh_only_uses_samples_from_the_given_model():
+    member = _member([_sample(1, [1.0, 0.0]), _sample(2, [0.0, 1.0], model="model-b")])
+    refresh_voice_print(member, "model-a")
+    assert member.embedding == pytest.approx([1.0, 0.0])
+    assert member.embedding_sample_count == 1
+    assert member.embedding_model == "model-a"
+
+
+def test_refresh_without_samples_clears_the_voice_print():
+    member = _member([])
+    member.embedding = [1.0, 0.0]
+    refresh_voice_print(member, "model-a")
+    assert member.embedding is None
+    assert member.embedding_sample_count == 0
+
+
+def test_meeting_samples_replace_per_meeting_and_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_PRINT_MAX_MEETING_SAMPLES", 2)
+    member = _member([_sample(1, [1.0, 0.0])])
+    add_meeting_sample(member, 10, [1.0, 0.1], "model-a")
+    add_meeting_sample(member, 10, [1.0, 0.2], "model-a")  # reprocessed meeting replaces its sample
+    add_meeting_sample(member, 11, [1.0, 0.3], "model-a")
+    add_meeting_sample(member, 12, [1.0, 0.4], "model-a")
+
+    from_meetings = [s for s in member.voice_samples if s.source == MEETING]
+    assert [s.meeting_id for s in from_meetings] == [11, 12]
+    assert member.voice_samples[0].source == UPLOAD
+    assert member.embedding_sample_count == 3
@@ -0,0 +1,103 @@
+"""
+No-DB checks for the incremental transcript writer and its checkpoint/resume
+behaviour (backend/processing/vtt_writer.py), and for the cue stream that tails it
+(backend/routes/meetings.py, with the job lookup faked).
+"""
+
+from backend.processing.vtt_writer import StreamingVttWriter, parse_cues
+
+
+def test_cues_are_appended_and_finalised(tmp_path):
+    writer = StreamingVttWriter(tmp_path, "sig")
+    assert writer.open() == 0
+    writer.write_cue(0.0, 1.5, "Alice", "Hello")
+    writer.write_cue(1.5, 3.0, "Bob", " Hi there ")
+    dest = tmp_path / "final.vtt"
+    writer.finalize(dest)
+
+    assert not writer.partial_path.exists()
+    assert not writer.checkpoint_path.exists()
+    text = dest.read_text(encoding="utf-8")
+    assert text.startswith("WEBVTT\n\n")
+    cues, _ = parse_cues(text)
+    assert [(c.index, c.start, c.end, c.speaker, c.text) for c in cues] == [
+        (1, "00:00:00.000", "00:00:01.500", "Alice", "Hello"),
+        (2, "00:00:01.500", "00:00:03.000", "Bob", "Hi there"),
+    ]
+
+
+def test_resume_drops_unfinished_cue(tmp_path):
+    writer = StreamingVttWriter(tmp_path, "sig")
+    writer.open()
+    writer.write_cue(0.0, 1.0, "Alice", "one")
+    writer.close()
+    # simulate a crash halfway through writing the next cue
+    with open(writer.partial_path, "ab") as f:
+        f.write(b"2\n00:00:01.000 --> 00")
+
+    resumed = StreamingVttWriter(tmp_path, "sig")
+    assert resumed.open() == 1
+    resumed.write_cue(1.0, 2.0, "Bob", "two")
+    resumed.finalize(tmp_path / "final.vtt")
+    cues, _ = parse_cues((tmp_path / "final.vtt").read_text(encoding="utf-8"))
+    assert [c.text for c in cues] == ["one", "two"]
+
+
+def test_different_signature_starts_fresh(tmp_path):
+    writer = StreamingVttWriter(tmp_path, "old")
+    writer.open()
+    writer.write_cue(0.0, 1.0, "Alice", "stale")
+    writer.close()
+
+    fresh = StreamingVttWriter(tmp_path, "new")
+    assert fresh.open() == 0
+    fresh.close()
+    assert parse_cues(fresh.partial_path.read_text(encoding="utf-8"))[0] == []
+
+
+def test_parse_cues_ignores_trailing_partial_cue():
+    cues, consumed = parse_cues("WEBVTT\n\n1\n00:00:00.000 --> 00:00:01.000\nA: hi\n\n2\n00:00:01")
+    assert [c.text for c in cues] == ["hi"]
+    assert consumed == len("WEBVTT\n\n1\n00:00:00.000 --> 00:00:01.000\nA: hi\n\n")
+
+
+def test_stream_restarts_when_the_partial_file_is_rewritten(tmp_path, monkeypatch):
+    from backend.config import settings
+    from backend.models import JobStatus
+    from backend.routes import meetings
+
+    class Job:
+        status = JobStatus.RUNNING
+
+    class Session:
+        def query(self, model):
+            return self
+
+        def get(self, job_id):
+            return Job
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "TRANSCRIPT_STREAM_POLL_SECONDS", 0)
+    monkeypatch.setattr(meetings, "SessionLocal", Session)
+    directory = tmp_path / "1" / "2"
+
+    writer = StreamingVttWriter(directory, "first")
+    writer.open()
+    writer.write_cue(0.0, 1.0, "Alice", "A much longer first attempt at this cue")
+    writer.write_cue(1.0, 2.0, "Bob", "and another one")
+    stream = meetings._stream_transcript_cues(1, 2, job_id=3)
+    assert [next(stream).split("\n")[0] for _ in range(2)] == ["event: cue", "event: cue"]
+
+    # a retry with a different signature starts the file again, shorter than before
+    retry = StreamingVttWriter(directory, "second")
+    retry.open()
+    retry.write_cue(0.0, 1.0, "Alice", "Retry")
+    events = [next(stream) for _ in range(2)]
+    assert events[0].startswith("event: reset")
+    assert '"text": "Retry"' in events[1] and '"index": 1' in events[1]
+
+    Job.status = JobStatus.FAILED
+    assert next(stream).startswith("event: done")
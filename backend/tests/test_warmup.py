@@ -0,0 +1,59 @@
+"""
+No-DB checks for start-up warm-up (backend/processing/warmup.py) and the worker's
+ready file; the model steps themselves are replaced, so nothing is loaded.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("torch")
+
+from backend import worker
+from backend.config import settings
+from backend.processing import warmup
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    state = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "warmup_state", state)
+    monkeypatch.setattr(settings, "WARMUP_CLIP_SECONDS", 0.5)
+    return state
+
+
+def test_every_step_runs_on_the_same_clip(fresh_state, monkeypatch):
+    clips = []
+    monkeypatch.setattr(warmup, "WARMUP_STEPS", [("a", clips.append), ("b", clips.append)])
+
+    snapshot = warmup.warm_up_models()
+
+    assert snapshot["status"] == warmup.READY
+    assert set(snapshot["seconds"]) == {"a", "b"}
+    assert clips[0] is clips[1]
+    assert clips[0].duration == pytest.approx(0.5)
+
+
+def test_a_failing_step_is_recorded_and_raised(fresh_state, monkeypatch):
+    def broken(clip):
+        raise OSError("weights not downloaded")
+
+    monkeypatch.setattr(warmup, "WARMUP_STEPS", [("a", lambda clip: None), ("b", broken)])
+
+    with pytest.raises(OSError):
+        warmup.warm_up_models()
+    snapshot = fresh_state.snapshot()
+    assert snapshot["status"] == warmup.FAILED
+    assert "weights not downloaded" in snapshot["error"]
+    assert list(snapshot["seconds"]) == ["a"]
+
+
+def test_ready_file_is_written_and_cleared(tmp_path, monkeypatch):
+    ready = tmp_path / "state" / "worker.ready"
+    monkeypatch.setattr(settings, "WORKER_READY_FILE", ready)
+
+    worker.mark_ready()
+    assert json.loads(ready.read_text())["worker"] == worker.WORKER_ID
+    worker.clear_ready()
+    assert not ready.exists()
+    worker.clear_ready()  # already gone is fine
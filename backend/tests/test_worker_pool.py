@@ -0,0 +1,20 @@
+"""
+No-DB checks for how the multi-process worker divides CPU cores
+(backend/worker_pool.py).
+"""
+
+from backend.worker_pool import core_slices
+
+
+def test_cores_split_evenly_without_overlap():
+    slices = core_slices(4, cpus=list(range(32)))
+    assert [len(s) for s in slices] == [8, 8, 8, 8]
+    assert sorted(c for s in slices for c in s) == list(range(32))
+
+
+def test_remainder_cores_go_to_the_first_slices():
+    assert core_slices(3, cpus=list(range(8))) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+
+def test_never_more_processes_than_cores():
+    assert core_slices(8, cpus=[0, 1]) == [[0], [1]]
@@ -0,0 +1,165 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of sentence-transformer embeddings, keyed by model and text.
+
+The same short texts ("Yeah.", "Okay, thanks", a recurring agenda line) turn up
+in meeting after meeting, and the same queries are searched again and again.
+Each vector is stored once, as float32 bytes, in a SQLite table keyed by
+(model name, sha256 of the text), so a text is embedded once per model however
+many meetings contain it - and rebuilding Chroma from the chunk files costs
+reads, not inference. Rows record when they were last used (refreshed at most
+once a minute per row, so a run of cache hits does not turn every search into a
+write); once the stored vectors exceed the size limit the least recently used
+are deleted. The stored size is a running total in a one-row table, kept
+current by triggers, so checking it never scans the vectors.
+
+SQLite runs in WAL mode with a busy timeout, so the API (queries) and the
+worker processes (indexing) can share the file.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limit, so eviction doesn't run on every insert
+_EVICT_TO = 0.9
+# A hit only rewrites a row's last_used once it is at least this old
+_TOUCH_SECONDS = 60.0
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        if self._conn.execute("SELECT name FROM sqlite_master WHERE name = 'cache_size'").fetchone() is None:
+            # one scan, when a cache file from before the running total is first opened
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings BEGIN"
+            " UPDATE cache_size SET bytes = bytes + LENGTH(new.vector) WHERE id = 0; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS embeddings_size_update AFTER UPDATE OF vector ON embeddings BEGIN"
+            " UPDATE cache_size SET bytes = bytes + LENGTH(new.vector) - LENGTH(old.vector) WHERE id = 0; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings BEGIN"
+            " UPDATE cache_size SET bytes = bytes - LENGTH(old.vector) WHERE id = 0; END"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, texts: Iterable[str]) -> dict[str, numpy.ndarray]:
+        """Cached vectors for whichever of `texts` have one, by text; marks them as used."""
+        by_hash = {text_hash(text): text for text in texts}
+        found: dict[str, numpy.ndarray] = {}
+        hashes = list(by_hash)
+        now = time.time()
+        stale = []
+        with self._lock:
+            # stay well below SQLite's bound-parameter limit
+            for first in range(0, len(hashes), 500):
+                batch = hashes[first:first + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector, last_used FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                for digest, vector, last_used in rows:
+                    found[by_hash[digest]] = numpy.frombuffer(vector, dtype=numpy.float32)
+                    if now - last_used >= _TOUCH_SECONDS:
+                        stale.append(digest)
+            if stale:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, digest) for digest in stale],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, numpy.ndarray]) -> None:
+        if not vectors:
+            return
+        now = time.time()
+        rows = [
+            (model, text_hash(text), numpy.asarray(vector, dtype=numpy.float32).tobytes(), now)
+            for text, vector in vectors.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                # an upsert rather than INSERT OR REPLACE, whose implicit delete fires no trigger
+                "INSERT INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (model, text_hash) DO UPDATE SET vector = excluded.vector, last_used = excluded.last_used",
+                rows,
+            )
+            self._conn.commit()
+            self._evict()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT bytes FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self) -> None:
+        if not self.max_bytes:
+            return
+        stored = self._stored_bytes()
+        if stored <= self.max_bytes:
+            return
+        excess = stored - int(self.max_bytes * _EVICT_TO)
+        # walk the last_used index from the oldest row until enough bytes are covered
+        doomed, freed = [], 0
+        oldest = self._conn.execute("SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used")
+        for rowid, size in oldest:
+            doomed.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        oldest.close()
+        self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", doomed)
+        self._conn.commit()
+        logger.info("Embedding cache over %d bytes; evicted %d least recently used vectors", self.max_bytes, len(doomed))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -18,40 +18,98 @@ searched (see backend/routes/transcripts.py). Two call sites feed this: a
 directly-uploaded .vtt (backend/routes/upload.py) and a server-transcribed
 one (backend/processing/transcribe.py) - both produce the same chunk/stats
 shape, so one indexing path covers both.
+
+Indexing is incremental. Chunk ids are content-addressed (see
+vtt_rag.chunker.chunk_content_id), and each meeting keeps a manifest.json next
+to its chunks.jsonl that maps every indexed chunk id to a hash of its metadata.
+Re-indexing a meeting diffs the new chunks against that manifest: it embeds and
+adds only the new ids, deletes the ids that vanished, and updates only the
+metadata of chunks whose neighbours or position changed (their text, and so
+their embedding, is unchanged). Without a manifest, e.g. for a meeting indexed
+before manifests existed, the meeting's chunks are read back from Chroma
+instead, so their old random-id duplicates are removed as well. Embeddings
+themselves, for chunks and queries alike, go through an on-disk cache keyed by
+model and text (backend/transcript_rag/embedding_cache.py).
+
+A group's collection name (transcripts_collection_name) is looked up in
+collection_aliases.json in the Chroma dir before use, so that a full rebuild
+(backend/transcript_rag/reindex.py) can fill a fresh collection while searches
+keep reading the old one, then switch every group over at once.
+
+Searches filter inside Chroma (transcript_where) rather than on the returned
+hits. Date ranges compare the numeric meeting_day each chunk carries; chunks
+indexed before it existed gain it, as a metadata-only update, the next time
+their meeting is indexed or on a rebuild.
+
+chromadb and sentence-transformers are imported on first use rather than at
+module scope: the API imports this module for its routes, and should not pay
+for (or need) either package until a transcript is actually indexed or searched.
 """
 
+import hashlib
 import json
 import logging
+import os
+from datetime import date
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
-
-import chromadb
-from sentence_transformers import SentenceTransformer
+from typing import TYPE_CHECKING, Any, Optional
 
 from backend.config import settings
+from backend.transcript_rag.embedding_cache import EmbeddingCache
 from backend.transcript_rag.vtt_rag import process_vtt_file
 
+if TYPE_CHECKING:
+    import chromadb
+    from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
+MANIFEST_NAME = "manifest.json"
+EMBEDDING_CACHE_NAME = "embedding_cache.sqlite3"
+ALIASES_NAME = "collection_aliases.json"
+
 
 @lru_cache(maxsize=1)
-def _get_chroma_client() -> chromadb.ClientAPI:
+def _get_chroma_client() -> "chromadb.ClientAPI":
+    import chromadb
+
     return chromadb.PersistentClient(path=str(settings.TRANSCRIPT_CHROMA_DIR))
 
 
 @lru_cache(maxsize=1)
-def _get_embedding_model() -> SentenceTransformer:
+def _get_embedding_model() -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
     return SentenceTransformer(
         settings.TRANSCRIPT_EMBEDDING_MODEL_NAME, device=settings.TRANSCRIPT_EMBEDDING_DEVICE
     )
 
 
+@lru_cache(maxsize=1)
+def _get_embedding_cache() -> Optional[EmbeddingCache]:
+    if not settings.TRANSCRIPT_EMBEDDING_CACHE_MB:
+        return None
+    return EmbeddingCache(
+        settings.TRANSCRIPT_CHROMA_DIR / EMBEDDING_CACHE_NAME, settings.TRANSCRIPT_EMBEDDING_CACHE_MB * 1024**2
+    )
+
+
 def _embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embeddings for `texts` (chunks or a query), encoding only texts not already cached."""
     if not texts:
         return []
-    model = _get_embedding_model()
-    return model.encode(texts, show_progress_bar=False, convert_to_numpy=True).tolist()
+    model_name = settings.TRANSCRIPT_EMBEDDING_MODEL_NAME
+    cache = _get_embedding_cache()
+    vectors = cache.get_many(model_name, texts) if cache is not None else {}
+    missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+    if missing:
+        encoded = _get_embedding_model().encode(missing, show_progress_bar=False, convert_to_numpy=True)
+        fresh = dict(zip(missing, encoded))
+        if cache is not None:
+            cache.put_many(model_name, fresh)
+        vectors.update(fresh)
+    return [vectors[text].tolist() for text in texts]
 
 
 def transcripts_collection_name(group_name: str) -> str:
@@ -61,6 +119,171 @@ def transcripts_collection_name(group_name: str) -> str:
     return f"{safe_name}_transcripts"
 
 
+def _aliases_path() -> Path:
+    return settings.TRANSCRIPT_CHROMA_DIR / ALIASES_NAME
+
+
+def load_aliases() -> dict[str, str]:
+    try:
+        return json.loads(_aliases_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve_collection(name: str) -> str:
+    """The Chroma collection currently serving `name`. Chroma has no aliases of its own,
+    so a rebuild (backend/transcript_rag/reindex.py) writes into a new collection and then
+    points the name at it here; without an entry, the name is the collection."""
+    return load_aliases().get(name, name)
+
+
+def swap_aliases(targets: dict[str, str]) -> dict[str, str]:
+    """Point each name in `targets` at its new collection in one atomic file replace.
+    Returns the collections the names pointed at before."""
+    aliases = load_aliases()
+    previous = {name: aliases.get(name, name) for name in targets}
+    aliases.update(targets)
+    path = _aliases_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(aliases, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return previous
+
+
+def transcript_output_dir(group_id: int) -> Path:
+    return settings.EMBEDDING_DIR / "transcripts" / str(group_id)
+
+
+def chunk_transcript(group_id: int, meeting_id: int, vtt_path: Path, meeting_title: str,
+                     meeting_date: str) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Verify and chunk one transcript (writing chunks.jsonl/stats.json); returns the
+    pipeline summary and the chunks as they are stored in Chroma."""
+    summary = process_vtt_file(
+        file_path=str(vtt_path),
+        meeting_title=meeting_title,
+        meeting_date=meeting_date,
+        output_dir=str(transcript_output_dir(group_id)),
+        meeting_id=str(meeting_id),
+    )
+    chunks_path = Path(summary["chunks_path"])
+    chunks = [
+        {**json.loads(line), "group_id": group_id, "meeting_day": meeting_day(meeting_date)}
+        for line in chunks_path.read_text(encoding="utf-8").splitlines() if line
+    ]
+    return summary, chunks
+
+
+def meeting_day(meeting_date) -> int:
+    """A date (or ISO date string) as YYYYMMDD. Chroma only compares numbers with
+    $gt/$lt, so chunks carry this next to meeting_date for date-range filters."""
+    if isinstance(meeting_date, str):
+        meeting_date = date.fromisoformat(meeting_date[:10])
+    return meeting_date.year * 10000 + meeting_date.month * 100 + meeting_date.day
+
+
+def transcript_where(
+    meeting_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    speaker: Optional[str] = None,
+    min_duration: Optional[float] = None,
+) -> Optional[dict[str, Any]]:
+    """The Chroma `where` clause for a filtered search, or None for no filter."""
+    conditions: list[dict[str, Any]] = []
+    if meeting_id is not None:
+        conditions.append({"meeting_id": str(meeting_id)})
+    if date_from is not None:
+        conditions.append({"meeting_day": {"$gte": meeting_day(date_from)}})
+    if date_to is not None:
+        conditions.append({"meeting_day": {"$lte": meeting_day(date_to)}})
+    if speaker is not None:
+        conditions.append({"speaker": speaker})
+    if min_duration is not None:
+        conditions.append({"duration_sec": {"$gte": float(min_duration)}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def manifest_for(collection_name: str, chunks: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "collection": collection_name,
+        "embedding_model": settings.TRANSCRIPT_EMBEDDING_MODEL_NAME,
+        "chunks": {c["chunk_id"]: _metadata_hash(c) for c in chunks},
+    }
+
+
+def _metadata_hash(metadata: dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(metadata, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(path: Path, manifest: dict[str, Any]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _indexed_chunks(collection, meeting_id: int) -> dict[str, str]:
+    """What Chroma holds for this meeting, as chunk id -> metadata hash."""
+    existing = collection.get(where={"meeting_id": str(meeting_id)}, include=["metadatas"])
+    return {
+        chunk_id: _metadata_hash(metadata or {})
+        for chunk_id, metadata in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+    }
+
+
+def sync_chunks(collection, meeting_id: int, chunks: list[dict[str, Any]],
+                previous: Optional[dict[str, Any]]) -> tuple[dict[str, Any], dict[str, int]]:
+    """Bring `collection`'s copy of one meeting in line with `chunks`, touching only what
+    differs from the `previous` manifest. Returns the new manifest and per-action counts."""
+    collection_name = collection.name
+    model_name = settings.TRANSCRIPT_EMBEDDING_MODEL_NAME
+    if previous is None or previous.get("collection") != collection_name:
+        indexed = _indexed_chunks(collection, meeting_id)
+    elif previous.get("embedding_model") != model_name:
+        # Embeddings from another model can't be kept: everything is replaced
+        indexed = {chunk_id: None for chunk_id in previous.get("chunks", {})}
+    else:
+        indexed = previous.get("chunks", {})
+
+    current = {c["chunk_id"]: c for c in chunks}
+    hashes = {chunk_id: _metadata_hash(c) for chunk_id, c in current.items()}
+    added = [chunk_id for chunk_id in current if indexed.get(chunk_id) is None]
+    removed = [chunk_id for chunk_id in indexed if chunk_id not in current]
+    changed = [
+        chunk_id for chunk_id in current
+        if indexed.get(chunk_id) is not None and indexed[chunk_id] != hashes[chunk_id]
+    ]
+
+    if removed:
+        collection.delete(ids=removed)
+    if added:
+        documents = [current[chunk_id]["text"] for chunk_id in added]
+        collection.upsert(
+            ids=added,
+            documents=documents,
+            metadatas=[current[chunk_id] for chunk_id in added],
+            embeddings=_embed_texts(documents),
+        )
+    if changed:
+        collection.update(ids=changed, metadatas=[current[chunk_id] for chunk_id in changed])
+
+    manifest = manifest_for(collection_name, chunks)
+    counts = {
+        "added": len(added), "removed": len(removed), "updated": len(changed),
+        "unchanged": len(current) - len(added) - len(changed),
+    }
+    return manifest, counts
+
+
 def index_transcript(
     group_id: int,
     group_name: str,
@@ -73,48 +296,58 @@ def index_transcript(
     collection. Raises ValueError (from vtt_rag's own verification step) if
     the file has no usable speaker metadata - callers decide whether that
     should fail the request or just be logged (see the two call sites)."""
-    output_dir = settings.EMBEDDING_DIR / "transcripts" / str(group_id)
-    summary = process_vtt_file(
-        file_path=str(vtt_path),
-        meeting_title=meeting_title,
-        meeting_date=meeting_date,
-        output_dir=str(output_dir),
-        meeting_id=str(meeting_id),
-    )
-
-    chunks_path = Path(summary["chunks_path"])
-    chunks = [json.loads(line) for line in chunks_path.read_text(encoding="utf-8").splitlines() if line]
-    if not chunks:
-        return summary
+    summary, chunks = chunk_transcript(group_id, meeting_id, vtt_path, meeting_title, meeting_date)
 
+    # An empty transcript still syncs, so chunks of an earlier version are deleted
+    manifest_path = Path(summary["chunks_path"]).parent / MANIFEST_NAME
     collection = _get_chroma_client().get_or_create_collection(
-        name=transcripts_collection_name(group_name)
+        name=resolve_collection(transcripts_collection_name(group_name))
     )
-    documents = [c["text"] for c in chunks]
-    collection.upsert(
-        ids=[c["chunk_id"] for c in chunks],
-        documents=documents,
-        metadatas=[{**c, "group_id": group_id} for c in chunks],
-        embeddings=_embed_texts(documents),
+    manifest, counts = sync_chunks(collection, meeting_id, chunks, load_manifest(manifest_path))
+    save_manifest(manifest_path, manifest)
+    summary["index_changes"] = counts
+    logger.info(
+        "Indexed meeting %s (group %s): %d chunks added, %d removed, %d updated, %d unchanged",
+        meeting_id, group_id, counts["added"], counts["removed"], counts["updated"], counts["unchanged"],
     )
-    logger.info("Indexed %d transcript chunks for meeting %s (group %s)", len(chunks), meeting_id, group_id)
     return summary
 
 
-def search_transcripts(group_name: str, query: str, n_results: int = 5) -> list[dict[str, Any]]:
+def search_transcripts(
+    group_name: str,
+    query: str,
+    n_results: int = 5,
+    offset: int = 0,
+    meeting_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    speaker: Optional[str] = None,
+    min_duration: Optional[float] = None,
+) -> list[dict[str, Any]]:
     """Semantic search over one group's indexed transcript chunks. Returns
-    an empty list if the group has nothing indexed yet, rather than raising."""
+    an empty list if the group has nothing indexed yet, rather than raising.
+
+    The filters become a Chroma `where` clause (transcript_where), so the
+    nearest `n_results` are taken from the matching chunks only. Chroma has no
+    offset, so a page is the tail of the top `offset + n_results`."""
     client = _get_chroma_client()
     try:
-        collection = client.get_collection(name=transcripts_collection_name(group_name))
+        collection = client.get_collection(name=resolve_collection(transcripts_collection_name(group_name)))
     except Exception:
         return []
 
-    result = collection.query(query_embeddings=_embed_texts([query]), n_results=n_results)
+    where = transcript_where(meeting_id, date_from, date_to, speaker, min_duration)
+    result = collection.query(
+        query_embeddings=_embed_texts([query]),
+        n_results=offset + n_results,
+        **({"where": where} if where is not None else {}),
+    )
     metadatas = (result.get("metadatas") or [[]])[0]
     distances = (result.get("distances") or [[]])[0]
     hits = []
     for index, metadata in enumerate(metadatas):
+        if index < offset:
+            continue
         hit = dict(metadata)
         hit["distance"] = float(distances[index]) if index < len(distances) else None
         hits.append(hit)
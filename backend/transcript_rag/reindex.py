@@ -0,0 +1,258 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rebuild every group's transcript collection from the transcripts on disk.
+
+Run with `python -m backend.transcript_rag.reindex [--group-id N]`, e.g. after
+changing TRANSCRIPT_EMBEDDING_MODEL_NAME or the chunker. Each meeting's latest
+.vtt RawFile (provided or generated) is parsed and chunked in a process pool;
+the chunks are embedded in large batches that span meetings (through the
+embedding cache, so unchanged text is not re-encoded) and written to a new,
+versioned collection per group. Searches keep reading the old collections
+until everything is written; then collection_aliases.json is replaced in one
+step to point every group at its new collection, and the old ones are dropped.
+
+A meeting indexed by the API or a worker while the rebuild runs lands in the
+old collection. Once the aliases are swapped, any meeting whose transcript
+changed since the rebuild read the database is synced again through
+index_transcript, which brings the new collection up to date.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db import SessionLocal
+from backend.models import Group, Meeting, RawFile, RawFileType
+from backend.transcript_rag.indexer import (
+    MANIFEST_NAME,
+    _embed_texts,
+    _get_chroma_client,
+    chunk_transcript,
+    index_transcript,
+    manifest_for,
+    save_manifest,
+    swap_aliases,
+    transcripts_collection_name,
+)
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_TYPES = (RawFileType.TRANSCRIPT_PROVIDED, RawFileType.TRANSCRIPT_GENERATED)
+
+
+@dataclass(frozen=True)
+class TranscriptSource:
+    group_id: int
+    group_name: str
+    meeting_id: int
+    raw_file_id: int
+    vtt_path: Path
+    meeting_date: str
+
+
+def find_transcripts(db: Session, group_id: Optional[int] = None) -> list[TranscriptSource]:
+    """The .vtt each meeting is currently indexed from: its most recent transcript RawFile."""
+    query = (
+        db.query(RawFile, Meeting, Group)
+        .join(Meeting, RawFile.meeting_id == Meeting.id)
+        .join(Group, Meeting.group_id == Group.id)
+        .filter(RawFile.type.in_(TRANSCRIPT_TYPES))
+    )
+    if group_id is not None:
+        query = query.filter(Group.id == group_id)
+    latest = {}
+    for raw_file, meeting, group in query.order_by(RawFile.id).all():
+        if not raw_file.file_name or Path(raw_file.file_name).suffix.lower() != ".vtt":
+            continue
+        latest[meeting.id] = TranscriptSource(
+            group_id=group.id,
+            group_name=group.name,
+            meeting_id=meeting.id,
+            raw_file_id=raw_file.id,
+            vtt_path=settings.UPLOAD_DIR / str(group.id) / str(meeting.id) / raw_file.file_name,
+            meeting_date=meeting.date.date().isoformat(),
+        )
+    return sorted(latest.values(), key=lambda s: (s.group_id, s.meeting_id))
+
+
+def _chunk(source: TranscriptSource) -> tuple[TranscriptSource, Optional[str], list[dict[str, Any]], Optional[str]]:
+    """Runs in a pool process: (source, chunks.jsonl path, chunks, error)."""
+    try:
+        summary, chunks = chunk_transcript(
+            source.group_id, source.meeting_id, source.vtt_path, source.group_name, source.meeting_date
+        )
+    except Exception as e:
+        return source, None, [], f"{type(e).__name__}: {e}"
+    return source, summary["chunks_path"], chunks, None
+
+
+class ChunkWriter:
+    """Collects chunks from any number of meetings and collections, and embeds and
+    writes them `batch_size` at a time so the embedding model sees full batches."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = max(1, batch_size)
+        self.pending: list[tuple[Any, dict[str, Any]]] = []
+        self.written = 0
+
+    def add(self, collection, chunks: list[dict[str, Any]]) -> None:
+        self.pending.extend((collection, chunk) for chunk in chunks)
+        while len(self.pending) >= self.batch_size:
+            self._write(self.pending[:self.batch_size])
+            self.pending = self.pending[self.batch_size:]
+
+    def flush(self) -> None:
+        if self.pending:
+            self._write(self.pending)
+            self.pending = []
+
+    def _write(self, batch: list[tuple[Any, dict[str, Any]]]) -> None:
+        embeddings = _embed_texts([chunk["text"] for _, chunk in batch])
+        by_collection: dict[int, tuple[Any, list[int]]] = {}
+        for index, (collection, _) in enumerate(batch):
+            by_collection.setdefault(id(collection), (collection, []))[1].append(index)
+        for collection, indices in by_collection.values():
+            collection.add(
+                ids=[batch[i][1]["chunk_id"] for i in indices],
+                documents=[batch[i][1]["text"] for i in indices],
+                metadatas=[batch[i][1] for i in indices],
+                embeddings=[embeddings[i] for i in indices],
+            )
+        self.written += len(batch)
+
+
+def _catch_up(group_id: Optional[int], names: set[str], rebuilt: dict[int, int]) -> int:
+    """Sync meetings whose transcript changed while the rebuild ran. Returns how many."""
+    db = SessionLocal()
+    try:
+        sources = find_transcripts(db, group_id)
+    finally:
+        db.close()
+    synced = 0
+    for source in sources:
+        if transcripts_collection_name(source.group_name) not in names:
+            continue
+        if rebuilt.get(source.meeting_id) == source.raw_file_id:
+            continue
+        try:
+            index_transcript(source.group_id, source.group_name, source.meeting_id, source.vtt_path,
+                             source.group_name, source.meeting_date)
+            synced += 1
+        except Exception:
+            logger.exception("Catch-up indexing failed for meeting %s", source.meeting_id)
+    return synced
+
+
+def reindex(group_id: Optional[int] = None, processes: Optional[int] = None,
+            batch_size: Optional[int] = None, keep_old: bool = False) -> dict[str, Any]:
+    """Rebuild the transcript collections of every group (or just `group_id`) and switch
+    searches over to them. Returns counts for the run."""
+    processes = processes if processes is not None else settings.TRANSCRIPT_REINDEX_PROCESSES
+    processes = processes or os.cpu_count() or 1
+    batch_size = batch_size or settings.TRANSCRIPT_REINDEX_BATCH_SIZE
+
+    db = SessionLocal()
+    try:
+        sources = find_transcripts(db, group_id)
+    finally:
+        db.close()
+    if not sources:
+        logger.info("[Reindex] No transcripts to index")
+        return {"meetings": 0, "chunks": 0, "failed": 0}
+
+    client = _get_chroma_client()
+    version = time.strftime("%Y%m%d%H%M%S")
+    targets = {
+        name: f"{name}_v{version}" for name in {transcripts_collection_name(s.group_name) for s in sources}
+    }
+    collections = {name: client.create_collection(name=target) for name, target in targets.items()}
+    writer = ChunkWriter(batch_size)
+    manifests: dict[Path, dict[str, Any]] = {}
+    rebuilt: dict[int, int] = {}
+    failed = 0
+    started = time.monotonic()
+    logger.info(f"[Reindex] {len(sources)} meetings into {len(targets)} collections "
+                f"({processes} processes, batches of {writer.batch_size})")
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            results = pool.map(_chunk, sources, chunksize=4)
+            for done, (source, chunks_path, chunks, error) in enumerate(results, start=1):
+                if error is not None:
+                    failed += 1
+                    logger.warning(f"[Reindex] Skipping meeting {source.meeting_id} ({source.vtt_path}): {error}")
+                    continue
+                name = transcripts_collection_name(source.group_name)
+                before = writer.written
+                writer.add(collections[name], chunks)
+                manifests[Path(chunks_path).parent / MANIFEST_NAME] = manifest_for(targets[name], chunks)
+                rebuilt[source.meeting_id] = source.raw_file_id
+                if writer.written != before or done == len(sources):
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    logger.info(f"[Reindex] {done}/{len(sources)} meetings, {writer.written} chunks written, "
+                                f"{writer.written / elapsed:.0f} chunks/s")
+        writer.flush()
+    except BaseException:
+        for target in targets.values():
+            try:
+                client.delete_collection(name=target)
+            except Exception:
+                logger.warning(f"[Reindex] Could not remove partial collection {target}")
+        raise
+
+    previous = swap_aliases(targets)
+    for manifest_path, manifest in manifests.items():
+        save_manifest(manifest_path, manifest)
+    caught_up = _catch_up(group_id, set(targets), rebuilt)
+    if not keep_old:
+        for name, old in previous.items():
+            if old == targets[name]:
+                continue
+            try:
+                client.delete_collection(name=old)
+            except Exception:
+                pass  # never created, e.g. a group whose transcripts were all indexed by this rebuild
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    logger.info(f"[Reindex] Done: {len(rebuilt)} meetings, {writer.written} chunks in {elapsed:.1f}s "
+                f"({writer.written / elapsed:.0f} chunks/s), {failed} failed, {caught_up} caught up")
+    return {
+        "meetings": len(rebuilt), "chunks": writer.written, "failed": failed,
+        "caught_up": caught_up, "collections": targets, "seconds": round(elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Rebuild the transcript search collections.")
+    parser.add_argument("--group-id", type=int, default=None,
+                        help="Only rebuild this group's collection (default: every group).")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Processes parsing and chunking transcripts (default from settings).")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Chunks embedded and written per batch (default from settings).")
+    parser.add_argument("--keep-old", action="store_true",
+                        help="Keep the collections the rebuild replaces instead of deleting them.")
+    args = parser.parse_args()
+    reindex(args.group_id, args.processes, args.batch_size, args.keep_old)
@@ -11,9 +11,12 @@ Chunking strategy:
   4. Link each chunk to its neighbours (prev/next chunk_id) so retrieval
      can pull surrounding context without duplicating text into the
      embedding itself.
+  5. Chunk ids are content-addressed (meeting, speaker, timing and text),
+     so re-chunking an unchanged transcript gives the same ids and an
+     edited one changes only the ids of the chunks that were edited.
 """
+import hashlib
 import re
-import uuid
 
 from .models import Cue, Turn, Chunk
 from .parsing import parse_vtt_cues
@@ -117,6 +120,13 @@ def _split_long_turn(turn: Turn, max_words: int) -> list[Turn]:
     return pieces
 
 
+def chunk_content_id(meeting_id: str, piece: Turn) -> str:
+    """Deterministic id for a chunk: the same piece of the same meeting always
+    gets the same id, whatever else in the transcript changed."""
+    content = f"{piece.speaker}|{piece.start_sec:.3f}|{piece.end_sec:.3f}|{piece.text}"
+    return f"{meeting_id}_{hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]}"
+
+
 def build_chunks(
     cues: list[Cue],
     meeting_id: str,
@@ -133,8 +143,15 @@ def build_chunks(
         all_pieces.extend(_split_long_turn(turn, max_words))
 
     chunks: list[Chunk] = []
+    seen_ids: dict[str, int] = {}
     for i, piece in enumerate(all_pieces):
-        chunk_id = f"{meeting_id}_{i:05d}_{uuid.uuid4().hex[:8]}"
+        chunk_id = chunk_content_id(meeting_id, piece)
+        # identical pieces (same speaker, timing and text) are possible only in a
+        # malformed file; number the repeats so ids stay unique
+        repeats = seen_ids.get(chunk_id, 0)
+        seen_ids[chunk_id] = repeats + 1
+        if repeats:
+            chunk_id = f"{chunk_id}_{repeats}"
         chunks.append(Chunk(
             chunk_id=chunk_id,
             meeting_id=meeting_id,
@@ -12,8 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+from backend.config import settings
 from datetime import datetime
 
 #define the required and optional fields that accompany a file upload. Specify default values.
@@ -46,4 +47,21 @@ class MeetingAttendee(BaseModel):
 
 class AliasResolveRequest(BaseModel):
     names: List[str]
-    source: Optional[str] = None
\ No newline at end of file
+    source: Optional[str] = None
+
+class TranscriptionProfileCreateEdit(BaseModel):
+    name: str = Field(min_length=1, max_length=64, example="draft")
+    model_name: str = Field(min_length=1, max_length=64, example="base.en")
+    language: Optional[str] = Field("en", max_length=16, example="en")
+    beam_size: Optional[int] = Field(None, ge=1, le=10, example=5)
+    compute_type: Literal["fp32", "fp16", "int8"] = "fp32"
+    vad_skip: bool = False
+    make_default: bool = False  # use this profile when the group's requests name none
+
+    @field_validator("model_name")
+    @classmethod
+    def known_whisper_model(cls, value: str) -> str:
+        # a typo would otherwise only surface in the worker, after every retry had failed
+        if value not in settings.WHISPER_MODEL_NAMES:
+            raise ValueError(f"Unknown Whisper model '{value}'. Choose one of: {', '.join(settings.WHISPER_MODEL_NAMES)}")
+        return value
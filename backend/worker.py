@@ -0,0 +1,430 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Background worker for queued ProcessingJob rows.
+
+Run with `python -m backend.worker` (or `--processes N` for a pool of
+core-pinned processes, see backend/worker_pool.py; or `--pipeline` to overlap the
+stages of several meetings, see run_pipeline_worker). The API only inserts jobs (see
+backend/routes/meetings.py); this process claims them with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can share one queue
+without double-processing. Each job gets its own database session. A job that
+raises is retried with exponential backoff until max_attempts; a job whose
+worker died mid-run (no heartbeat for TRANSCRIPTION_JOB_STALE_SECONDS) is put
+back on the queue by whichever worker polls next. With WARMUP_MODELS the
+worker loads and exercises its models (backend/processing/warmup.py) before
+claiming anything, and only then creates WORKER_READY_FILE.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.db import SessionLocal
+from backend.models import JobKind, JobStatus, ProcessingJob
+from backend.processing.resource_usage import PeakRssMonitor
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _run_transcription(job: ProcessingJob, db: Session) -> None:
+    from backend.processing.transcribe import transcribe_meeting
+    transcribe_meeting(job.group_id, job.meeting_id, db, **(job.params or {}))
+
+
+def _run_enrolment(job: ProcessingJob, db: Session) -> None:
+    from backend.processing.generate_embedding import embed_samples
+    embed_samples(job.params["sample_ids"], db)
+
+
+JOB_HANDLERS: dict[JobKind, Callable[[ProcessingJob, Session], None]] = {
+    JobKind.TRANSCRIPTION: _run_transcription,
+    JobKind.ENROLMENT: _run_enrolment,
+}
+
+
+def retry_delay(attempts: int) -> int:
+    """Seconds before a job that has failed `attempts` times may run again."""
+    return settings.TRANSCRIPTION_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Put RUNNING jobs whose worker stopped heartbeating back on the queue. A lost run counts
+    as a failed attempt (claiming already counted it), with the same backoff and limit as any
+    other failure: a meeting that crashes its worker outright (OOM kill, segfault) never
+    reaches _record_failure, and must not be retried forever."""
+    cutoff = func.now() - timedelta(seconds=settings.TRANSCRIPTION_JOB_STALE_SECONDS)
+    stale = (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.status == JobStatus.RUNNING, ProcessingJob.heartbeat_at < cutoff)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in stale:
+        job.error = f"Lost its worker ({job.worker_id}) without finishing"
+        job.worker_id = None
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            job.status = JobStatus.QUEUED
+            job.run_after = func.now() + timedelta(seconds=delay)
+            logging.warning(f"Job {job.id} lost its worker (attempt {job.attempts}/{job.max_attempts}); "
+                            f"retrying in {delay}s.")
+        else:
+            job.status = JobStatus.FAILED
+            job.finished = func.now()
+            logging.error(f"Job {job.id} lost its worker on every one of {job.attempts} attempts; giving up.")
+    db.commit()
+    return len(stale)
+
+
+def claim_next_job(db: Session, device: str, longest_first: bool = False,
+                   kinds: Optional[list[JobKind]] = None) -> Optional[int]:
+    """Atomically take the oldest runnable job and return its id, or None if there is none.
+    With `longest_first`, take the runnable job with the longest audio instead (jobs of
+    unknown length last) - longest-processing-time-first keeps a pool of processes busy
+    evenly rather than leaving one long meeting running alone at the end."""
+    order = (ProcessingJob.run_after, ProcessingJob.id)
+    if longest_first:
+        order = (ProcessingJob.estimated_seconds.desc().nulls_last(),) + order
+    query = db.query(ProcessingJob).filter(
+        ProcessingJob.status == JobStatus.QUEUED, ProcessingJob.run_after <= func.now()
+    )
+    if kinds is not None:
+        query = query.filter(ProcessingJob.kind.in_(kinds))
+    job = (
+        query
+        .order_by(*order)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = JobStatus.RUNNING
+    job.attempts += 1
+    job.device = device
+    job.worker_id = WORKER_ID
+    job.started = func.now()
+    job.heartbeat_at = func.now()
+    job.error = None
+    db.commit()
+    return job.id
+
+
+def _heartbeat(job_id: int, done: threading.Event) -> None:
+    interval = max(1, settings.TRANSCRIPTION_JOB_STALE_SECONDS // 3)
+    while not done.wait(interval):
+        db = SessionLocal()
+        try:
+            db.query(ProcessingJob).filter(ProcessingJob.id == job_id).update(
+                {ProcessingJob.heartbeat_at: func.now()}, synchronize_session=False
+            )
+            db.commit()
+        except Exception:
+            logging.exception(f"Heartbeat failed for job {job_id}")
+        finally:
+            db.close()
+
+
+def _record_failure(job_id: int, error: Exception, peak_rss_mb: Optional[int] = None) -> None:
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).get(job_id)
+        job.error = f"{type(error).__name__}: {error}"
+        job.peak_rss_mb = peak_rss_mb
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            job.status = JobStatus.QUEUED
+            job.run_after = func.now() + timedelta(seconds=delay)
+            logging.warning(f"Job {job_id} failed (attempt {job.attempts}/{job.max_attempts}); retrying in {delay}s.")
+        else:
+            job.status = JobStatus.FAILED
+            job.finished = func.now()
+            logging.error(f"Job {job_id} failed permanently after {job.attempts} attempts.")
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_job(job_id: int) -> None:
+    """Run one claimed job in its own session and record the outcome."""
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job_id, done), daemon=True)
+    heartbeat.start()
+
+    db = SessionLocal()
+    monitor = PeakRssMonitor()
+    try:
+        job = db.query(ProcessingJob).get(job_id)
+        logging.info(f"Running {job.kind.value} job {job_id} (meeting {job.meeting_id}) on {job.device}")
+        # With several runner threads this is the whole process's peak, i.e. an upper bound
+        with monitor:
+            JOB_HANDLERS[job.kind](job, db)
+        job.status = JobStatus.COMPLETED
+        job.finished = func.now()
+        job.peak_rss_mb = round(monitor.peak_mb)
+        db.commit()
+        logging.info(f"Job {job_id} completed (peak RSS {monitor.peak_mb:.0f} MB).")
+    except Exception as e:
+        logging.exception(f"Job {job_id} raised (peak RSS {monitor.peak_mb:.0f} MB)")
+        db.rollback()
+        _record_failure(job_id, e, peak_rss_mb=round(monitor.peak_mb))
+    finally:
+        done.set()
+        db.close()
+
+
+def _runner(device: str, stop: threading.Event, kinds: Optional[list[JobKind]] = None) -> None:
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            requeue_stale_jobs(db)
+            job_id = claim_next_job(db, device, kinds=kinds)
+        except Exception:
+            logging.exception("Failed to poll the job queue")
+            job_id = None
+        finally:
+            db.close()
+
+        if job_id is None:
+            stop.wait(settings.WORKER_POLL_SECONDS)
+            continue
+        run_job(job_id)
+
+
+class _PipelineItem:
+    """A claimed transcription job on its way through the stage pipeline."""
+
+    def __init__(self, job_id: int, transcription):
+        self.job_id = job_id
+        self.transcription = transcription
+        self.done = threading.Event()
+        self.monitor = PeakRssMonitor()
+
+
+def _stage_runner(fn, needs_db: bool):
+    def run(item: _PipelineItem) -> None:
+        if not needs_db:
+            fn(item.transcription)
+            return
+        db = SessionLocal()
+        try:
+            fn(item.transcription, db)
+        finally:
+            db.close()
+    return run
+
+
+def _pipeline_done(item: _PipelineItem) -> None:
+    item.done.set()
+    item.monitor.__exit__(None, None, None)
+    db = SessionLocal()
+    try:
+        job = db.query(ProcessingJob).get(item.job_id)
+        job.status = JobStatus.COMPLETED
+        job.finished = func.now()
+        job.peak_rss_mb = round(item.monitor.peak_mb)
+        db.commit()
+        logging.info(f"Job {item.job_id} completed (process peak RSS {item.monitor.peak_mb:.0f} MB).")
+    finally:
+        db.close()
+
+
+def _pipeline_failed(item: _PipelineItem, error: BaseException) -> None:
+    item.done.set()
+    item.monitor.__exit__(None, None, None)
+    _record_failure(item.job_id, error, peak_rss_mb=round(item.monitor.peak_mb))
+
+
+def _write_metrics(snapshot: dict) -> None:
+    """Publish stage metrics where the API's /status/pipeline can read them."""
+    metrics_dir = settings.UPLOAD_DIR / "worker_metrics"
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    path = metrics_dir / f"{WORKER_ID.replace(':', '-')}.json"
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"worker_id": WORKER_ID, "stages": snapshot}), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def run_pipeline_worker(device: str, stop: threading.Event) -> None:
+    """Transcription jobs go through TRANSCRIPTION_STAGES with one executor per stage, so
+    several meetings are in flight at once (backend/processing/stage_pipeline.py)."""
+    from backend.processing.stage_pipeline import Stage, StagePipeline
+    from backend.processing.transcribe import MeetingTranscription, TRANSCRIPTION_STAGES
+
+    pipeline = StagePipeline(
+        [
+            Stage(name, _stage_runner(fn, needs_db),
+                  workers=settings.PIPELINE_STAGE_WORKERS.get(name, 1),
+                  queue_size=settings.PIPELINE_QUEUE_SIZE)
+            for name, fn, needs_db in TRANSCRIPTION_STAGES
+        ],
+        on_done=_pipeline_done,
+        on_error=_pipeline_failed,
+        skip=lambda item: item.transcription.skipped,
+    )
+    pipeline.start()
+
+    # Any other kind of job still runs one at a time alongside the pipeline
+    other_kinds = [kind for kind in JobKind if kind != JobKind.TRANSCRIPTION]
+    other = None
+    if other_kinds:
+        other = threading.Thread(target=_runner, args=(device, stop, other_kinds), name="runner-other")
+        other.start()
+
+    last_metrics = 0.0
+    while not stop.is_set():
+        if time.monotonic() - last_metrics >= settings.WORKER_METRICS_SECONDS:
+            snapshot = pipeline.snapshot()
+            logging.info(f"[Worker {WORKER_ID}] Stage metrics: {json.dumps(snapshot)}")
+            try:
+                _write_metrics(snapshot)
+            except OSError:
+                logging.exception("Could not write worker metrics")
+            last_metrics = time.monotonic()
+
+        job_id = None
+        if pipeline.has_capacity():
+            db = SessionLocal()
+            try:
+                requeue_stale_jobs(db)
+                job_id = claim_next_job(db, device, kinds=[JobKind.TRANSCRIPTION])
+                if job_id is not None:
+                    job = db.query(ProcessingJob).get(job_id)
+                    transcription = MeetingTranscription(job.group_id, job.meeting_id, **(job.params or {}))
+            except Exception:
+                logging.exception("Failed to poll the job queue")
+                job_id = None
+            finally:
+                db.close()
+
+        if job_id is None:
+            stop.wait(settings.WORKER_POLL_SECONDS)
+            continue
+
+        item = _PipelineItem(job_id, transcription)
+        threading.Thread(target=_heartbeat, args=(job_id, item.done), daemon=True).start()
+        item.monitor.__enter__()
+        logging.info(f"Job {job_id} (meeting {transcription.meeting_id}) entering the stage pipeline")
+        pipeline.submit(item)
+
+    pipeline.stop()
+    if other is not None:
+        other.join()
+
+
+def warm_up() -> None:
+    """Warm the models in this process if configured to; a failure propagates and stops the worker."""
+    if settings.WARMUP_MODELS:
+        from backend.processing.warmup import warm_up_models
+        logging.info(f"[Worker {WORKER_ID}] Warming up models before claiming jobs")
+        warm_up_models()
+
+
+def mark_ready() -> None:
+    """Create settings.WORKER_READY_FILE, which the container health check looks for."""
+    if settings.WORKER_READY_FILE is None:
+        return
+    settings.WORKER_READY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    settings.WORKER_READY_FILE.write_text(
+        json.dumps({"worker": WORKER_ID, "ready_at": time.time()}), encoding="utf-8"
+    )
+    logging.info(f"[Worker {WORKER_ID}] Ready")
+
+
+def clear_ready() -> None:
+    if settings.WORKER_READY_FILE is not None:
+        settings.WORKER_READY_FILE.unlink(missing_ok=True)
+
+
+def run_worker(concurrency: Optional[int] = None, processes: Optional[int] = None,
+               pipeline: Optional[bool] = None) -> None:
+    from backend.processing.device_management import get_safe_device
+
+    device, msg = get_safe_device()
+    logging.info(f"[Worker {WORKER_ID}] {msg}")
+    processes = settings.WORKER_PROCESSES if processes is None else processes
+    clear_ready()  # a file left by a previous run must not report this one ready
+    if processes > 1:
+        # One pinned process per slice of cores instead of threads in this process
+        from backend.worker_pool import run_pool
+        try:
+            run_pool(processes, device)
+        finally:
+            clear_ready()
+        return
+    if concurrency is None:
+        concurrency = (
+            settings.WORKER_CONCURRENCY_CUDA if device.startswith("cuda") else settings.WORKER_CONCURRENCY_CPU
+        )
+    pipeline = settings.WORKER_PIPELINE if pipeline is None else pipeline
+    if not pipeline:
+        logging.info(f"[Worker {WORKER_ID}] Running up to {concurrency} job(s) at a time on {device}")
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        logging.info(f"[Worker {WORKER_ID}] Signal {signum} received; finishing current jobs.")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    warm_up()
+    mark_ready()
+    try:
+        if pipeline:
+            logging.info(f"[Worker {WORKER_ID}] Running transcription as a stage pipeline on {device}")
+            run_pipeline_worker(device, stop)
+            return
+
+        runners = [
+            threading.Thread(target=_runner, args=(device, stop), name=f"runner-{i}")
+            for i in range(concurrency)
+        ]
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join()
+    finally:
+        clear_ready()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued transcription jobs.")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Jobs to run at once on this worker's device (default from settings).")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Run jobs in this many core-pinned processes instead (default from settings).")
+    parser.add_argument("--pipeline", action="store_true", default=None,
+                        help="Overlap stages of several transcriptions (default from settings).")
+    args = parser.parse_args()
+    run_worker(args.concurrency, args.processes, args.pipeline)
@@ -0,0 +1,159 @@
+# Copyright 2025 Alun King
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Multi-process variant of backend/worker.py for many-core CPU hosts.
+
+Run with `python -m backend.worker --processes N`. One Whisper decode only uses
+a handful of threads effectively, so rather than one job at a time over every
+core, the host's cores are split into N disjoint slices and each slice gets its
+own long-lived process. A process is pinned to its slice
+(os.sched_setaffinity), sizes torch's intra-op pool to match and keeps its
+models resident in its own model registry between jobs. The parent process
+only claims jobs - longest audio first - and hands their ids to free processes.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from backend.config import settings
+from backend.db import SessionLocal
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_slices(processes: int, cpus: Optional[list[int]] = None) -> list[list[int]]:
+    """Split `cpus` into `processes` contiguous, near-equal, non-empty slices."""
+    cpus = available_cpus() if cpus is None else cpus
+    processes = max(1, min(processes, len(cpus)))
+    base, extra = divmod(len(cpus), processes)
+    slices, start = [], 0
+    for i in range(processes):
+        size = base + (1 if i < extra else 0)
+        slices.append(cpus[start:start + size])
+        start += size
+    return slices
+
+
+def _init_process(slice_queue, warmed) -> None:
+    """Runs once in each pool process: take a core slice, size the thread pools to it, warm
+    the models, then wait at the `warmed` barrier until every other process has too."""
+    # Shutdown is coordinated by the parent; a Ctrl-C must not kill jobs mid-write
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cores = slice_queue.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    threads = len(cores)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    logging.info(f"[Worker pool] Process {os.getpid()} pinned to cores {cores} ({threads} threads)")
+
+    # Warm this process's own copy of the models; an exception here breaks the pool
+    from backend.worker import warm_up
+    warm_up()
+    warmed.wait()
+
+
+def _process_id() -> int:
+    return os.getpid()
+
+
+def _run_in_process(job_id: int) -> None:
+    from backend.worker import run_job
+    run_job(job_id)
+
+
+def run_pool(processes: int, device: str) -> None:
+    from backend.worker import WORKER_ID, claim_next_job, mark_ready, requeue_stale_jobs
+
+    slices = core_slices(processes)
+    processes = len(slices)
+    logging.info(f"[Worker pool {WORKER_ID}] {processes} processes on cores {slices}")
+
+    # spawn rather than fork: a forked child would inherit the parent's DB connections and
+    # any CUDA/OpenMP state, none of which survive a fork safely
+    context = multiprocessing.get_context("spawn")
+    slice_queue = context.Queue()
+    for cores in slices:
+        slice_queue.put(cores)
+    warmed = context.Barrier(processes)
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        logging.info(f"[Worker pool {WORKER_ID}] Signal {signum} received; finishing current jobs.")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    in_flight: dict[Future, int] = {}
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=context, initializer=_init_process, initargs=(slice_queue, warmed)
+    ) as pool:
+        # Spawn pools start processes on demand, one per task submitted while none is idle.
+        # No process is idle until all of them have warmed up and passed the barrier, so these
+        # tasks start every process, and none of them completes before all are warm. A process
+        # that fails to warm up breaks the pool, and result() raises. (Once past the barrier a
+        # quick process may run several of these, so the pids seen can be fewer than processes.)
+        for future in [pool.submit(_process_id) for _ in range(processes)]:
+            future.result()
+        logging.info(f"[Worker pool {WORKER_ID}] All {processes} processes warm")
+        mark_ready()
+        while not stop.is_set():
+            # Fill every free process, longest meeting first
+            while len(in_flight) < processes:
+                db = SessionLocal()
+                try:
+                    requeue_stale_jobs(db)
+                    job_id = claim_next_job(db, device, longest_first=True)
+                except Exception:
+                    logging.exception("Failed to poll the job queue")
+                    job_id = None
+                finally:
+                    db.close()
+                if job_id is None:
+                    break
+                in_flight[pool.submit(_run_in_process, job_id)] = job_id
+
+            if not in_flight:
+                stop.wait(settings.WORKER_POLL_SECONDS)
+                continue
+            done, _ = wait(list(in_flight), timeout=settings.WORKER_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                job_id = in_flight.pop(future)
+                error = future.exception()
+                if isinstance(error, BrokenProcessPool):
+                    # A pool process died outright (e.g. OOM-killed). The pool can't be reused, so
+                    # exit and let the supervisor restart us; the job's missed heartbeats requeue it.
+                    logging.error(f"Pool process running job {job_id} died; shutting the pool down.")
+                    stop.set()
+                elif error is not None:
+                    # run_job records its own failures, so this is unexpected
+                    logging.error(f"Pool process running job {job_id} failed: {error!r}")
+
+        wait(list(in_flight))